@@ -1,2 +1,4 @@
-from .config import get_option, set_option, reset_option
-from .main import ChessBoard
+from .config import get_option, set_option, reset_option, option_context
+from .main import ChessBoard, CopyOnWriteChessBoard, FlatChessBoard
+from .moves import Move
+from .validation import validate_moves
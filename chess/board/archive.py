@@ -0,0 +1,250 @@
+"""Compact columnar archives of games.
+
+An archive stores every move of every game as one 16-bit integer in a single
+contiguous column, so games can be replayed without parsing SAN again. Each
+integer is a `Move` without its flags (see `Move.compact`): from square, to
+square and promotion. Castling is stored as the king's two-square move.
+
+The file is laid out as:
+
+    header          magic, version, number of games, number of moves
+    game offsets    uint64 * (games + 1); game i's moves are
+                    moves[offsets[i]:offsets[i + 1]]
+    moves           uint16 * moves
+    header offsets  uint64 * (games + 1), into the header column
+    headers         each game's PGN tags as a JSON object, concatenated
+
+All integers are little-endian. Archives are memory-mapped for reading, so
+opening one is instant and reading game i touches only its own bytes.
+
+Build one from PGN files:
+
+    python -m chess.board.archive games.pgn -o games.chga
+
+and read it back:
+
+    >>> with GameArchive('games.chga') as archive:
+    ...     board = archive.board(12345)  # The final position of game 12345
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+import warnings
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .main import ChessBoard, InvalidMove
+from .moves import Move, COMPACT_MASK
+from .pgn import PgnGame, ReplayWarning, read_file
+
+MAGIC = b'CHGA'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xQQ')  # magic, version, games, moves
+HEADER_SIZE = HEADER.size
+
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def play_san(board: ChessBoard, san: str) -> Move:
+    """Plays a SAN move on `board` and returns it as a `Move`."""
+    move = board.parse_san(san)
+    board.move_from_to(move, notifications=False)
+    return move
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+class ArchiveWriter(object):
+    """Collects games and writes the archive on `close()`. Moves are held in
+    memory as packed 16-bit integers, i.e. two bytes per move."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._moves = array('H')
+        self._offsets = array('Q', [0])
+        self._headers = bytearray()
+        self._header_offsets = array('Q', [0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def add(
+            self,
+            moves: Iterable[int],
+            headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Adds a game from `Move`s (or the ints they are)."""
+        self._moves.extend(move & COMPACT_MASK for move in moves)
+        self._offsets.append(len(self._moves))
+        self._headers += json.dumps(headers or {}).encode('utf-8')
+        self._header_offsets.append(len(self._headers))
+
+    def add_game(self, game: PgnGame) -> int:
+        """Adds a PGN game, replaying it to resolve each SAN move. Moves from
+        the first one the board can't play are dropped, with a
+        `ReplayWarning`. Returns the number of moves stored."""
+        board = ChessBoard.from_fen(game.headers['FEN']) \
+            if 'FEN' in game.headers else ChessBoard()
+        moves = []
+        for san in game.moves:
+            try:
+                moves.append(play_san(board, san))
+            except InvalidMove as e:
+                warnings.warn(f'Game {game.index} stops before ply '
+                              f'{len(moves) + 1} ({san}): {e}', ReplayWarning,
+                              stacklevel=2)
+                break
+        self.add(moves, game.headers)
+        return len(moves)
+
+    def close(self) -> None:
+        columns = [self._offsets, self._moves, self._header_offsets]
+        if not _LITTLE_ENDIAN:
+            for column in columns:
+                column.byteswap()
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self), len(self._moves)))
+            for column in columns:
+                data = column.tobytes()
+                f.write(data)
+                f.write(bytes(_pad(len(data))))
+            f.write(self._headers)
+        if not _LITTLE_ENDIAN:
+            for column in columns:
+                column.byteswap()
+
+
+def write_archive(path: str, games: Iterable[PgnGame]) -> int:
+    """Writes PGN games to an archive. Returns the number of games."""
+    with ArchiveWriter(path) as writer:
+        for game in games:
+            writer.add_game(game)
+    return len(writer)
+
+
+class GameArchive(object):
+    """A memory-mapped archive. Views returned by `moves()` point into the
+    file and must be released (or dropped) before `close()`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, games, moves = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f'{path} is not a game archive.')
+        self._view = memoryview(self._mm)
+        start = HEADER_SIZE
+        self._offsets, start = self._column('Q', start, games + 1)
+        self._moves, start = self._column('H', start, moves)
+        self._header_offsets, start = self._column('Q', start, games + 1)
+        self._headers = self._view[start:]
+
+    def _column(self, fmt: str, start: int, n: int):
+        size = struct.calcsize(fmt) * n
+        raw = self._view[start:start + size]
+        if _LITTLE_ENDIAN:
+            column = raw.cast(fmt)
+        else:
+            column = array(fmt, bytes(raw))
+            column.byteswap()
+        return column, start + size + _pad(size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self) -> Iterator[Sequence[int]]:
+        for i in range(len(self)):
+            yield self.moves(i)
+
+    def _index(self, i: int) -> int:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('game index out of range')
+        return i
+
+    def moves(self, i: int) -> Sequence[int]:
+        """Game i's moves as plain ints, without copying. Wrap one in `Move`
+        to read it."""
+        i = self._index(i)
+        return self._moves[self._offsets[i]:self._offsets[i + 1]]
+
+    def headers(self, i: int) -> Dict[str, str]:
+        i = self._index(i)
+        start, end = self._header_offsets[i], self._header_offsets[i + 1]
+        return json.loads(bytes(self._headers[start:end]))
+
+    def start_board(self, i: int) -> ChessBoard:
+        headers = self.headers(i)
+        if 'FEN' in headers:
+            return ChessBoard.from_fen(headers['FEN'])
+        return ChessBoard()
+
+    def replay(
+            self,
+            i: int,
+            board: Optional[ChessBoard] = None
+    ) -> Iterator[ChessBoard]:
+        """Plays game i on `board` (its starting position by default),
+        yielding the board after every move. The same board object is yielded
+        each time; copy it to keep a position."""
+        if board is None:
+            board = self.start_board(i)
+        for move in self.moves(i):
+            # The moves were validated when the archive was written.
+            board.move_from_to(Move(move), safe_mode=False,
+                               notifications=False)
+            yield board
+
+    def board(self, i: int, ply: Optional[int] = None) -> ChessBoard:
+        """The position after `ply` moves of game i (the final position by
+        default)."""
+        board = self.start_board(i)
+        if ply != 0:
+            for n, _ in enumerate(self.replay(i, board), 1):
+                if n == ply:
+                    break
+        return board
+
+    def close(self) -> None:
+        for column in (self._offsets, self._moves, self._header_offsets,
+                       self._headers):
+            if isinstance(column, memoryview):
+                column.release()
+        self._view.release()
+        self._mm.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.board.archive',
+        description='Build a game archive from PGN files.'
+    )
+    parser.add_argument('pgn', nargs='+', help='PGN files to read.')
+    parser.add_argument('-o', '--output', required=True)
+    args = parser.parse_args(argv)
+    games = (game for path in args.pgn for game in read_file(path))
+    n = write_archive(args.output, games)
+    print(f'Wrote {n} games to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+"""Attack and pin detection on square indices.
+
+Squares are numbered `x * 8 + y` (file-major), as in `zobrist.py`, which is
+also the order you get by flattening `ChessBoard._mat`. The functions at the
+bottom of this module take such a flattened list of cells, so a caller
+answering many questions about one position only flattens it once.
+"""
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .pieces import (
+    ChessPiece, Pawn, Knight, Bishop, Rook, Queen, King, PIECE_VALUES
+)
+
+WHITE, BLACK = 0, 1
+COLOR_INDEX = {'white': WHITE, 'black': BLACK}
+_ENEMY = {'white': 'black', 'black': 'white'}
+
+SQUARE_NAMES = [f'{f}{r}' for f in 'abcdefgh' for r in range(1, 9)]
+SQUARES = {name: sq for sq, name in enumerate(SQUARE_NAMES)}
+
+
+# ~~~~~~ Precomputed geometry
+
+
+def _on_board(x: int, y: int) -> bool:
+    return 0 <= x < 8 and 0 <= y < 8
+
+
+def _steps(deltas) -> List[Tuple[int, ...]]:
+    return [
+        tuple(
+            (x + dx) * 8 + y + dy for dx, dy in deltas
+            if _on_board(x + dx, y + dy)
+        )
+        for x in range(8) for y in range(8)
+    ]
+
+
+_KING_DELTAS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                if dx or dy]
+_KNIGHT_DELTAS = [(dx, dy) for dx in (-2, -1, 1, 2) for dy in (-2, -1, 1, 2)
+                  if abs(dx) != abs(dy)]
+_ROOK_DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+_BISHOP_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+KING_MOVES = _steps(_KING_DELTAS)
+KNIGHT_MOVES = _steps(_KNIGHT_DELTAS)
+KING_SETS = [frozenset(i) for i in KING_MOVES]
+KNIGHT_SETS = [frozenset(i) for i in KNIGHT_MOVES]
+
+
+def _rays(directions) -> List[List[Tuple[int, ...]]]:
+    rays = []
+    for x in range(8):
+        for y in range(8):
+            sq_rays = []
+            for dx, dy in directions:
+                ray = []
+                i, j = x + dx, y + dy
+                while _on_board(i, j):
+                    ray.append(i * 8 + j)
+                    i, j = i + dx, j + dy
+                sq_rays.append(tuple(ray))
+            rays.append(sq_rays)
+    return rays
+
+
+ROOK_RAYS = _rays(_ROOK_DIRECTIONS)
+BISHOP_RAYS = _rays(_BISHOP_DIRECTIONS)
+SLIDER_RAYS = {
+    'R': ROOK_RAYS,
+    'B': BISHOP_RAYS,
+    'Q': [r + b for r, b in zip(ROOK_RAYS, BISHOP_RAYS)]
+}
+
+PAWN_DIRECTION = (1, -1)
+PAWN_START_RANK = (1, 6)
+PAWN_LAST_RANK = (7, 0)
+PAWN_ATTACK_SETS = [
+    [
+        frozenset(
+            (x + dx) * 8 + y + PAWN_DIRECTION[color] for dx in (-1, 1)
+            if _on_board(x + dx, y + PAWN_DIRECTION[color])
+        )
+        for x in range(8) for y in range(8)
+    ]
+    for color in (WHITE, BLACK)
+]
+
+# LINES[a * 64 + b] is 'R' if a and b share a file or rank, 'B' if they share
+# a diagonal, and None otherwise; BETWEEN holds the squares strictly between.
+LINES: List[Optional[str]] = [None] * 4096
+BETWEEN: List[Tuple[int, ...]] = [()] * 4096
+for _sq in range(64):
+    for _kind, _rays_of in (('R', ROOK_RAYS), ('B', BISHOP_RAYS)):
+        for _ray in _rays_of[_sq]:
+            for _i, _target in enumerate(_ray):
+                LINES[_sq * 64 + _target] = _kind
+                BETWEEN[_sq * 64 + _target] = _ray[:_i]
+
+
+# ~~~~~~ Attacks on a position
+
+Cells = Sequence[Optional[ChessPiece]]
+
+_ROOK_LIKE = (Rook, Queen)
+_BISHOP_LIKE = (Bishop, Queen)
+
+
+def cells(board) -> List[Optional[ChessPiece]]:
+    """The board's squares as one flat list, indexed by square number."""
+    return list(chain.from_iterable(board._mat))
+
+
+def attackers(cells: Cells, sq: int, color: str) -> List[int]:
+    """Squares of the `color` pieces that attack `sq`."""
+    li = []
+    for ray in ROOK_RAYS[sq]:
+        for s in ray:
+            piece = cells[s]
+            if piece is not None:
+                if piece.color == color and isinstance(piece, _ROOK_LIKE):
+                    li.append(s)
+                break
+    for ray in BISHOP_RAYS[sq]:
+        for s in ray:
+            piece = cells[s]
+            if piece is not None:
+                if piece.color == color and isinstance(piece, _BISHOP_LIKE):
+                    li.append(s)
+                break
+    for s in KNIGHT_MOVES[sq]:
+        piece = cells[s]
+        if isinstance(piece, Knight) and piece.color == color:
+            li.append(s)
+    for s in KING_MOVES[sq]:
+        piece = cells[s]
+        if isinstance(piece, King) and piece.color == color:
+            li.append(s)
+    # A `color` pawn attacks `sq` from where an opposite pawn on `sq` would.
+    for s in PAWN_ATTACK_SETS[1 - COLOR_INDEX[color]][sq]:
+        piece = cells[s]
+        if isinstance(piece, Pawn) and piece.color == color:
+            li.append(s)
+    return li
+
+
+def attack_map(cells: Cells, color: str) -> bytearray:
+    """For every square, how many `color` pieces attack it. Squares holding a
+    piece count as attacked (i.e. defended, if it's a `color` piece)."""
+    counts = bytearray(64)
+    color_idx = COLOR_INDEX[color]
+    for sq, piece in enumerate(cells):
+        if piece is None or piece.color != color:
+            continue
+        if isinstance(piece, Pawn):
+            targets = PAWN_ATTACK_SETS[color_idx][sq]
+        elif isinstance(piece, Knight):
+            targets = KNIGHT_MOVES[sq]
+        elif isinstance(piece, King):
+            targets = KING_MOVES[sq]
+        else:
+            targets = []
+            rays = (
+                SLIDER_RAYS['Q'] if isinstance(piece, Queen)
+                else ROOK_RAYS if isinstance(piece, Rook)
+                else BISHOP_RAYS
+            )[sq]
+            for ray in rays:
+                for s in ray:
+                    targets.append(s)
+                    if cells[s] is not None:
+                        break
+        for s in targets:
+            counts[s] += 1
+    return counts
+
+
+def pins(cells: Cells, king_sq: int, color: str) -> Dict[int, Tuple[int, ...]]:
+    """Pieces of `color` pinned to their king. Maps each pinned piece's square
+    to the squares it can still move to without exposing the king: the ones
+    between the king and the pinning piece, plus the pinning piece's own."""
+    pinned = {}
+    for rays, sliders in (
+            (ROOK_RAYS, _ROOK_LIKE), (BISHOP_RAYS, _BISHOP_LIKE)
+    ):
+        for ray in rays[king_sq]:
+            own = None
+            for i, s in enumerate(ray):
+                piece = cells[s]
+                if piece is None:
+                    continue
+                if piece.color == color:
+                    if own is not None:
+                        break
+                    own = s
+                    continue
+                if own is not None and isinstance(piece, sliders):
+                    pinned[own] = ray[:i + 1]
+                break
+    return pinned
+
+
+def leaves_king_attacked(
+        cells: List[Optional[ChessPiece]],
+        frm: int,
+        to: int,
+        king_sq: int,
+        color: str
+) -> bool:
+    """Whether moving the `color` piece on `frm` to `to` would leave its king
+    attacked. The move is made on `cells` and unmade again before returning,
+    so `cells` must be a mutable list."""
+    moved, captured = cells[frm], cells[to]
+    cells[to], cells[frm] = moved, None
+    try:
+        return bool(attackers(
+            cells, to if frm == king_sq else king_sq, _ENEMY[color]
+        ))
+    finally:
+        cells[frm], cells[to] = moved, captured
+
+
+def has_evasion(
+        cells: List[Optional[ChessPiece]],
+        king_sq: int,
+        color: str
+) -> bool:
+    """Whether `color`, whose king is in check, has a legal move. Only king
+    moves, captures of a lone checker and blocks are tried, each with a
+    make/unmake probe."""
+    for s in KING_MOVES[king_sq]:
+        target = cells[s]
+        if target is not None and target.color == color:
+            continue
+        if not leaves_king_attacked(cells, king_sq, s, king_sq, color):
+            return True
+    checkers = attackers(cells, king_sq, _ENEMY[color])
+    if len(checkers) != 1:
+        return False
+    checker = checkers[0]
+    for frm in attackers(cells, checker, color):
+        if frm == king_sq:
+            continue
+        if not leaves_king_attacked(cells, frm, checker, king_sq, color):
+            return True
+    color_idx = COLOR_INDEX[color]
+    direction = PAWN_DIRECTION[color_idx]
+    for sq in BETWEEN[king_sq * 64 + checker]:
+        # Pawns block by pushing, not by moving the way they attack.
+        blockers = [s for s in attackers(cells, sq, color)
+                    if not isinstance(cells[s], (Pawn, King))]
+        behind = sq % 8 - direction
+        if 0 <= behind < 8:
+            piece = cells[sq - direction]
+            double = behind == PAWN_START_RANK[color_idx] + direction
+            if piece is None and double:
+                piece = cells[sq - 2 * direction]
+                if isinstance(piece, Pawn) and piece.color == color:
+                    blockers.append(sq - 2 * direction)
+            elif isinstance(piece, Pawn) and piece.color == color:
+                blockers.append(sq - direction)
+        for frm in blockers:
+            if not leaves_king_attacked(cells, frm, sq, king_sq, color):
+                return True
+    return False
+
+
+# The king is the last piece to recapture with, so it's the most valuable here.
+_EXCHANGE_VALUES = {**PIECE_VALUES, King: 20000}
+
+
+def static_exchange(
+        cells: Cells,
+        frm: int,
+        to: int,
+        promotion: Optional[type] = None
+) -> int:
+    """Material the side moving from `frm` to `to` wins or loses, in
+    centipawns, if both sides keep recapturing on `to` with their least
+    valuable attacker for as long as it pays. Either side may stop instead of
+    recapturing. A king never recaptures onto a defended square, and a king
+    moving onto an attacked square (an illegal move) scores as if it were
+    lost.
+
+    Removing each attacker from a copy of `cells` exposes any slider behind it
+    (x-rays). Pins and en passant are ignored, as is usual for static
+    exchange evaluation."""
+    cells = list(cells)
+    piece = cells[frm]
+    color = piece.color
+    target = cells[to]
+    gains = [PIECE_VALUES[type(target)] if target is not None else 0]
+    on_square = _EXCHANGE_VALUES[type(piece)]
+    if promotion is not None:
+        gains[0] += PIECE_VALUES[promotion] - PIECE_VALUES[Pawn]
+        on_square = PIECE_VALUES[promotion]
+    cells[frm] = None
+    side = _ENEMY[color]
+    while True:
+        squares = attackers(cells, to, side)
+        if not squares:
+            break
+        s = min(squares, key=lambda i: _EXCHANGE_VALUES[type(cells[i])])
+        if isinstance(cells[s], King) \
+                and attackers(cells, to, _ENEMY[side]):
+            break
+        gains.append(on_square - gains[-1])
+        on_square = _EXCHANGE_VALUES[type(cells[s])]
+        cells[s] = None
+        side = _ENEMY[side]
+    # Back up from the end: each side takes the better of recapturing or
+    # standing pat.
+    for i in range(len(gains) - 1, 0, -1):
+        gains[i - 1] = -max(-gains[i - 1], gains[i])
+    return gains[0]
@@ -0,0 +1,10 @@
+"""Repeatable benchmarks for the board.
+
+Run them with `python -m chess.board.benchmarks`; see `--help` for saving
+results and comparing them against a baseline.
+"""
+from .cases import all_cases, GAMES, MIDGAME_FENS
+from .runner import (
+    BenchmarkResult, Comparison, run_case, run_all, save_results,
+    load_results, compare
+)
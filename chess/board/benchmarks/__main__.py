@@ -0,0 +1,50 @@
+import argparse
+import sys
+
+from .cases import all_cases
+from .runner import (
+    run_all, save_results, load_results, compare, format_results,
+    format_comparisons, MIN_CHANGE, NOISE_FACTOR
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.board.benchmarks',
+        description='Run the board benchmarks.'
+    )
+    parser.add_argument('-k', dest='pattern', default=None,
+                        help='Only run benchmarks whose name contains this.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Minimum seconds per repeat.')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Write results to this JSON file.')
+    parser.add_argument('-b', '--baseline', default=None,
+                        help='Compare against results in this JSON file.')
+    parser.add_argument('--min-change', type=float, default=MIN_CHANGE)
+    parser.add_argument('--noise-factor', type=float, default=NOISE_FACTOR)
+    args = parser.parse_args(argv)
+
+    results = []
+    for result in run_all(all_cases(), pattern=args.pattern,
+                          repeat=args.repeat, min_time=args.min_time):
+        print(f'{result.name}: {result.median * 1e6:.1f}us', file=sys.stderr)
+        results.append(result)
+    print(format_results(results))
+    if args.output:
+        save_results(results, args.output)
+    if args.baseline:
+        comparisons = compare(load_results(args.baseline),
+                              {r.name: r for r in results},
+                              min_change=args.min_change,
+                              noise_factor=args.noise_factor)
+        print()
+        print(format_comparisons(comparisons))
+        if any(c.status == 'regression' for c in comparisons):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""The benchmark cases. Each case is a function that does its setup and returns
+the zero-argument callable that gets timed, so setup is never measured."""
+from functools import partial
+from typing import Callable, Dict
+
+from .. import ChessBoard, option_context
+from ..main import parse_move
+
+GAMES = {
+    'scholars_mate': '1.e4 e5 2.Bc4 Nc6 3.Qh5 Nf6?? 4.Qxf7#',
+    'game_of_the_century': (
+        '1.Nf3 Nf6 2.c4 g6 3.Nc3 Bg7 4.d4 O-O 5.Bf4 d5 6.Qb3 dxc4 '
+        '7.Qxc4 c6 8.e4 Nbd7 9.Rd1 Nb6 10.Qc5 Bg4 11.Bg5 Na4 12.Qa3 Nxc3 '
+        '13.bxc3 Nxe4 14.Bxe7 Qb6 15.Bc4 Nxc3 16.Bc5 Rfe8+ 17.Kf1 Be6 '
+        '18.Bxb6 Bxc4+ 19.Kg1 Ne2+ 20.Kf1 Nxd4+ 21.Kg1 Ne2+ 22.Kf1 Nc3+ '
+        '23.Kg1 axb6 24.Qb4 Ra4 25.Qxb6 Nxd1 26.h3 Rxa2 27.Kh2 Nxf2 '
+        '28.Re1 Rxe1 29.Qd8+ Bf8 30.Nxe1 Bd5 31.Nf3 Ne4 32.Qb8 b5 33.h4 h5 '
+        '34.Ne5 Kg7 35.Kg1 Bc5+ 36.Kf1 Ng3+ 37.Ke1 Bb4+ 38.Kd1 Bb3+ '
+        '39.Kc1 Ne2+ 40.Kb1 Nc3+ 41.Kc1 Rc2'
+    ),
+    'sample_game': (
+        '1.e4 e5 2.Nf3 f6 3.Nxe5 fxe5 4.Qh5+ Ke7 5.Qxe5+ Kf7 6.Bc4+ d5 '
+        '7.Bxd5+ Kg6 8.h4 h5 9.Bxb7 Bxb7 10.Qf5+ Kh6 11.d4+ g5 12.Qf7 Qe7 '
+        '13.hxg5+ Qxg5 14.Rxh5#'
+    )
+}
+
+# Positions reached part way through the games above.
+MIDGAME_FENS = {
+    'century_move_17': (
+        'r3r1k1/pp3pbp/1qp3p1/2B5/2BP2b1/Q1n2N2/P4PPP/3RK2R w K - 0 17'
+    ),
+    'italian': (
+        'r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/2NP1N2/PPP2PPP/R1BQK2R '
+        'b KQkq - 0 5'
+    ),
+}
+
+
+def san_tokens(game: str) -> list:
+    return [
+        token for token in game.replace('.', '. ').split()
+        if not token.endswith('.')
+    ]
+
+
+def _parse_move() -> Callable:
+    tokens = [
+        token for game in GAMES.values() for token in san_tokens(game)
+        if not token.startswith('O-O')
+    ]
+
+    def run():
+        for token in tokens:
+            parse_move(token)
+    return run
+
+
+def _play_game(game: str) -> Callable:
+    def run():
+        ChessBoard().move(game)
+    return run
+
+
+def _all_valid_moves(fen: str) -> Callable:
+    board = ChessBoard.from_fen(fen)
+    return board.all_valid_moves
+
+
+def _winner(fen: str) -> Callable:
+    board = ChessBoard.from_fen(fen)
+
+    def run():
+        return board.winner
+    return run
+
+
+def _repr(size: str) -> Callable:
+    board = ChessBoard.from_fen(MIDGAME_FENS['century_move_17'])
+
+    def run():
+        with option_context({'display.size': size}):
+            return repr(board)
+    return run
+
+
+def _copy(fen: str) -> Callable:
+    board = ChessBoard.from_fen(fen)
+    return board.copy
+
+
+def _san(fen: str) -> Callable:
+    board = ChessBoard.from_fen(fen)
+    moves = board.all_valid_moves()
+
+    def run():
+        return [board.san(move) for move in moves]
+    return run
+
+
+def _planes(fen: str) -> Callable:
+    from ..planes import PLANES, write_planes
+    board = ChessBoard.from_fen(fen)
+    buffer = bytearray(PLANES * 64)
+
+    def run():
+        write_planes(board, buffer)
+    return run
+
+
+def _planes_by_square(fen: str) -> Callable:
+    """What `write_planes` replaces, a lookup per square, as the yardstick
+    for `planes`: it should take well under half as long."""
+    from ..planes import PLANES, PIECE_PLANE
+    board = ChessBoard.from_fen(fen)
+    buffer = bytearray(PLANES * 64)
+
+    def run():
+        buffer[:] = bytes(len(buffer))
+        for x in range(8):
+            for y in range(8):
+                piece = board[x, y]
+                if piece is not None:
+                    plane = PIECE_PLANE[type(piece), piece.color]
+                    buffer[plane * 64 + y * 8 + x] = 1
+    return run
+
+
+def all_cases() -> Dict[str, Callable[[], Callable]]:
+    cases = {'parse_move': _parse_move}
+    for name, game in GAMES.items():
+        cases[f'move.{name}'] = partial(_play_game, game)
+    for name, fen in MIDGAME_FENS.items():
+        cases[f'all_valid_moves.{name}'] = partial(_all_valid_moves, fen)
+        cases[f'winner.{name}'] = partial(_winner, fen)
+        cases[f'copy.{name}'] = partial(_copy, fen)
+        cases[f'san.{name}'] = partial(_san, fen)
+        cases[f'planes.{name}'] = partial(_planes, fen)
+        cases[f'planes_by_square.{name}'] = partial(_planes_by_square, fen)
+    for size in ('big', 'medium', 'small'):
+        cases[f'repr.{size}'] = partial(_repr, size)
+    return cases
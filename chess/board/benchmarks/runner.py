@@ -0,0 +1,189 @@
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+# A change only counts if it is bigger than both of these: a flat minimum, and
+# a multiple of the run-to-run noise measured in the two runs being compared.
+MIN_CHANGE = 0.05
+NOISE_FACTOR = 3.0
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    number: int
+    times: List[float]  # seconds per call, one entry per repeat
+
+    @property
+    def min(self) -> float:
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def noise(self) -> float:
+        """Median absolute deviation, relative to the median."""
+        median = self.median
+        if not median:
+            return 0.0
+        mad = statistics.median(abs(t - median) for t in self.times)
+        return mad / median
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d.update(min=self.min, median=self.median, noise=self.noise)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'BenchmarkResult':
+        return cls(name=d['name'], number=d['number'], times=d['times'])
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else 1.0
+
+    @property
+    def status(self) -> str:
+        if self.ratio > 1 + self.threshold:
+            return 'regression'
+        if self.ratio < 1 - self.threshold:
+            return 'improvement'
+        return 'unchanged'
+
+
+def _calibrate(func: Callable, min_time: float) -> int:
+    """Smallest power of 10 of calls that takes at least `min_time`."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_time or number >= 10 ** 6:
+            return number
+        number *= 10
+
+
+def run_case(
+        name: str,
+        case: Callable[[], Callable],
+        repeat: int = 5,
+        min_time: float = 0.2
+) -> BenchmarkResult:
+    func = case()
+    number = _calibrate(func, min_time)
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return BenchmarkResult(name=name, number=number, times=times)
+
+
+def run_all(
+        cases: Dict[str, Callable[[], Callable]],
+        pattern: Optional[str] = None,
+        **kwargs
+) -> Iterable[BenchmarkResult]:
+    for name, case in cases.items():
+        if pattern and pattern not in name:
+            continue
+        yield run_case(name, case, **kwargs)
+
+
+def save_results(results: List[BenchmarkResult], path: str) -> None:
+    data = {
+        'meta': {
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': [r.to_dict() for r in results]
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, BenchmarkResult]:
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        d['name']: BenchmarkResult.from_dict(d) for d in data['results']
+    }
+
+
+def compare(
+        baseline: Dict[str, BenchmarkResult],
+        current: Dict[str, BenchmarkResult],
+        min_change: float = MIN_CHANGE,
+        noise_factor: float = NOISE_FACTOR
+) -> List[Comparison]:
+    comparisons = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        threshold = max(min_change,
+                        noise_factor * max(base.noise, result.noise))
+        comparisons.append(Comparison(
+            name=name,
+            baseline=base.median,
+            current=result.median,
+            threshold=threshold
+        ))
+    return comparisons
+
+
+def _fmt_time(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f}{unit}'
+    return f'{seconds / 1e-9:.0f}ns'
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    width = max([len(r.name) for r in results] + [4])
+    lines = [f'{"name":<{width}}  {"median":>10}  {"min":>10}  {"noise":>6}']
+    for r in results:
+        lines.append(
+            f'{r.name:<{width}}  {_fmt_time(r.median):>10}  '
+            f'{_fmt_time(r.min):>10}  {r.noise:>6.1%}'
+        )
+    return '\n'.join(lines)
+
+
+def format_comparisons(comparisons: List[Comparison]) -> str:
+    width = max([len(c.name) for c in comparisons] + [4])
+    lines = [
+        f'{"name":<{width}}  {"baseline":>10}  {"current":>10}  '
+        f'{"change":>8}  {"thresh":>6}  status'
+    ]
+    for c in comparisons:
+        lines.append(
+            f'{c.name:<{width}}  {_fmt_time(c.baseline):>10}  '
+            f'{_fmt_time(c.current):>10}  {c.ratio - 1:>+8.1%}  '
+            f'{c.threshold:>6.1%}  {c.status}'
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,113 @@
+"""A bounded LRU cache of legal moves, shared by every `ChessBoard` and keyed
+by position hash, so boards that reach the same position by different move
+orders (or are rebuilt from the same FEN) share the work.
+
+It's off unless the `cache.size` option is set to the number of positions to
+keep:
+
+    >>> set_option('cache.size', 10_000)
+    >>> board.all_valid_moves()  # Computed.
+    >>> other_board.all_valid_moves()  # Same position: from the cache.
+    >>> cache.stats()
+    CacheStats(hits=1, misses=1, evictions=0, size=1, maxsize=10000)
+
+The position hash covers the pieces, the side to move and castling rights,
+which is everything the legal moves depend on (the board doesn't support en
+passant). Repetitions and the move clocks aren't part of it, so only the moves
+and whether there are any are cached, not draws.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from .config import get_option
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class PositionCache(object):
+    """Maps a key to a dict of named values, evicting the least recently used
+    key once there are more than `maxsize`. Safe to share between threads."""
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Any, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Any, *names: str) -> Optional[Any]:
+        """The first of the named values cached for `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                for name in names:
+                    if name in entry:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return entry[name]
+            self.misses += 1
+            return None
+
+    def put(self, key: Any, name: str, value: Any) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {}
+            else:
+                self._entries.move_to_end(key)
+            entry[name] = value
+            self._evict()
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions,
+                              len(self._entries), self.maxsize)
+
+
+shared = PositionCache()
+
+
+def active() -> Optional[PositionCache]:
+    """The shared cache, sized to the `cache.size` option, or None if the
+    option is 0."""
+    size = get_option('cache.size')
+    if not size:
+        return None
+    if size != shared.maxsize:
+        shared.resize(size)
+    return shared
+
+
+def stats() -> CacheStats:
+    return shared.stats()
+
+
+def clear() -> None:
+    shared.clear()
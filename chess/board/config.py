@@ -1,4 +1,6 @@
-from typing import Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
 
 DEFAULT_OPTIONS = {
     'display.size': 'big',  # 'big', 'medium', 'small'
@@ -6,31 +8,78 @@ DEFAULT_OPTIONS = {
     'display.figurine': False,
     'api.notation_mismatch': 'error',  # 'error', 'warn', or 'ignore'
     'api.notifications': False,
-    'api.safe_mode': True
+    'api.safe_mode': True,
+    'cache.size': 0  # Positions kept in the shared move cache; 0 is off.
 }
 
+# Process-wide options. `option_context` layers context-local overrides on
+# top, so threads and asyncio tasks can each use their own settings without
+# touching this dict.
 options = DEFAULT_OPTIONS.copy()
 ALL = '*'
 
+_overrides: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    'chess_board_options', default=None
+)
+
+
+def _lookup(key: str):
+    local = _overrides.get()
+    if local is not None and key in local:
+        return local[key]
+    return options[key]
+
 
 def get_option(key: str):
     try:
         getter = _SPECIAL_GETTERS[key]
     except KeyError:
-        return globals()['options'][key]
+        return _lookup(key)
     else:
         return getter()
 
 
 def set_option(key: str, val: Any):
-    globals()['options'][key] = val
+    """Inside an `option_context` this only changes the current context;
+    otherwise it changes the option for the whole process."""
+    local = _overrides.get()
+    if local is None:
+        options[key] = val
+    else:
+        # Copy on write: other contexts may hold a reference to `local`.
+        _overrides.set({**local, key: val})
 
 
 def reset_option(key: str):
-    if key == ALL:
-        globals()['options'] = DEFAULT_OPTIONS.copy()
+    defaults = DEFAULT_OPTIONS if key == ALL else {key: DEFAULT_OPTIONS[key]}
+    local = _overrides.get()
+    if local is None:
+        # Updated in place, so readers never see a missing key.
+        options.update(defaults)
     else:
-        globals()['options'].update({key: DEFAULT_OPTIONS[key]})
+        _overrides.set({**local, **defaults})
+
+
+@contextmanager
+def option_context(*args: Dict[str, Any], **kwargs: Any) -> Iterator[None]:
+    """Sets options for the current context only (this thread, or this
+    asyncio task), restoring them on exit. Dotted keys go in a dict:
+
+        >>> with option_context({'display.size': 'small'}):
+        ...     print(board)
+    """
+    new = {}
+    for d in args:
+        new.update(d)
+    new.update(kwargs)
+    for key in new:
+        if key not in DEFAULT_OPTIONS:
+            raise KeyError(key)
+    token = _overrides.set({**(_overrides.get() or {}), **new})
+    try:
+        yield
+    finally:
+        _overrides.reset(token)
 
 
 # ~~~~~~
@@ -39,7 +88,7 @@ def _get_api_notation_mismatch():
     if not get_option('api.safe_mode'):
         return 'ignore'
     else:
-        return globals()['options']['api.notation_mismatch']
+        return _lookup('api.notation_mismatch')
 
 
 _SPECIAL_GETTERS = {
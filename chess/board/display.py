@@ -1,7 +1,9 @@
 from .grid import CharNumGrid
-from .config import get_option
-from .pieces import ChessPiece
-from typing import Optional, List
+from .config import get_option, option_context
+from .pieces import ChessPiece, ALL_PIECES
+from functools import lru_cache
+from itertools import chain
+from typing import Optional, List, Iterable, Tuple, TextIO, Callable
 
 
 def _tile_repr(
@@ -79,3 +81,298 @@ def repr_grid(
     else:
         res = '\n'.join(rows)
     return _axis_labels(res, x_padding=x_padding, border=border)
+
+
+# ~~~~~~ Fast rendering
+#
+# `repr_grid` builds every border and label from scratch. The functions below
+# build the frame once per combination of options, by running `repr_grid` on a
+# grid of placeholders, and then only fill in the 64 squares.
+
+SIZES = {
+    'big': (1, True),
+    'medium': (0, True),
+    'small': (0, False)
+}
+
+# Squares of a flattened `_mat` (x * 8 + y) in the order they're drawn: rank 8
+# first, each rank from the a-file to the h-file.
+DRAW_ORDER = [x * 8 + y for y in reversed(range(8)) for x in range(8)]
+
+_SLOT = '\x00'
+
+
+class _Slot(object):
+    char = _SLOT
+
+
+@lru_cache(maxsize=None)
+def _slot_frame(size: str, axis_labels: bool) -> str:
+    x_padding, border = SIZES[size]
+    slots = [[_Slot()] * 8 for _ in range(8)]
+    with option_context({'display.axis_labels': axis_labels}):
+        return repr_grid(slots, x_padding, border)
+
+
+@lru_cache(maxsize=None)
+def text_frame(size: str, axis_labels: bool) -> str:
+    """The diagram for `size` with a `{}` where each square goes, in
+    `DRAW_ORDER`."""
+    frame = _slot_frame(size, axis_labels)
+    return frame.replace('{', '{{').replace('}', '}}').replace(_SLOT, '{}')
+
+
+@lru_cache(maxsize=None)
+def slot_positions(size: str, axis_labels: bool) -> Tuple[Tuple[int, int]]:
+    """(line, column) of each square in the diagram, zero-based, indexed by
+    square (`x * 8 + y`)."""
+    found = [
+        (i, j)
+        for i, line in enumerate(_slot_frame(size, axis_labels).split('\n'))
+        for j, char in enumerate(line)
+        if char == _SLOT
+    ]
+    positions = [None] * 64
+    for sq, pos in zip(DRAW_ORDER, found):
+        positions[sq] = pos
+    return tuple(positions)
+
+
+@lru_cache(maxsize=None)
+def piece_chars(figurine: bool) -> dict:
+    """`(piece type, color) -> character`, for looking up without going
+    through `ChessPiece.char` and `get_option` on every square."""
+    with option_context({'display.figurine': figurine}):
+        return {
+            (t, color): t(color).char
+            for t in ALL_PIECES for color in ('white', 'black')
+        }
+
+
+def text_renderer(
+        size: Optional[str] = None,
+        axis_labels: Optional[bool] = None,
+        figurine: Optional[bool] = None
+) -> Callable[[CharNumGrid], str]:
+    """A function drawing boards the way `repr` does. The options are read
+    once, here, rather than for every board."""
+    size = size or get_option('display.size')
+    if axis_labels is None:
+        axis_labels = get_option('display.axis_labels')
+    if figurine is None:
+        figurine = get_option('display.figurine')
+    template = text_frame(size, axis_labels).format
+    chars = piece_chars(figurine)
+    blank = ' ' if SIZES[size][1] else '·'
+    order = DRAW_ORDER
+
+    def render(board: CharNumGrid) -> str:
+        cells = list(chain.from_iterable(board._mat))
+        return template(*[
+            blank if p is None else chars[p.__class__, p.color]
+            for p in map(cells.__getitem__, order)
+        ])
+
+    return render
+
+
+def render(board: CharNumGrid, size: Optional[str] = None) -> str:
+    return text_renderer(size)(board)
+
+
+class TerminalView(object):
+    """Keeps a board drawn on an ANSI terminal up to date by sending only the
+    squares that changed since the last frame, each as a cursor move and a
+    character. The first frame (and the one after `reset`) is drawn in full.
+
+    Each view draws at its own `row` and `column` (1-based, as in ANSI), so
+    many boards can share one screen:
+
+        >>> views = [TerminalView(row=1, column=1 + 40 * i) for i in range(4)]
+        >>> for view, board in zip(views, boards):
+        ...     sys.stdout.write(view.update(board))
+    """
+
+    def __init__(
+            self,
+            row: int = 1,
+            column: int = 1,
+            size: Optional[str] = None,
+            axis_labels: Optional[bool] = None,
+            figurine: Optional[bool] = None
+    ):
+        self.row = row
+        self.column = column
+        self.size = size or get_option('display.size')
+        if axis_labels is None:
+            axis_labels = get_option('display.axis_labels')
+        if figurine is None:
+            figurine = get_option('display.figurine')
+        self._render = text_renderer(self.size, axis_labels, figurine)
+        self._positions = slot_positions(self.size, axis_labels)
+        self._chars = piece_chars(figurine)
+        self._blank = ' ' if SIZES[self.size][1] else '·'
+        self._last: Optional[List[str]] = None
+
+    def _cursor(self, line: int, col: int) -> str:
+        return f'\x1b[{self.row + line};{self.column + col}H'
+
+    def reset(self) -> None:
+        """Draw the whole board again on the next `update`, e.g. after the
+        screen was cleared."""
+        self._last = None
+
+    def update(self, board: CharNumGrid) -> str:
+        """The escape sequences that bring the screen from the last frame
+        to `board`. Empty if nothing changed."""
+        blank, chars = self._blank, self._chars
+        current = [
+            blank if p is None else chars[p.__class__, p.color]
+            for p in chain.from_iterable(board._mat)
+        ]
+        last, self._last = self._last, current
+        if last is None:
+            return ''.join(
+                f'{self._cursor(i, 0)}{line}'
+                for i, line in enumerate(self._render(board).split('\n'))
+            )
+        out = []
+        # Where the terminal's cursor is after the last write, so a change
+        # right next to it (on 'small' boards) needs no cursor move.
+        cursor = None
+        for sq in DRAW_ORDER:
+            char = current[sq]
+            if char == last[sq]:
+                continue
+            pos = self._positions[sq]
+            if pos != cursor:
+                out.append(self._cursor(*pos))
+            out.append(char)
+            cursor = pos[0], pos[1] + 1
+        return ''.join(out)
+
+    def write(self, board: CharNumGrid, stream: TextIO) -> None:
+        stream.write(self.update(board))
+        stream.flush()
+
+
+# ~~~~~~ SVG and HTML
+
+SVG_LIGHT = '#f0d9b5'
+SVG_DARK = '#b58863'
+
+
+@lru_cache(maxsize=None)
+def _svg_frame(square: int, axis_labels: bool) -> Tuple[str, Tuple[str, ...]]:
+    """The board's background, and an opening `<text>` tag for each square
+    (indexed `x * 8 + y`)."""
+    margin = square // 2 if axis_labels else 0
+    side = 8 * square + 2 * margin
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{side}" '
+        f'height="{side}" viewBox="0 0 {side} {side}">',
+        f'<rect width="{side}" height="{side}" fill="{SVG_LIGHT}"/>',
+    ]
+    tags = [''] * 64
+    for x in range(8):
+        for y in range(8):
+            left, top = margin + x * square, margin + (7 - y) * square
+            if (x + y) % 2 == 0:
+                parts.append(
+                    f'<rect x="{left}" y="{top}" width="{square}" '
+                    f'height="{square}" fill="{SVG_DARK}"/>'
+                )
+            tags[x * 8 + y] = (
+                f'<text x="{left + square // 2}" '
+                f'y="{top + square // 2}">'
+            )
+    if axis_labels:
+        label = (f'<g font-family="sans-serif" font-size="{margin * 2 // 3}" '
+                 f'text-anchor="middle" dominant-baseline="central">')
+        parts.append(label)
+        for i in range(8):
+            mid = margin + i * square + square // 2
+            parts.append(f'<text x="{mid}" y="{side - margin // 2}">'
+                         f'{"abcdefgh"[i]}</text>')
+            parts.append(f'<text x="{margin // 2}" y="{mid}">{8 - i}</text>')
+        parts.append('</g>')
+    parts.append(
+        f'<g font-family="serif" font-size="{square * 4 // 5}" '
+        f'text-anchor="middle" dominant-baseline="central">'
+    )
+    return ''.join(parts), tuple(tags)
+
+
+def render_svg(
+        board: CharNumGrid,
+        square: int = 45,
+        axis_labels: Optional[bool] = None
+) -> str:
+    """The board as a standalone SVG image, `square` pixels per square."""
+    if axis_labels is None:
+        axis_labels = get_option('display.axis_labels')
+    frame, tags = _svg_frame(square, axis_labels)
+    chars = piece_chars(True)
+    return ''.join([frame, *[
+        f'{tags[sq]}{chars[p.__class__, p.color]}</text>'
+        for sq, p in enumerate(chain.from_iterable(board._mat))
+        if p is not None
+    ], '</g></svg>'])
+
+
+@lru_cache(maxsize=None)
+def _html_frame(axis_labels: bool) -> str:
+    rows = []
+    for y in reversed(range(8)):
+        cells = [f'<th>{y + 1}</th>'] if axis_labels else []
+        cells.extend(
+            f'<td class="{"dark" if (x + y) % 2 == 0 else "light"}">{{}}</td>'
+            for x in range(8)
+        )
+        rows.append(f'<tr>{"".join(cells)}</tr>')
+    if axis_labels:
+        rows.append('<tr><th></th>%s</tr>' % ''.join(
+            f'<th>{i}</th>' for i in 'abcdefgh'
+        ))
+    return f'<table class="chessboard">{"".join(rows)}</table>'
+
+
+def render_html(board: CharNumGrid, axis_labels: Optional[bool] = None) -> str:
+    """The board as an HTML `<table class="chessboard">`, one figurine per
+    cell, with 'light' and 'dark' classes on the cells for styling."""
+    if axis_labels is None:
+        axis_labels = get_option('display.axis_labels')
+    chars = piece_chars(True)
+    cells = list(chain.from_iterable(board._mat))
+    return _html_frame(axis_labels).format(*[
+        '' if p is None else chars[p.__class__, p.color]
+        for p in map(cells.__getitem__, DRAW_ORDER)
+    ])
+
+
+FORMATS = {
+    'text': lambda **kwargs: text_renderer(**kwargs),
+    'svg': lambda **kwargs: lambda board: render_svg(board, **kwargs),
+    'html': lambda **kwargs: lambda board: render_html(board, **kwargs),
+}
+
+
+def write_diagrams(
+        boards: Iterable[CharNumGrid],
+        stream: TextIO,
+        format: str = 'text',
+        separator: str = '\n\n',
+        **kwargs
+) -> int:
+    """Write a diagram of every board to `stream`, with `separator` after
+    each, and return how many were written. The options and the frame are
+    looked up once for the whole run. `kwargs` go to the renderer for
+    `format` ('text', 'svg' or 'html')."""
+    draw = FORMATS[format](**kwargs)
+    write = stream.write
+    n = 0
+    for board in boards:
+        write(draw(board))
+        write(separator)
+        n += 1
+    return n
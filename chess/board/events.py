@@ -0,0 +1,59 @@
+"""Events a `ChessBoard` publishes to its subscribers after each move.
+
+    >>> board.subscribe('check', lambda event: print(event.color, 'checks'))
+
+Every move publishes 'move', then 'capture' and 'castle' when they apply, then
+'check', 'mate' and 'draw' for the position the move leaves. 'check' is also
+published for a checkmate. Working out check, mate or a draw takes time, so
+the board only does it when someone has subscribed to that event.
+
+The `api.notifications` option subscribes `print_notification` to 'check',
+'mate' and 'draw' for every move, on top of the board's own subscribers.
+"""
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from .moves import Move
+from .pieces import ChessPiece
+from .utils import invert_color
+
+EVENTS = ('move', 'capture', 'castle', 'check', 'mate', 'draw')
+
+
+class BoardEvent(NamedTuple):
+    name: str
+    board: Any
+    move: Move
+    # The side that made the move.
+    color: str
+    captured: Optional[ChessPiece] = None
+    # Why the game is drawn, for 'draw'; see `ChessBoard.draw`.
+    reason: Optional[str] = None
+
+
+Listener = Callable[[BoardEvent], Any]
+
+
+def print_notification(event: BoardEvent) -> None:
+    """Prints who won, who is in check, or that the game is drawn."""
+    enemy = invert_color(event.color)
+    if event.name == 'mate':
+        print(f'{event.color} wins!')
+    elif event.name == 'check':
+        # 'check' comes first for a mate too, which 'mate' reports instead.
+        if not event.board.player_in_checkmate(enemy):
+            print(f'{enemy} is in check.')
+    elif event.name == 'draw':
+        print('The game is a draw.')
+
+
+NOTIFICATIONS = ('check', 'mate', 'draw')
+
+
+def with_notifications(
+        listeners: Optional[Dict[str, Tuple[Listener, ...]]]
+) -> Dict[str, Tuple[Listener, ...]]:
+    """`listeners`, plus `print_notification` for the `NOTIFICATIONS`."""
+    listeners = dict(listeners or {})
+    for name in NOTIFICATIONS:
+        listeners[name] = listeners.get(name, ()) + (print_notification,)
+    return listeners
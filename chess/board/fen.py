@@ -0,0 +1,142 @@
+"""Forsyth-Edwards Notation (FEN) import and export for `ChessBoard`.
+
+En passant targets are not supported by the board yet, so they are ignored on
+the way in and always written as '-' on the way out.
+"""
+from copy import copy
+from typing import TYPE_CHECKING
+
+from .grid import Loc
+from .pieces import King, Pawn, Rook, PIECE_NAME_TO_TYPE
+
+if TYPE_CHECKING:
+    from .main import ChessBoard
+
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# Which king and rook have to be unmoved for each castling right.
+CASTLING_SQUARES = {
+    'K': ('white', 'e1', 'h1'),
+    'Q': ('white', 'e1', 'a1'),
+    'k': ('black', 'e8', 'h8'),
+    'q': ('black', 'e8', 'a8')
+}
+
+PAWN_STARTING_RANKS = {
+    'white': 1,
+    'black': 6
+}
+
+
+class InvalidFen(ValueError):
+    pass
+
+
+def load_fen(board: 'ChessBoard', fen: str) -> 'ChessBoard':
+    """Sets up `board` in place from a FEN string. The board's move counter is
+    derived from the fullmove number and the side to move, since that is how
+    `ChessBoard.whose_turn` is computed."""
+    fields = fen.split()
+    if len(fields) < 2:
+        raise InvalidFen('A FEN needs at least a placement and a side to move.')
+    placement, side, *rest = fields
+    castling = rest[0] if len(rest) > 0 else '-'
+    halfmove = rest[2] if len(rest) > 2 else '0'
+    fullmove = rest[3] if len(rest) > 3 else '1'
+
+    ranks = placement.split('/')
+    if len(ranks) != 8:
+        raise InvalidFen('A FEN placement needs exactly 8 ranks.')
+    if side not in ('w', 'b'):
+        raise InvalidFen(f'Unknown side to move: {side!r}.')
+
+    board.clear()
+    king_locs = {'white': None, 'black': None}
+    for y, rank in zip(range(7, -1, -1), ranks):
+        x = 0
+        for char in rank:
+            if char.isdigit():
+                x += int(char)
+                continue
+            piece_type = PIECE_NAME_TO_TYPE.get(char.upper())
+            if piece_type is None or x > 7:
+                raise InvalidFen(f'Bad rank in FEN placement: {rank!r}.')
+            color = 'white' if char.isupper() else 'black'
+            piece = piece_type(color)
+            if isinstance(piece, Pawn):
+                piece.has_moved = y != PAWN_STARTING_RANKS[color]
+            elif isinstance(piece, (King, Rook)):
+                piece.has_moved = True
+            if isinstance(piece, King):
+                king_locs[color] = Loc(x, y).charnum
+            board[x, y] = piece
+            x += 1
+        if x != 8:
+            raise InvalidFen(f'Bad rank in FEN placement: {rank!r}.')
+    if None in king_locs.values():
+        raise InvalidFen('Both sides need a king.')
+
+    if castling != '-':
+        for right in castling:
+            try:
+                color, king_loc, rook_loc = CASTLING_SQUARES[right]
+            except KeyError:
+                raise InvalidFen(f'Unknown castling right: {right!r}.')
+            king, rook = board[king_loc], board[rook_loc]
+            if (
+                isinstance(king, King) and king.color == color
+                and isinstance(rook, Rook) and rook.color == color
+            ):
+                # Pieces may be shared with other boards, so swap in unmoved
+                # copies rather than changing these ones.
+                king, rook = copy(king), copy(rook)
+                king.has_moved = rook.has_moved = False
+                board[king_loc], board[rook_loc] = king, rook
+
+    board._king_locs = king_locs
+    board._winner = None
+    board._moves = 2 * (max(int(fullmove), 1) - 1) + (side == 'b')
+    board._reset_history(halfmove_clock=int(halfmove))
+    return board
+
+
+def castling_rights(board: 'ChessBoard') -> str:
+    rights = ''
+    for right, (color, king_loc, rook_loc) in CASTLING_SQUARES.items():
+        king, rook = board[king_loc], board[rook_loc]
+        if (
+            isinstance(king, King) and king.color == color
+            and not king.has_moved
+            and isinstance(rook, Rook) and rook.color == color
+            and not rook.has_moved
+        ):
+            rights += right
+    return rights or '-'
+
+
+def dump_fen(board: 'ChessBoard') -> str:
+    ranks = []
+    for y in range(7, -1, -1):
+        rank = ''
+        empty = 0
+        for x in range(8):
+            piece = board[x, y]
+            if piece is None:
+                empty += 1
+                continue
+            if empty:
+                rank += str(empty)
+                empty = 0
+            rank += (
+                piece._char if piece.color == 'white'
+                else piece._char.lower()
+            )
+        if empty:
+            rank += str(empty)
+        ranks.append(rank)
+    side = 'w' if board.whose_turn == 'white' else 'b'
+    fullmove = board.moves // 2 + 1
+    return (
+        f'{"/".join(ranks)} {side} {castling_rights(board)} - '
+        f'{board.halfmove_clock} {fullmove}'
+    )
@@ -1,5 +1,5 @@
 """Affine field maths; no references to chess (except in this docstring)"""
-from typing import Iterable, Any, Tuple, NamedTuple, List
+from typing import Iterable, Any, Tuple, NamedTuple, List, Optional
 import string
 import math
 from .utils import sign
@@ -68,6 +68,7 @@ class Grid(object):
 
     def __init__(self, x: int, y: int):
         self._mat = [[None for i in range(x)] for j in range(y)]
+        self._dimensions = (y, x)
 
     def __getitem__(self, key: tuple):
         if key[0] < 0 or key[1] < 0:
@@ -85,7 +86,7 @@ class Grid(object):
 
     @property
     def dimensions(self) -> Tuple[int, int]:
-        return len(self._mat), len(self._mat[0])
+        return self._dimensions
 
     def move_from_to(
             self,
@@ -109,34 +110,30 @@ class Grid(object):
         )
 
     def clear(self):
-        for i in range(self.dimensions[0]):
-            for j in range(self.dimensions[1]):
-                self.__setitem__(Loc(i, j), None)
+        self.fill(None)
+
+    def fill(self, val: Any):
+        # New lists rather than writes into the old ones, which may be shared
+        # with a copy of this grid.
+        x, y = self._dimensions
+        self._mat = [[val] * y for i in range(x)]
 
     @property
     def is_empty(self):
-        for i in range(self.dimensions[0]):
-            for j in range(self.dimensions[1]):
-                if self.__getitem__(Loc(i, j)) is not None:
-                    return False
-        else:
-            return True
+        return all(i is None for file_ in self._mat for i in file_)
 
     def __repr__(self):
         return '\n'.join([str(i) for i in self._mat])
 
     def __iter__(self):
-        self._idx = -1
-        return self
+        # A fresh generator each time, so that concurrent or nested loops
+        # over the same grid don't share a cursor.
+        for i in range(len(self)):
+            yield self[self._loc(i)]
 
     def _loc(self, val: int) -> Loc:
-        return Loc(val // self.dimensions[0], val % self.dimensions[1])
-
-    def __next__(self):
-        self._idx += 1
-        if self._idx >= len(self):
-            raise StopIteration
-        return self[self._loc(self._idx)]
+        x, y = self._dimensions
+        return Loc(val // x, val % y)
 
     @property
     def positions(self) -> list:
@@ -178,6 +175,95 @@ class CharNumGrid(Grid):
             return super().peek(Loc.from_charnum(loc), amount)
 
 
+class FlatGrid(Grid):
+    """A `Grid` stored as one `bytearray` of codes, indexed by `x * y_len + y`.
+
+    Each distinct value is given a one-byte code the first time it is stored
+    (code 0 is always `None`). The table of values is shared with copies and
+    only ever appended to, so a grid and all its copies hold at most 255
+    distinct values between them, and they must be hashable. This suits a
+    small, fixed set of values; anything else runs out of codes.
+
+    Subclasses that know every value up front set `_values` (values by code)
+    and `_encode` on the class instead. Those tables are shared by every grid
+    and left out of pickles, so a pickle holds little more than the cells."""
+
+    _values: Optional[List[Any]] = None
+
+    def __init__(self, x: int, y: int):
+        self._dimensions = (y, x)
+        self._cells = bytearray(x * y)
+        if self._values is None:
+            self._values = [None]
+            self._codes = {}
+
+    def _encode(self, val: Any) -> int:
+        if val is None:
+            return 0
+        try:
+            return self._codes[val]
+        except KeyError:
+            code = len(self._values)
+            if code > 255:
+                raise ValueError('A FlatGrid holds at most 255 values.')
+            self._values.append(val)
+            self._codes[val] = code
+            return code
+
+    @property
+    def _mat(self) -> List[list]:
+        """The values as lists of `y_len`, like `Grid._mat`, for code that
+        reads the grid that way. Built on each access, so writes to the lists
+        don't reach the grid."""
+        values, y = self._values, self._dimensions[1]
+        return [[values[c] for c in self._cells[i:i + y]]
+                for i in range(0, len(self._cells), y)]
+
+    def _index(self, key: tuple) -> int:
+        x, y = self._dimensions
+        if not (0 <= key[0] < x and 0 <= key[1] < y):
+            if key[0] < 0 or key[1] < 0:
+                raise IndexError('Must use non-negative integers in index.')
+            raise IndexError(f'Location {tuple(key)} is off the grid.')
+        return key[0] * y + key[1]
+
+    def __getitem__(self, key: tuple):
+        return self._values[self._cells[self._index(key)]]
+
+    def __setitem__(self, key: tuple, val: Any):
+        self._cells[self._index(key)] = self._encode(val)
+
+    @property
+    def codes(self) -> bytes:
+        """The cells' codes, in the order of iteration."""
+        return bytes(self._cells)
+
+    def fill(self, val: Any):
+        self._cells[:] = bytes([self._encode(val)]) * len(self._cells)
+
+    @property
+    def is_empty(self):
+        return not any(self._cells)
+
+    def copy(self) -> 'FlatGrid':
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new._cells = self._cells[:]
+        return new
+
+    def __iter__(self):
+        values = self._values
+        for code in self._cells:
+            yield values[code]
+
+    def __repr__(self):
+        return '\n'.join(str(i) for i in self._mat)
+
+
+class FlatCharNumGrid(CharNumGrid, FlatGrid):
+    """`CharNumGrid` addressing over `FlatGrid` storage."""
+
+
 def between(start: str, end: str, exclude_last: bool = False):
     """Returns half-open interval (excluding start, including end). Only
     works for locs that share a diagonal, row or column; assumes inputs are
@@ -0,0 +1,111 @@
+"""Opt-in call counters and timers for the board's hot paths.
+
+Nothing here runs until `enable()` is called: enabling swaps timed wrappers in
+place of the original functions, and `disable()` puts the originals back. So a
+disabled process runs exactly the same code it would without this module.
+
+    >>> from chess.board import instrumentation
+    >>> instrumentation.enable()
+    >>> ...
+    >>> instrumentation.snapshot()['valid_move']
+    {'calls': 1032, 'seconds': 0.41}
+
+Times are inclusive, so e.g. `valid_move` includes the time spent in `copy`.
+"""
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, Tuple
+
+from . import main
+
+# (owner, attribute name) for every function that gets instrumented. Module
+# level functions are patched on `main`, since that's where they are called
+# from. The hot paths covered are move validation (`valid_move`,
+# `_valid_move_after_shift_verification`, `_blocked`), king safety
+# (`attack_map`), `copy`, `parse_move` and drawing (`render`). King safety and
+# `repr(board)` used to go through `_in_kings_path` and `repr_grid`; neither is
+# called on a hot path any more, so they aren't counted.
+TARGETS: Tuple[Tuple[object, str], ...] = (
+    (main.ChessBoard, 'valid_move'),
+    (main.ChessBoard, '_valid_move_after_shift_verification'),
+    (main.ChessBoard, '_blocked'),
+    (main.ChessBoard, 'attack_map'),
+    (main.ChessBoard, 'copy'),
+    (main, 'parse_move'),
+    (main, 'render'),
+)
+
+_lock = threading.Lock()
+_originals: Dict[Tuple[object, str], Callable] = {}
+# name -> [calls, seconds]
+_stats: Dict[str, list] = {name: [0, 0.0] for _, name in TARGETS}
+
+
+def _timed(name: str, func: Callable) -> Callable:
+    stats = _stats[name]
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            with _lock:
+                stats[0] += 1
+                stats[1] += elapsed
+
+    return wrapper
+
+
+def enable() -> None:
+    with _lock:
+        for owner, name in TARGETS:
+            if (owner, name) in _originals:
+                continue
+            original = owner.__dict__[name]
+            _originals[owner, name] = original
+            setattr(owner, name, _timed(name, original))
+
+
+def disable() -> None:
+    with _lock:
+        for (owner, name), original in _originals.items():
+            setattr(owner, name, original)
+        _originals.clear()
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset() -> None:
+    with _lock:
+        for stats in _stats.values():
+            stats[0], stats[1] = 0, 0.0
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """Counters since the last `reset()`, as a plain dict that's safe to
+    serialize."""
+    with _lock:
+        return {
+            name: {'calls': calls, 'seconds': seconds}
+            for name, (calls, seconds) in _stats.items()
+        }
+
+
+@contextmanager
+def instrumented(reset_first: bool = True):
+    """Enable instrumentation for the duration of a `with` block."""
+    was_enabled = is_enabled()
+    if reset_first:
+        reset()
+    enable()
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
@@ -0,0 +1,501 @@
+"""Long analyses split into tasks, run from a queue on disk that survives
+crashes and can be shared by several machines.
+
+A job (deep perft, an evaluation of a whole PGN corpus, or mining a corpus
+for tactics) is split into tasks when it's submitted; each task is a JSON file
+that moves through three directories of the queue:
+
+    pending/  ->  claimed/  ->  done/
+
+Workers claim a task by renaming it into `claimed/`, which only one of them
+can do, and write its result into `done/`. The queue directory is the
+checkpoint: after a crash, running the job again skips everything in `done/`,
+and tasks whose worker died are put back in `pending/` once their lease runs
+out. Renames are atomic on a shared filesystem (e.g. NFS), so workers on other
+machines can join with:
+
+    python -m chess.board.jobs worker /shared/perft7
+
+Starting a job and its local workers:
+
+    python -m chess.board.jobs perft /shared/perft7 --depth 7 --split 3
+    python -m chess.board.jobs corpus /shared/eval games.pgn --shard-games 500
+    python -m chess.board.jobs tactics /shared/puzzles games.pgn
+    python -m chess.board.jobs status /shared/perft7
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .mate import MateSolver
+from .pgn import PgnGame, read_games
+from .pipeline import replay
+from . import perft as _perft
+from . import tactics as _tactics
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+
+# ~~~~~~ Jobs
+
+
+class Job(object):
+    """A job is described by its `params`, which must be JSON, so that a
+    worker anywhere can rebuild it from the queue's `job.json`."""
+    kind: str = None
+
+    def __init__(self, **params):
+        self.params = params
+
+    def tasks(self) -> Iterator[Any]:
+        """The payload of each task, as JSON-compatible values."""
+        raise NotImplementedError
+
+    def run_task(self, payload: Any) -> Any:
+        raise NotImplementedError
+
+    def reduce(self, results: List[Any]) -> Any:
+        """Combine the results of all the tasks, in task order."""
+        raise NotImplementedError
+
+
+class PerftJob(Job):
+    """Perft to `depth`, with one task per line of `split` plies."""
+    kind = 'perft'
+
+    def __init__(self, fen: str = START_FEN, depth: int = 6, split: int = 2):
+        if not 0 <= split < depth:
+            raise ValueError('split must be at least 0 and less than depth.')
+        super().__init__(fen=fen, depth=depth, split=split)
+
+    def tasks(self) -> Iterator[Any]:
+        for line in _perft.subtrees(self.params['fen'], self.params['split']):
+            yield {'moves': line}
+
+    def run_task(self, payload: Any) -> int:
+        return _perft.perft(
+            self.params['fen'], self.params['depth'] - self.params['split'],
+            moves=payload['moves']
+        )
+
+    def reduce(self, results: List[int]) -> int:
+        return sum(results)
+
+
+def summarize(game: PgnGame) -> Dict[str, Any]:
+    """The default corpus evaluation: games, plies that could be replayed,
+    games that couldn't be replayed to the end, and results."""
+    plies = sum(1 for _ in replay(game)) - 1
+    return {
+        'games': 1,
+        'plies': plies,
+        'unplayable': int(plies < len(game.moves)),
+        'results': {game.result or '*': 1}
+    }
+
+
+def _add(total: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    """Sum nested dicts of numbers into `total`."""
+    for k, v in part.items():
+        if isinstance(v, dict):
+            _add(total.setdefault(k, {}), v)
+        else:
+            total[k] = total.get(k, 0) + v
+    return total
+
+
+def _import(path: str):
+    module, _, name = path.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+def _game_starts(path: str) -> Iterator[int]:
+    """Byte offset of each game in a PGN file: the first game starts the
+    file, and each tag line after movetext starts another."""
+    yield 0
+    offset = 0
+    in_movetext = False
+    with open(path, 'rb') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith(b'[') and not stripped.startswith(b'[%'):
+                if in_movetext:
+                    yield offset
+                in_movetext = False
+            elif stripped:
+                in_movetext = True
+            offset += len(line)
+
+
+class CorpusJob(Job):
+    """Evaluates every game of some PGN files, in shards of `shard_games`.
+
+    `evaluate` is the import path ('module:function') of a function taking a
+    `PgnGame` and returning a dict of numbers (possibly nested); the job's
+    result is their sum. It has to be importable on every worker."""
+    kind = 'corpus'
+
+    def __init__(
+            self,
+            paths: List[str],
+            shard_games: int = 1000,
+            evaluate: str = 'chess.board.jobs:summarize'
+    ):
+        super().__init__(paths=[os.path.abspath(p) for p in paths],
+                         shard_games=shard_games, evaluate=evaluate)
+
+    def tasks(self) -> Iterator[Any]:
+        n = self.params['shard_games']
+        for path in self.params['paths']:
+            starts = list(_game_starts(path))
+            ends = [*starts[n::n], os.path.getsize(path)]
+            for i, (start, end) in enumerate(zip(starts[::n], ends)):
+                yield {'path': path, 'first_game': i * n,
+                       'start': start, 'end': end}
+
+    @staticmethod
+    def _games(payload: Any) -> Iterator[PgnGame]:
+        """The games of one shard, numbered from the start of the file."""
+        with open(payload['path'], 'rb') as f:
+            f.seek(payload['start'])
+            text = f.read(payload['end'] - payload['start'])
+        lines = text.decode('utf-8', errors='replace').splitlines()
+        for game in read_games(lines):
+            game.index += payload['first_game']
+            yield game
+
+    def run_task(self, payload: Any) -> Dict[str, Any]:
+        evaluate = _import(self.params['evaluate'])
+        total = {}
+        for game in self._games(payload):
+            _add(total, evaluate(game))
+        return total
+
+    def reduce(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        total = {}
+        for result in results:
+            _add(total, result)
+        return total
+
+
+class TacticJob(CorpusJob):
+    """Mines every game of some PGN files for tactics (see `tactics.py`), in
+    shards of `shard_games`. Each task's result is the puzzles of its shard,
+    as dicts. The job's result is the number of puzzles per motif; the
+    puzzles themselves are written to `output` as JSON lines, in game
+    order."""
+    kind = 'tactics'
+
+    def __init__(
+            self,
+            paths: List[str],
+            output: str,
+            shard_games: int = 1000,
+            mate_depth: int = 2,
+            min_gain: int = 200
+    ):
+        Job.__init__(self, paths=[os.path.abspath(p) for p in paths],
+                     output=os.path.abspath(output), shard_games=shard_games,
+                     mate_depth=mate_depth, min_gain=min_gain)
+
+    def run_task(self, payload: Any) -> List[Dict[str, Any]]:
+        solver = MateSolver(max_nodes=_tactics.MATE_NODES)
+        return [
+            puzzle._asdict()
+            for game in self._games(payload)
+            for puzzle in _tactics.mine_game(
+                game, self.params['mate_depth'], self.params['min_gain'],
+                solver
+            )
+        ]
+
+    def reduce(self, results: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        counts = {'puzzles': 0, 'found': 0,
+                  'motifs': {motif: 0 for motif in _tactics.MOTIFS}}
+        tmp = f'{self.params["output"]}.{uuid.uuid4().hex}.tmp'
+        with open(tmp, 'w') as f:
+            for puzzles in results:
+                for puzzle in puzzles:
+                    f.write(json.dumps(puzzle) + '\n')
+                    counts['puzzles'] += 1
+                    counts['found'] += puzzle['found']
+                    counts['motifs'][puzzle['motif']] += 1
+        os.replace(tmp, self.params['output'])
+        return counts
+
+
+JOBS = {cls.kind: cls for cls in (PerftJob, CorpusJob, TacticJob)}
+
+
+# ~~~~~~ The queue
+
+
+def _write_json(path: str, obj: Any) -> None:
+    """Write to a temporary file and rename it into place, so readers never
+    see half a file."""
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Any:
+    with open(path) as f:
+        return json.load(f)
+
+
+class FileQueue(object):
+
+    def __init__(self, directory: str, lease: float = 3600.0):
+        """
+        :param directory: Where the queue lives. It's created if needed.
+        :param lease: Seconds a claimed task may go without its worker
+                      checking in before it's given to another worker.
+        """
+        self.directory = directory
+        self.lease = lease
+        self.pending = os.path.join(directory, 'pending')
+        self.claimed = os.path.join(directory, 'claimed')
+        self.done = os.path.join(directory, 'done')
+        for d in (self.pending, self.claimed, self.done):
+            os.makedirs(d, exist_ok=True)
+        self._job_path = os.path.join(directory, 'job.json')
+
+    # Submitting
+
+    @property
+    def submitted(self) -> bool:
+        return os.path.exists(self._job_path)
+
+    def submit(self, job: Job) -> int:
+        """Queue the job's tasks, unless it's already been submitted; returns
+        the number of tasks. `job.json` is written last, so a submission cut
+        short is simply done again."""
+        if self.submitted:
+            spec = _read_json(self._job_path)
+            if spec['kind'] != job.kind or spec['params'] != job.params:
+                raise ValueError(
+                    f'{self.directory} already holds a different job.'
+                )
+            return spec['tasks']
+        done = set(os.listdir(self.done))
+        n = 0
+        for n, payload in enumerate(job.tasks(), 1):
+            name = f'{n - 1:08d}.json'
+            if name not in done:
+                _write_json(os.path.join(self.pending, name), payload)
+        _write_json(self._job_path,
+                    {'kind': job.kind, 'params': job.params, 'tasks': n})
+        return n
+
+    def job(self) -> Job:
+        spec = _read_json(self._job_path)
+        return JOBS[spec['kind']](**spec['params'])
+
+    # Working
+
+    def claim(self) -> Optional[Tuple[str, Any]]:
+        """Take a pending task, returning its name and payload, or None if
+        there are none left."""
+        for name in sorted(os.listdir(self.pending)):
+            if name.endswith('.tmp'):
+                continue
+            path = os.path.join(self.claimed, name)
+            try:
+                os.rename(os.path.join(self.pending, name), path)
+            except FileNotFoundError:
+                continue  # Another worker got there first.
+            self.renew(name)
+            return name, _read_json(path)
+        return None
+
+    def renew(self, name: str) -> None:
+        """Extend the lease on a claimed task."""
+        try:
+            os.utime(os.path.join(self.claimed, name))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, name: str, result: Any) -> None:
+        _write_json(os.path.join(self.done, name), result)
+        for d in (self.claimed, self.pending):
+            try:
+                os.remove(os.path.join(d, name))
+            except FileNotFoundError:
+                pass
+
+    def requeue_expired(self) -> int:
+        """Put tasks whose lease ran out back in `pending/`."""
+        n = 0
+        cutoff = time.time() - self.lease
+        for name in os.listdir(self.claimed):
+            path = os.path.join(self.claimed, name)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                if os.path.exists(os.path.join(self.done, name)):
+                    os.remove(path)
+                else:
+                    os.rename(path, os.path.join(self.pending, name))
+                    n += 1
+            except FileNotFoundError:
+                continue
+        return n
+
+    # Results
+
+    def progress(self) -> Dict[str, int]:
+        def count(d):
+            return sum(not i.endswith('.tmp') for i in os.listdir(d))
+        total = _read_json(self._job_path)['tasks'] if self.submitted else 0
+        return {'total': total, 'pending': count(self.pending),
+                'claimed': count(self.claimed), 'done': count(self.done)}
+
+    @property
+    def finished(self) -> bool:
+        progress = self.progress()
+        return self.submitted and progress['done'] == progress['total']
+
+    def results(self) -> List[Any]:
+        return [
+            _read_json(os.path.join(self.done, name))
+            for name in sorted(os.listdir(self.done))
+            if not name.endswith('.tmp')
+        ]
+
+
+# ~~~~~~ Running
+
+
+def work(directory: str, max_tasks: Optional[int] = None,
+         lease: float = 3600.0) -> int:
+    """Run tasks from the queue in `directory` until there are none left (or
+    `max_tasks` have been run). Returns how many were run. While a task runs,
+    a thread renews its lease, so only dead workers lose their tasks."""
+    queue = FileQueue(directory, lease=lease)
+    job = queue.job()
+    n = 0
+    while max_tasks is None or n < max_tasks:
+        queue.requeue_expired()
+        claimed = queue.claim()
+        if claimed is None:
+            break
+        name, payload = claimed
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(lease / 3):
+                queue.renew(name)
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        try:
+            result = job.run_task(payload)
+        finally:
+            stop.set()
+            beat.join()
+        queue.complete(name, result)
+        n += 1
+    return n
+
+
+def run(
+        job: Job,
+        directory: str,
+        processes: Optional[int] = None,
+        lease: float = 3600.0
+) -> Any:
+    """Submit `job` to the queue in `directory` (unless it's already there,
+    in which case this resumes it), work through it with `processes` local
+    workers, and return the reduced result. If other machines still hold
+    tasks when the local workers run out, this waits for them."""
+    queue = FileQueue(directory, lease=lease)
+    queue.submit(job)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        work(directory, lease=lease)
+    else:
+        workers = [
+            multiprocessing.Process(target=work,
+                                    args=(directory, None, lease))
+            for _ in range(processes)
+        ]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+    while not queue.finished:
+        time.sleep(min(lease / 10, 5.0))
+        work(directory, lease=lease)
+    return job.reduce(queue.results())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.board.jobs',
+        description='Run long analyses from a resumable queue on disk.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('perft', help='Start or resume a perft job.')
+    p.add_argument('directory')
+    p.add_argument('--fen', default=START_FEN)
+    p.add_argument('--depth', type=int, default=6)
+    p.add_argument('--split', type=int, default=2)
+
+    c = commands.add_parser('corpus', help='Start or resume a corpus job.')
+    c.add_argument('directory')
+    c.add_argument('pgn', nargs='+')
+    c.add_argument('--shard-games', type=int, default=1000)
+    c.add_argument('--evaluate', default='chess.board.jobs:summarize')
+
+    t = commands.add_parser('tactics',
+                            help='Start or resume mining games for puzzles.')
+    t.add_argument('directory')
+    t.add_argument('pgn', nargs='+')
+    t.add_argument('--output', default=None,
+                   help='Defaults to puzzles.jsonl in the directory.')
+    t.add_argument('--shard-games', type=int, default=1000)
+    t.add_argument('--mate-depth', type=int, default=2)
+    t.add_argument('--min-gain', type=int, default=200)
+
+    for sub in (p, c, t):
+        sub.add_argument('-j', '--processes', type=int, default=None)
+
+    w = commands.add_parser('worker', help='Work on a submitted job.')
+    w.add_argument('directory')
+
+    s = commands.add_parser('status', help='Show progress.')
+    s.add_argument('directory')
+
+    for sub in (p, c, t, w):
+        sub.add_argument('--lease', type=float, default=3600.0)
+
+    args = parser.parse_args(argv)
+    if args.command == 'perft':
+        job = PerftJob(args.fen, args.depth, args.split)
+    elif args.command == 'corpus':
+        job = CorpusJob(args.pgn, args.shard_games, args.evaluate)
+    elif args.command == 'tactics':
+        output = args.output or os.path.join(args.directory, 'puzzles.jsonl')
+        job = TacticJob(args.pgn, output, args.shard_games, args.mate_depth,
+                        args.min_gain)
+    elif args.command == 'worker':
+        n = work(args.directory, lease=args.lease)
+        print(f'{socket.gethostname()}: ran {n} tasks')
+        return
+    else:
+        print(FileQueue(args.directory).progress())
+        return
+    print(json.dumps(run(job, args.directory, args.processes, args.lease)))
+
+
+if __name__ == '__main__':
+    main()
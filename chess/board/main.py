@@ -1,17 +1,26 @@
 import re
-from typing import List, Optional, Type
-from copy import deepcopy
+import warnings
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type, Union
+from copy import copy
 from dataclasses import dataclass
 # TODO: upgrade to python3.8 for singledispatchmethod on `valid_move`?
 
-from .grid import CharNumGrid, Loc, Vector, decompose, between, vector_circle
+from .grid import (
+    CharNumGrid, FlatGrid, Loc, Vector, decompose, between, vector_circle
+)
 from .pieces import (
     ChessPiece, Rook, Knight, Bishop, Pawn, Queen, King,
-    PIECE_NAME_TO_TYPE, striking_distance
+    CODE_PIECES, PIECE_NAME_TO_TYPE, piece_code, striking_distance
 )
-from .display import repr_grid
+from .display import repr_grid, render
 from .config import get_option
+from .events import EVENTS, BoardEvent, Listener, with_notifications
+from .moves import Move
 from .utils import invert_color
+from . import attacks
+from . import cache as _cache
+from . import fen as _fen
+from . import zobrist
 
 # Note: this regex doesn't check by itself for invalid inputs; e.g. pawn
 # promotions only happen on 1 or 8, but this won't check for that.
@@ -42,6 +51,26 @@ class InvalidMove(Exception):
     pass
 
 
+class NotationMismatch(InvalidMove):
+    """Raised when `api.notation_mismatch` is 'error' and a move's notation
+    claims a capture, check or mate that the move doesn't make."""
+
+
+class NotationWarning(UserWarning):
+    """Warned when `api.notation_mismatch` is 'warn'."""
+
+
+# The ways a move's notation can misdescribe it; see `notation_mismatches`.
+# Playing a move doesn't hold a left out '+' or '#' against it, since plenty of
+# PGN sources leave them out, but `notation_mismatches` reports those too.
+FALSE_CAPTURE = 'false_capture'  # 'x', but nothing is taken
+MISSING_CAPTURE = 'missing_capture'  # A piece is taken, but no 'x'
+FALSE_CHECK = 'false_check'  # '+' or '#', but the king isn't attacked
+FALSE_MATE = 'false_mate'  # '#', but the king has a legal reply
+MISSING_CHECK = 'missing_check'  # The king is attacked, but no '+' or '#'
+MISSING_MATE = 'missing_mate'  # Mate, but no '#'
+
+
 CASTLE_IDENTIFIERS = {
     '0-0': 'kingside',
     'O-O': 'kingside',
@@ -56,6 +85,28 @@ STARTING_KING_LOCS = {
 }
 
 
+CASTLE_ROOK_LOCS = {
+    'white': {
+        'kingside': 'h1',
+        'queenside': 'a1'
+    },
+    'black': {
+        'kingside': 'h8',
+        'queenside': 'a8'
+    }
+}
+
+
+PROMOTION_TYPES = (Queen, Rook, Bishop, Knight)
+
+
+# Halfmove clock values (i.e. plies without a pawn move or capture) for the
+# 50-move rule, which a player may claim, and the 75-move rule, which applies
+# automatically.
+FIFTY_MOVE_PLIES = 100
+SEVENTY_FIVE_MOVE_PLIES = 150
+
+
 @dataclass
 class MoveAttributes:
     piece_type: Type
@@ -70,6 +121,19 @@ class MoveAttributes:
     checkmate: Optional[bool] = False
 
 
+class Undo(NamedTuple):
+    """What `ChessBoard.unmake_move` needs to take a move back: the move
+    itself, the pieces that were on the squares it touched, and the
+    bookkeeping from before it."""
+    move: Move
+    squares: Dict[str, Optional[ChessPiece]]
+    moves: int
+    halfmove_clock: int
+    king_locs: Dict[str, Optional[str]]
+    position_counts: Dict[int, int]
+    winner: Optional[str]
+
+
 def parse_move(m: str) -> MoveAttributes:
     """This function parses all non-castle moves."""
     regex_move = re.match(valid_move_regex, m)
@@ -93,14 +157,143 @@ class ChessBoard(CharNumGrid):
     _moves = 0
     _winner = None
     _king_locs = {'white': None, 'black': None}
+    _piece_hash = 0
+    _halfmove_clock = 0
+    # Attack maps for the current placement, filled in as they're asked for.
+    # Mutations rebind this rather than clearing it, since clones share it.
+    _attack_maps = None
+    # Event name -> tuple of listeners; see `subscribe`. Copies don't inherit
+    # listeners, since validation and search move pieces around on copies.
+    _listeners: Optional[Dict[str, Tuple[Listener, ...]]] = None
 
     def __init__(self, setup: bool = True) -> None:
+        # The `piece_code` of every square, as `x * 8 + y`, kept up to date
+        # alongside the grid; see `piece_codes`.
+        self._piece_codes = bytearray(64)
         super().__init__(8, 8)
+        self._king_locs = {'white': None, 'black': None}
+        self._reset_history()
         if setup:
             self.restart_game()
 
+    def __setitem__(self, key: str, val) -> None:
+        # Keep the Zobrist hash of the piece placement up to date.
+        if not isinstance(key, tuple):
+            key = Loc.from_charnum(key)
+        old = self[key]
+        super().__setitem__(key, val)
+        self._piece_codes[key[0] * 8 + key[1]] = piece_code(val)
+        self._attack_maps = None
+        self._piece_hash ^= (
+            zobrist.piece_key(old, key[0], key[1])
+            ^ zobrist.piece_key(val, key[0], key[1])
+        )
+
+    def fill(self, val) -> None:
+        # Bulk writes skip `__setitem__`, so rehash from scratch.
+        super().fill(val)
+        self._piece_codes[:] = bytes([piece_code(val)]) * 64
+        self._attack_maps = None
+        self._piece_hash = zobrist.piece_hash(self._mat)
+
+    @property
+    def piece_codes(self) -> bytes:
+        """The `pieces.piece_code` of every square, in the order of
+        `attacks.SQUARES` (a1, a2, ..., h8)."""
+        return bytes(self._piece_codes)
+
+    @classmethod
+    def from_fen(cls, fen: str) -> 'ChessBoard':
+        """Build a board from a FEN string. En passant targets are ignored."""
+        return _fen.load_fen(cls(setup=False), fen)
+
+    def fen(self) -> str:
+        return _fen.dump_fen(self)
+
     def copy(self) -> 'ChessBoard':
-        return deepcopy(self)
+        return self.clone()
+
+    def clone(self) -> 'ChessBoard':
+        """A structural copy: the files of the grid and the bookkeeping are
+        copied, but the pieces are shared. This is safe because the board never
+        mutates a piece once it's placed; see `_mark_moved`."""
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        self._copy_squares(new)
+        new._king_locs = self._king_locs.copy()
+        new._position_counts = self._position_counts.copy()
+        new._listeners = None
+        return new
+
+    def _copy_squares(self, new: 'ChessBoard') -> None:
+        new._mat = [file_[:] for file_ in self._mat]
+        new._piece_codes = self._piece_codes[:]
+
+    def subscribe(self, event: str, listener: Listener) -> Listener:
+        """Call `listener(BoardEvent)` whenever `event` happens; see
+        `events.py` for the events. Returns the listener, so it can be kept
+        for `unsubscribe`."""
+        if event not in EVENTS:
+            raise ValueError(f'{event} is not one of {", ".join(EVENTS)}.')
+        listeners = dict(self._listeners or {})
+        listeners[event] = listeners.get(event, ()) + (listener,)
+        self._listeners = listeners
+        return listener
+
+    def unsubscribe(self, event: str, listener: Listener) -> None:
+        listeners = dict(self._listeners or {})
+        remaining = tuple(i for i in listeners.get(event, ())
+                          if i != listener)
+        if remaining:
+            listeners[event] = remaining
+        else:
+            listeners.pop(event, None)
+        self._listeners = listeners or None
+
+    def _publish(
+            self,
+            move: Move,
+            color: str,
+            captured: Optional[ChessPiece] = None,
+            listeners: Optional[Dict[str, Tuple[Listener, ...]]] = None
+    ) -> None:
+        """Send the events for a move that was just made, to `listeners` or
+        else the subscribers. Check, mate and draws are only looked for if
+        something is listening for them."""
+        listeners = listeners or self._listeners
+
+        def send(name: str, **kwargs) -> None:
+            for listener in listeners.get(name, ()):
+                listener(BoardEvent(name, self, move, color, **kwargs))
+
+        send('move', captured=captured)
+        if captured is not None:
+            send('capture', captured=captured)
+        if move.is_castle:
+            send('castle')
+        enemy = invert_color(color)
+        if ('check' in listeners or 'mate' in listeners) \
+                and self.player_in_check(enemy):
+            send('check')
+            if 'mate' in listeners and not attacks.has_evasion(
+                    attacks.cells(self),
+                    attacks.SQUARES[self._king_locs[enemy]], enemy
+            ):
+                send('mate')
+                return
+        if 'draw' in listeners:
+            reason = self.draw
+            if reason:
+                send('draw', reason=reason)
+
+    def _mark_moved(self, loc: str) -> None:
+        """Pieces can be shared between cloned boards, so rather than setting
+        `has_moved` on the piece in place, swap in a moved copy of it."""
+        piece = self[loc]
+        if not piece.has_moved:
+            piece = copy(piece)
+            piece.has_moved = True
+            self[loc] = piece
 
     def restart_game(self) -> None:
         self._moves = 0
@@ -128,6 +321,70 @@ class ChessBoard(CharNumGrid):
         # that modifying this dict manually can be quite dangerous, so only let
         # the code modify it for you.
         self._king_locs = STARTING_KING_LOCS.copy()
+        self._reset_history()
+
+    @property
+    def position_hash(self) -> int:
+        """Zobrist hash of the pieces, side to move and castling rights."""
+        h = self._piece_hash ^ zobrist.castling_key(_fen.castling_rights(self))
+        return h ^ zobrist.SIDE_KEY if self._moves % 2 else h
+
+    @property
+    def halfmove_clock(self) -> int:
+        """Plies since the last pawn move or capture."""
+        return self._halfmove_clock
+
+    def _reset_history(self, halfmove_clock: int = 0) -> None:
+        # `_position_history` is a stack of every position's hash since the
+        # start of the game (or since the FEN it was loaded from), kept as
+        # linked (hash, rest) pairs. Pushing and popping never change a pair,
+        # so clones share the whole stack instead of copying it.
+        # `_position_counts` counts the hashes since the last pawn move or
+        # capture; positions from before one of those can never come back, so
+        # keeping the dict small makes it cheap to copy.
+        h = self.position_hash
+        self._position_history = (h, None)
+        self._position_counts = {h: 1}
+        self._halfmove_clock = halfmove_clock
+
+    def _record_position(self, irreversible: bool) -> None:
+        h = self.position_hash
+        self._position_history = (h, self._position_history)
+        if irreversible:
+            self._halfmove_clock = 0
+            self._position_counts = {h: 1}
+        else:
+            self._halfmove_clock += 1
+            self._position_counts[h] = self._position_counts.get(h, 0) + 1
+
+    def repetitions(self) -> int:
+        """How many times the current position has occurred."""
+        return self._position_counts.get(self._position_history[0], 0)
+
+    @property
+    def position_history(self) -> List[int]:
+        """The hash of every position so far, oldest first."""
+        hashes = []
+        node = self._position_history
+        while node is not None:
+            h, node = node
+            hashes.append(h)
+        hashes.reverse()
+        return hashes
+
+    def __getstate__(self) -> dict:
+        # The linked history would pickle as tuples nested one level per
+        # ply, which overflows the pickler's recursion limit in long games.
+        state = self.__dict__.copy()
+        state['_position_history'] = self.position_history
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        history = None
+        for h in state.pop('_position_history'):
+            history = (h, history)
+        self.__dict__.update(state)
+        self._position_history = history
 
     @property
     def winner(self) -> Optional[str]:
@@ -138,6 +395,29 @@ class ChessBoard(CharNumGrid):
                 return invert_color(color)
         return None
 
+    @property
+    def draw(self) -> Optional[str]:
+        """The reason the game is drawn, or None. The 75-move rule and fivefold
+        repetition end the game on their own; threefold repetition and the
+        50-move rule are the draws a player is entitled to claim."""
+        if self._halfmove_clock >= SEVENTY_FIVE_MOVE_PLIES:
+            # A checkmate on the last move still counts.
+            if not self.player_in_checkmate(self.whose_turn):
+                return 'seventy_five_move_rule'
+        if self.repetitions() >= 5:
+            return 'fivefold_repetition'
+        if (
+            not self.player_in_check(self.whose_turn)
+            and not self.all_valid_moves(stop_after_first=True)
+        ):
+            return 'stalemate'
+        if self.repetitions() >= 3:
+            return 'threefold_repetition'
+        if self._halfmove_clock >= FIFTY_MOVE_PLIES:
+            if not self.player_in_checkmate(self.whose_turn):
+                return 'fifty_move_rule'
+        return None
+
     def find_piece_locs(
             self,
             piece_name: Optional[str] = None,
@@ -200,8 +480,15 @@ class ChessBoard(CharNumGrid):
             return self
 
         # Skip everything else if the move is a castle.
-        if s in CASTLE_IDENTIFIERS:
-            return self.move_castle(s)
+        side = s.rstrip('+#')
+        if side in CASTLE_IDENTIFIERS:
+            if side != s:
+                mode = get_option('api.notation_mismatch')
+                loc, to = self._castle_squares(side)
+                if mode != 'ignore' and self.valid_move(loc, to):
+                    self._verify_notation(mode, loc, to, None, False, True,
+                                          s.endswith('#'))
+            return self.move_castle(side)
 
         # Get information from the input about the move
         move_attr = parse_move(s)
@@ -216,7 +503,12 @@ class ChessBoard(CharNumGrid):
                                  move_attr.move_to,
                                  attributes=move_attr)
 
-    def move_castle(self, side: str, notifications: Optional[bool] = None):
+    def move_castle(
+            self,
+            side: str,
+            notifications: Optional[bool] = None,
+            safe_mode: Optional[bool] = None
+    ):
         """Castling is a special move involving the simultaneous movement of two
         pieces. This method handles ALL the logic of a castle: i.e. it validates
         that the castle is a legal move, performs the movements, and increments
@@ -226,16 +518,8 @@ class ChessBoard(CharNumGrid):
         """
         if notifications is None:
             notifications = get_option('api.notifications')
-        ROOK_LOCS = {
-            'white': {
-                'kingside': 'h1',
-                'queenside': 'a1'
-            },
-            'black': {
-                'kingside': 'h8',
-                'queenside': 'a8'
-            }
-        }
+        if safe_mode is None:
+            safe_mode = get_option('api.safe_mode')
         SHIFTS = {
             'kingside': {
                 King: Vector(x=2, y=0),
@@ -250,29 +534,46 @@ class ChessBoard(CharNumGrid):
         castle_type = CASTLE_IDENTIFIERS[side]
         whose_turn = self.whose_turn
         old_king_loc = self._king_locs[whose_turn]
-        old_rook_loc = ROOK_LOCS[whose_turn][castle_type]
+        old_rook_loc = CASTLE_ROOK_LOCS[whose_turn][castle_type]
         new_king_loc = \
             (Loc.from_charnum(old_king_loc) + SHIFTS[castle_type][King]).charnum
         new_rook_loc = \
             (Loc.from_charnum(old_rook_loc) + SHIFTS[castle_type][Rook]).charnum
-        # Make sure the pieces haven't moved.
-        assert not self[old_king_loc].has_moved
-        assert not self[old_rook_loc].has_moved
-        # Check that all the spaces between the rook and king are empty.
+        if safe_mode and not (
+            isinstance(self[old_king_loc], King)
+            and self._castle_pieces_ready(old_king_loc, new_king_loc)
+            and self._castle_path_safe(old_king_loc, new_king_loc)
+        ):
+            raise InvalidMove(f'{side} is an invalid move.')
+        # Even without `safe_mode`, make sure the pieces are there and haven't
+        # moved, and that all the spaces between the rook and king are empty.
         # (Don't need to otherwise directly check rook can move 2-3 and king can
         # move 2; the following check is sufficient.)
-        assert not self._blocked(old_rook_loc, old_king_loc, exclude_last=True)
+        king, rook = self[old_king_loc], self[old_rook_loc]
+        if (
+            not isinstance(king, King) or king.has_moved
+            or not isinstance(rook, Rook) or rook.has_moved
+            or rook.color != whose_turn
+            or self._blocked(old_rook_loc, old_king_loc, exclude_last=True)
+        ):
+            raise InvalidMove(f'{side} is an invalid move.')
         # Now perform the moves.
         super().move_from_to(old_king_loc, new_king_loc)
         super().move_from_to(old_rook_loc, new_rook_loc)
         # Make sure the move didn't result in going into check.
         # Register that the move has taken place
         self._moves += 1
-        self[new_king_loc].has_moved = True
-        self[new_rook_loc].has_moved = True
+        self._mark_moved(new_king_loc)
+        self._mark_moved(new_rook_loc)
         self._king_locs[whose_turn] = new_king_loc
-        if notifications:
-            self._notifications()
+        self._record_position(irreversible=False)
+        listeners = with_notifications(self._listeners) if notifications \
+            else self._listeners
+        if listeners:
+            self._publish(
+                Move.make(old_king_loc, new_king_loc, castle=True), whose_turn,
+                listeners=listeners
+            )
         return None
 
     def _get_start_loc_from_move_attr(self, move_attr: MoveAttributes) -> str:
@@ -350,20 +651,24 @@ class ChessBoard(CharNumGrid):
 
     def move_from_to(
             self,
-            loc: str,
-            to: str,
+            loc: Union[str, Move],
+            to: Optional[str] = None,
             safe_mode: Optional[bool] = None,
             attributes: Optional[MoveAttributes] = None,
-            notifications: Optional[bool] = None
+            notifications: Optional[bool] = None,
+            promotion: Optional[Type] = None
     ) -> 'ChessBoard':
         """
 
-        :param loc:
+        :param loc: The square to move from, or a `Move`, in which case `to`
+                    and `promotion` are taken from it.
         :param to:
         :param safe_mode:
         :param attributes: Optional. These are all move attributes parsed out
                            from the string passed in `.move()`, if algebraic
                            notation is being used.
+        :param promotion: Optional. The piece type a pawn reaching the last
+                          rank is promoted to. Defaults to `Queen`.
         :return:
         """
         # First we need to validate if the move is possible:
@@ -375,6 +680,9 @@ class ChessBoard(CharNumGrid):
         #   eliminate bad Pawn moves.
         # - Check to make sure the move does not put the active player into
         #   check or checkmate.
+        if isinstance(loc, Move):
+            promotion = promotion or loc.promotion
+            loc, to = loc.loc, loc.to
         if safe_mode is None:
             safe_mode = get_option('api.safe_mode')
         if notifications is None:
@@ -386,28 +694,128 @@ class ChessBoard(CharNumGrid):
                 valid = self.valid_move(loc, to)
             if not valid:
                 raise InvalidMove(f'{loc} to {to} is an invalid move.')
+        # A king moving two files is a castle, which also moves the rook.
+        if isinstance(self[loc], King) and self._is_castle_shift(loc, to):
+            side = 'O-O' if to[0] > loc[0] else 'O-O-O'
+            self.move_castle(side, notifications=notifications,
+                             safe_mode=False)
+            return self
+        if promotion is None and attributes is not None:
+            promotion = attributes.pawn_promotion
+        if isinstance(self[loc], Pawn) and to[1] in '18':
+            promotion = promotion or Queen
+            if promotion not in PROMOTION_TYPES:
+                raise InvalidMove(f'Cannot promote to {promotion.__name__}.')
+        else:
+            promotion = None
+        if attributes is not None:
+            mode = get_option('api.notation_mismatch')
+            if mode != 'ignore':
+                self._verify_notation(
+                    mode, loc, to, promotion, attributes.capture,
+                    attributes.check or attributes.checkmate,
+                    attributes.checkmate
+                )
+        captured = self[to]
+        irreversible = isinstance(self[loc], Pawn) or captured is not None
         res = super().move_from_to(loc, to, overwrite=True)
-        self[to].has_moved = True
+        if promotion is not None:
+            self[to] = promotion(self[to].color)
+        self._mark_moved(to)
         if isinstance(self[to], King):
             self._king_locs[self[to].color] = to
         self._moves += 1
-        if notifications:
-            self._notifications()
+        self._record_position(irreversible=irreversible)
+        listeners = with_notifications(self._listeners) if notifications \
+            else self._listeners
+        if listeners:
+            self._publish(
+                Move.make(loc, to, promotion, capture=captured is not None),
+                self[to].color, captured, listeners
+            )
         return res
 
-    def _notifications(self):
-        if self.player_in_check(self.whose_turn):
-            if self.player_in_checkmate(self.whose_turn):
-                print(f'{self.whose_turn_it_isnt} wins!')
+    def parse_san(self, s: str) -> Move:
+        """The `Move` that the SAN move `s` names in this position, without
+        playing it. Whether it's legal is left to whoever plays it."""
+        side = s.rstrip('+#')
+        if side in CASTLE_IDENTIFIERS:
+            loc, to = self._castle_squares(side)
+            return Move.make(loc, to, castle=True)
+        move_attr = parse_move(s)
+        move_attr.player = self.whose_turn
+        loc = self._get_start_loc_from_move_attr(move_attr)
+        to = move_attr.move_to
+        promotion = None
+        if isinstance(self[loc], Pawn) and to[1] in '18':
+            promotion = move_attr.pawn_promotion or Queen
+        return Move.make(loc, to, promotion, capture=self[to] is not None)
+
+    def make_move(
+            self,
+            move: Union[Move, tuple],
+            safe_mode: Optional[bool] = None
+    ) -> Undo:
+        """Plays `move` and returns what `unmake_move` needs to take it back,
+        so that a position can be stepped forwards and backwards without
+        copying the board. Undos have to be unmade in the reverse order they
+        were made. `safe_mode` is as for `move_from_to`; moves already known
+        to be legal can skip the check with `safe_mode=False`."""
+        if not isinstance(move, Move):
+            move = Move.make(*move)
+        loc, to = move.loc, move.to
+        piece = self[loc]
+        if piece is None:
+            raise InvalidMove(f'There is no piece on {loc}.')
+        squares = {loc: piece, to: self[to]}
+        castle = isinstance(piece, King) and self._is_castle_shift(loc, to)
+        if castle:
+            rank = loc[1]
+            for file_ in ('hf' if to[0] > loc[0] else 'ad'):
+                squares[file_ + rank] = self[file_ + rank]
+        promotion = move.promotion
+        if promotion is None and isinstance(piece, Pawn) and to[1] in '18':
+            promotion = Queen
+        undo = Undo(
+            Move.make(loc, to, promotion, capture=self[to] is not None,
+                      castle=castle),
+            squares, self._moves, self._halfmove_clock,
+            self._king_locs.copy(), self._position_counts, self._winner
+        )
+        self.move_from_to(loc, to, safe_mode=safe_mode, notifications=False,
+                          promotion=promotion)
+        return undo
+
+    def unmake_move(self, undo: Undo) -> None:
+        """Takes back the move `undo` was returned for."""
+        for loc, piece in undo.squares.items():
+            self[loc] = piece
+        self._moves = undo.moves
+        self._halfmove_clock = undo.halfmove_clock
+        self._king_locs = undo.king_locs
+        self._winner = undo.winner
+        h, self._position_history = self._position_history
+        if self._position_counts is undo.position_counts:
+            # Counted in place, as the move was reversible.
+            n = self._position_counts[h] - 1
+            if n:
+                self._position_counts[h] = n
             else:
-                print(f'{self.whose_turn} is in check.')
-        elif not self.all_valid_moves(stop_after_first=True):
-            print('The game is a draw.')
+                del self._position_counts[h]
+        else:
+            self._position_counts = undo.position_counts
 
     def valid_moves_from_loc(
             self,
             loc: str,
     ) -> List[str]:
+        if _cache.active() is not None:
+            # Answered from the position's full move list, which is computed
+            # once and then shared with every other square's query.
+            return [m.to for m in self.all_valid_moves() if m.loc == loc]
+        return self._valid_moves_from_loc(loc)
+
+    def _valid_moves_from_loc(self, loc: str) -> List[str]:
         if not isinstance(self[loc], ChessPiece):
             return []
         return [
@@ -436,7 +844,7 @@ class ChessBoard(CharNumGrid):
                 val = val and isinstance(x, piece_type)
             return val
 
-        if tile_subset:
+        if tile_subset is not None:
             tile_subset = [i for i in tile_subset if valid_position(i)]
         else:
             tile_subset = self.positions
@@ -462,23 +870,291 @@ class ChessBoard(CharNumGrid):
             )
         ]
 
-    def all_valid_moves(self, stop_after_first: bool = False) -> list:
+    def all_valid_moves(self, stop_after_first: bool = False) -> List[Move]:
+        """Every legal move, one per from/to pair. Moves still unpack as
+        `loc, to = move`. With the `cache.size` option set, results are kept
+        in the cache shared by all boards; see `cache.py`."""
+        cache = _cache.active()
+        if cache is None:
+            return self._all_valid_moves(stop_after_first)
+        key = self.position_hash
+        if stop_after_first:
+            # Whether there are any moves is all that checkmate and stalemate
+            # need, and it's much cheaper than the full list.
+            moves = cache.get(key, 'moves', 'first')
+            if moves is None:
+                moves = self._all_valid_moves(stop_after_first=True)
+                cache.put(key, 'first', tuple(moves))
+            return list(moves[:1])
+        moves = cache.get(key, 'moves')
+        if moves is None:
+            moves = self._all_valid_moves()
+            cache.put(key, 'moves', tuple(moves))
+        return list(moves)
+
+    def _all_valid_moves(self, stop_after_first: bool = False) -> List[Move]:
         li = []
         for loc in self.positions:
-            for move in self.valid_moves_from_loc(loc):
-                li.append((loc, move))
+            piece = self[loc]
+            for to in self._valid_moves_from_loc(loc):
+                li.append(Move.make(
+                    loc, to,
+                    capture=self[to] is not None,
+                    castle=(isinstance(piece, King)
+                            and self._is_castle_shift(loc, to))
+                ))
                 if li and stop_after_first:
                     return li
         return li
 
+    def san(self, move: Union[Move, tuple]) -> str:
+        """The move in standard algebraic notation, e.g. 'Nbd7', 'exd5',
+        'e8=Q+' or 'O-O', for the current position. A pawn reaching the last
+        rank is promoted to a queen unless the move says otherwise.
+
+        Rather than asking `valid_move` about every other piece, or playing
+        the move on a copy and generating all replies, this works on one flat
+        list of the squares: rival pieces come from an attack lookup on the
+        destination, and legality, check and mate are answered by making
+        moves on that list and unmaking them again.
+        """
+        if not isinstance(move, Move):
+            move = Move.make(*move)
+        loc, to = move.loc, move.to
+        piece = self[loc]
+        if piece is None:
+            raise InvalidMove(f'There is no piece on {loc}.')
+        color = piece.color
+        squares = attacks.cells(self)
+        frm, dest = attacks.SQUARES[loc], attacks.SQUARES[to]
+        king_sq = attacks.SQUARES[self._king_locs[color]]
+        capture = squares[dest] is not None
+
+        if isinstance(piece, King) and self._is_castle_shift(loc, to):
+            s = 'O-O' if to[0] > loc[0] else 'O-O-O'
+            rook_frm, rook_to = (
+                (frm + 24, frm + 8) if to[0] > loc[0] else (frm - 32, frm - 8)
+            )
+            squares[rook_to], squares[rook_frm] = squares[rook_frm], None
+        elif isinstance(piece, Pawn):
+            s = f'{loc[0]}x{to}' if capture else to
+            if to[1] in '18':
+                promotion = move.promotion or Queen
+                s += '=' + promotion._char
+                piece = promotion(color)
+        else:
+            # Other pieces of the same kind that could legally move there.
+            rivals = [
+                sq for sq in attacks.attackers(squares, dest, color)
+                if sq != frm and type(squares[sq]) is type(piece)
+                and not attacks.leaves_king_attacked(squares, sq, dest,
+                                                     king_sq, color)
+            ]
+            s = piece._char
+            if rivals:
+                names = [attacks.SQUARE_NAMES[sq] for sq in rivals]
+                if all(name[0] != loc[0] for name in names):
+                    s += loc[0]
+                elif all(name[1] != loc[1] for name in names):
+                    s += loc[1]
+                else:
+                    s += loc
+            s += f'x{to}' if capture else to
+
+        squares[dest], squares[frm] = piece, None
+        check, mate = self._check_and_mate(squares, color)
+        if mate:
+            s += '#'
+        elif check:
+            s += '+'
+        return s
+
+    def _check_and_mate(self, squares: list, color: str) -> Tuple[bool, bool]:
+        """Whether `color`, having just moved on the flat `squares`, gives
+        check, and if so whether it's mate. Replies are only looked for when
+        the king is attacked."""
+        enemy = invert_color(color)
+        king_sq = attacks.SQUARES[self._king_locs[enemy]]
+        if not attacks.attackers(squares, king_sq, color):
+            return False, False
+        return True, not attacks.has_evasion(squares, king_sq, enemy)
+
+    def _castle_squares(self, side: str) -> Tuple[str, str]:
+        """Where the king of the side to move starts and ends a castle."""
+        loc = self._king_locs[self.whose_turn]
+        file_ = 'g' if CASTLE_IDENTIFIERS[side] == 'kingside' else 'c'
+        return loc, file_ + loc[1]
+
+    def _mismatches(
+            self,
+            loc: str,
+            to: str,
+            promotion: Optional[Type],
+            capture: bool,
+            check: bool,
+            mate: bool,
+            missing: bool = False
+    ) -> List[str]:
+        """Compares what notation claims about the legal move `loc` to `to`
+        with what it does, by playing it on a flat list of the squares. With
+        `missing`, check and mate markers that were left out count too."""
+        squares = attacks.cells(self)
+        frm, dest = attacks.SQUARES[loc], attacks.SQUARES[to]
+        piece = squares[frm]
+        mismatches = []
+        if capture != (squares[dest] is not None):
+            mismatches.append(FALSE_CAPTURE if capture else MISSING_CAPTURE)
+        if not (check or mate or missing):
+            return mismatches
+        if isinstance(piece, King) and self._is_castle_shift(loc, to):
+            rook_frm, rook_to = (
+                (frm + 24, frm + 8) if to[0] > loc[0] else (frm - 32, frm - 8)
+            )
+            squares[rook_to], squares[rook_frm] = squares[rook_frm], None
+        elif promotion is not None:
+            piece = promotion(piece.color)
+        squares[dest], squares[frm] = piece, None
+        gives_check, gives_mate = self._check_and_mate(squares, piece.color)
+        if check and not gives_check:
+            mismatches.append(FALSE_CHECK)
+        elif mate and not gives_mate:
+            mismatches.append(FALSE_MATE)
+        elif missing and gives_mate and not mate:
+            mismatches.append(MISSING_MATE)
+        elif missing and gives_check and not check:
+            mismatches.append(MISSING_CHECK)
+        return mismatches
+
+    def _verify_notation(
+            self,
+            mode: str,
+            loc: str,
+            to: str,
+            promotion: Optional[Type],
+            capture: bool,
+            check: bool,
+            mate: bool
+    ) -> None:
+        """Raises or warns, per `mode`, if the notation doesn't match."""
+        mismatches = self._mismatches(loc, to, promotion, capture, check, mate)
+        if not mismatches:
+            return
+        message = (
+            f'The notation for {loc} to {to} is wrong '
+            f'({", ".join(mismatches)}); it should be '
+            f'{self.san(Move.make(loc, to, promotion))}.'
+        )
+        if mode == 'error':
+            raise NotationMismatch(message)
+        warnings.warn(message, NotationWarning, stacklevel=4)
+
+    def notation_mismatches(self, s: str) -> List[str]:
+        """The ways the SAN move `s` misdescribes itself in this position, as
+        a list of the reason codes at the top of this module: empty if its
+        capture, check and mate markers are right, including that none were
+        left out. Raises `InvalidMove` if `s` isn't a legal move. The board
+        isn't changed.
+
+        Only the king's square is tested for attack after the move, and legal
+        replies are only searched for when it is attacked.
+        """
+        side = s.rstrip('+#')
+        if side in CASTLE_IDENTIFIERS:
+            loc, to = self._castle_squares(side)
+            if not self.valid_move(loc, to):
+                raise InvalidMove(f'{side} is an invalid move.')
+            return self._mismatches(loc, to, None, False, side != s,
+                                    s.endswith('#'), missing=True)
+        move_attr = parse_move(s)
+        move_attr.player = self.whose_turn
+        loc = self._get_start_loc_from_move_attr(move_attr)
+        to = move_attr.move_to
+        if not self.valid_move(loc, to):
+            raise InvalidMove(f'{loc} to {to} is an invalid move.')
+        promotion = None
+        if isinstance(self[loc], Pawn) and to[1] in '18':
+            promotion = move_attr.pawn_promotion or Queen
+        return self._mismatches(
+            loc, to, promotion, move_attr.capture,
+            move_attr.check or move_attr.checkmate, move_attr.checkmate,
+            missing=True
+        )
+
+    def static_exchange(self, move: Union[Move, tuple]) -> int:
+        """Static exchange evaluation: the material, in centipawns, that the
+        side making `move` gains (or, if negative, loses) once every
+        worthwhile recapture on the destination square has been made. A
+        quiet move scores 0 unless the piece can be won. See
+        `attacks.static_exchange`."""
+        if not isinstance(move, Move):
+            move = Move.make(*move)
+        if self[move.loc] is None:
+            raise InvalidMove(f'There is no piece on {move.loc}.')
+        promotion = move.promotion
+        if promotion is None and isinstance(self[move.loc], Pawn) \
+                and move.to[1] in '18':
+            promotion = Queen
+        return attacks.static_exchange(
+            attacks.cells(self), move.from_square, move.to_square, promotion
+        )
+
     def player_in_checkmate(self, color: str) -> bool:
         if self.player_in_check(color):
             if not self.all_valid_moves(stop_after_first=True):
                 return True
         return False
 
+    def attack_map(self, color: str) -> bytes:
+        """For every square (in `attacks` order, so `x * 8 + y`), how many
+        `color` pieces attack it. Computed on first use and kept until the
+        board next changes."""
+        maps = self._attack_maps
+        if maps is None:
+            maps = self._attack_maps = {}
+        try:
+            return maps[color]
+        except KeyError:
+            m = maps[color] = bytes(
+                attacks.attack_map(attacks.cells(self), color)
+            )
+            return m
+
+    def is_attacked(self, loc: str, color: str) -> bool:
+        """Whether any `color` piece attacks `loc`."""
+        return self.attack_map(color)[attacks.SQUARES[loc]] > 0
+
     def player_in_check(self, color: str) -> bool:
-        return len(self._in_kings_path(color)) > 0
+        return self.is_attacked(self._king_locs[color], invert_color(color))
+
+    @staticmethod
+    def _is_castle_shift(loc: str, to: str) -> bool:
+        return abs(ord(to[0]) - ord(loc[0])) == 2
+
+    def _castle_pieces_ready(self, loc: str, to: str) -> bool:
+        """The king's own shift pattern only knows about the king, so this
+        checks that the matching rook is still there, unmoved, and that nothing
+        stands between the two."""
+        king = self[loc]
+        side = 'kingside' if to[0] > loc[0] else 'queenside'
+        if king.has_moved or loc != STARTING_KING_LOCS[king.color]:
+            return False
+        rook_loc = CASTLE_ROOK_LOCS[king.color][side]
+        rook = self[rook_loc]
+        if (
+            not isinstance(rook, Rook)
+            or rook.color != king.color
+            or rook.has_moved
+        ):
+            return False
+        return not self._blocked(rook_loc, loc, exclude_last=True)
+
+    def _castle_path_safe(self, loc: str, to: str) -> bool:
+        """A king can't castle out of check, or through or into an attacked
+        square."""
+        enemy_map = self.attack_map(invert_color(self[loc].color))
+        frm, dest = attacks.SQUARES[loc], attacks.SQUARES[to]
+        step = 8 if dest > frm else -8
+        return not any(enemy_map[sq] for sq in range(frm, dest + step, step))
 
     def _blocked(
             self, loc: str, to: str, exclude_last: bool = False
@@ -565,6 +1241,16 @@ class ChessBoard(CharNumGrid):
         else:
             if self._blocked(loc, to):
                 return False
+        if isinstance(self[loc], King):
+            # Squares the other side already attacks are out of bounds; a
+            # square that's only attacked through the king is caught below.
+            if self.is_attacked(to, invert_color(self[loc].color)):
+                return False
+            if self._is_castle_shift(loc, to) and not (
+                self._castle_pieces_ready(loc, to)
+                and self._castle_path_safe(loc, to)
+            ):
+                return False
         # Now check to make sure the move does not put the active player into
         # check or checkmate.
         self_copy = self.copy()
@@ -579,12 +1265,8 @@ class ChessBoard(CharNumGrid):
         return list(reversed(list(map(list, zip(*self._mat)))))
 
     def __repr__(self) -> str:
-        out_styles = {
-            'big': self._repr_big_,
-            'medium': self._repr_medium_,
-            'small': self._repr_small_
-        }
-        return out_styles[get_option('display.size')]()
+        # Same output as the `_repr_*_` methods, from a precomputed frame.
+        return render(self)
 
     def _repr_big_(self) -> str:
         return repr_grid(self._oriented, 1, True)
@@ -594,3 +1276,81 @@ class ChessBoard(CharNumGrid):
 
     def _repr_small_(self) -> str:
         return repr_grid(self._oriented, 0, False)
+
+
+class CopyOnWriteChessBoard(ChessBoard):
+    """A board whose forks share files of the grid with each other until one of
+    them writes to a file, at which point only that file is copied. A move
+    touches at most four files, so a fork costs a handful of list copies no
+    matter how much the boards are forked.
+
+    Both sides of a fork stop owning their files, so the parent is protected
+    from the child's writes as much as the other way around. That's why forking
+    is only offered here and not on plain `ChessBoard`s.
+    """
+
+    def __init__(self, setup: bool = True) -> None:
+        self._owned = [True] * 8
+        super().__init__(setup=setup)
+
+    @classmethod
+    def from_board(cls, board: ChessBoard) -> 'CopyOnWriteChessBoard':
+        new = cls.__new__(cls)
+        new.__dict__.update(board.clone().__dict__)
+        new._owned = [True] * 8
+        return new
+
+    def __setitem__(self, key: str, val) -> None:
+        if not isinstance(key, tuple):
+            key = Loc.from_charnum(key)
+        x = key[0]
+        if 0 <= x < 8 and not self._owned[x]:
+            self._mat[x] = self._mat[x][:]
+            self._owned[x] = True
+        super().__setitem__(key, val)
+
+    def fill(self, val) -> None:
+        super().fill(val)
+        self._owned = [True] * 8
+
+    def fork(self) -> 'CopyOnWriteChessBoard':
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new._mat = self._mat[:]
+        new._owned = [False] * 8
+        self._owned = [False] * 8
+        new._piece_codes = self._piece_codes[:]
+        new._king_locs = self._king_locs.copy()
+        new._position_counts = self._position_counts.copy()
+        new._listeners = None
+        return new
+
+    def clone(self) -> 'CopyOnWriteChessBoard':
+        return self.fork()
+
+
+class FlatChessBoard(ChessBoard, FlatGrid):
+    """A board stored as the 64 `pieces.piece_code`s of its squares in one
+    `bytearray`, i.e. a `FlatGrid` whose codes are fixed by a piece's type,
+    color and `has_moved`. A clone copies 64 bytes, and a pickle holds the
+    codes rather than a piece object per square.
+
+    Squares hold codes, not pieces, so reading a square gives the one piece in
+    `pieces.CODE_PIECES` for its code, which every flat board shares. That's
+    safe for the same reason sharing pieces between clones is; see `clone`.
+    `_mat` is built on each access and can't be written to."""
+
+    _values = CODE_PIECES
+    _encode = staticmethod(piece_code)
+
+    @property
+    def _piece_codes(self) -> bytearray:
+        # The cells are already piece codes.
+        return self._cells
+
+    @_piece_codes.setter
+    def _piece_codes(self, codes: bytearray) -> None:
+        self._cells = codes
+
+    def _copy_squares(self, new: 'ChessBoard') -> None:
+        new._cells = self._cells[:]
@@ -0,0 +1,432 @@
+"""Prove or refute "mate in N" with depth-first proof-number search (df-pn).
+
+    >>> board = ChessBoard.from_fen('6k1/5ppp/8/8/8/8/8/R3K3 w Q - 0 1')
+    >>> result = solve_mate(board, 1)
+    >>> result.mate, result.best_move
+    (True, Move.from_uci('a1a8'))
+
+The side to move is the attacker. A node is proven when the attacker can force
+mate within the moves it has left, and disproven when the defender can avoid
+it. Proof numbers count how many positions still have to be proven before the
+node is, disproof numbers how many have to be disproven; the search always
+works on the most promising node, so it stops as soon as the root is settled
+rather than expanding the whole tree to depth N like a brute-force search.
+
+Results are kept in a transposition table, keyed by position and the number of
+attacker moves left. It is bounded by `max_entries`: once full, the half
+nearest the leaves is dropped. `max_nodes` and `time_limit` bound the search
+itself; when either runs out the result is None (unknown).
+
+Positions are searched on flat square lists using the tables in `attacks.py`
+rather than on `ChessBoard` objects, since `all_valid_moves` costs
+milliseconds per position. En passant is not generated (the board does not
+support it either); castling is.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .attacks import (
+    SQUARES, SQUARE_NAMES, KING_MOVES, KNIGHT_MOVES, ROOK_RAYS, BISHOP_RAYS,
+    SLIDER_RAYS,
+    PAWN_DIRECTION, PAWN_START_RANK, PAWN_LAST_RANK, PAWN_ATTACK_SETS,
+    COLOR_INDEX, attackers, has_evasion, leaves_king_attacked
+)
+from .fen import CASTLING_SQUARES, castling_rights
+from .main import ChessBoard, PROMOTION_TYPES
+from .moves import Move
+from .pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from .utils import invert_color
+
+INFINITY = 10 ** 9
+
+# One shared instance per kind of piece, so a position's key is a tuple of
+# them and hashing it doesn't look inside the pieces.
+_PIECES = {
+    (piece_type, color): piece_type(color)
+    for piece_type in (Pawn, Knight, Bishop, Rook, Queen, King)
+    for color in ('white', 'black')
+}
+
+# Castling right -> king from, king to, rook from, rook to, squares that must
+# be empty, squares the king passes through (which must not be attacked).
+_CASTLES = {}
+for _right, (_color, _king, _rook) in CASTLING_SQUARES.items():
+    _k, _r = SQUARES[_king], SQUARES[_rook]
+    _step = 8 if _r > _k else -8
+    _CASTLES[_right] = (
+        _color, _k, _k + 2 * _step, _r, _k + _step,
+        tuple(range(_k + _step, _r, _step)),
+        (_k + _step, _k + 2 * _step)
+    )
+
+# Squares whose king or rook moving (or being captured) loses a right.
+_RIGHTS_LOST = {}
+for _right, (_color, _king, _rook) in CASTLING_SQUARES.items():
+    for _sq in (SQUARES[_king], SQUARES[_rook]):
+        _RIGHTS_LOST[_sq] = _RIGHTS_LOST.get(_sq, '') + _right
+
+# (from, to, promotion type or None)
+_Move = Tuple[int, int, Optional[type]]
+
+
+class SearchLimitReached(Exception):
+    pass
+
+
+@dataclass
+class MateResult:
+    # True if mate in at most N moves is forced, False if it's refuted, None
+    # if the search ran out of nodes or time first.
+    mate: Optional[bool]
+    depth: Optional[int] = None  # Moves to mate, if mate was found
+    best_move: Optional[Move] = None
+    pv: List[Move] = field(default_factory=list)
+    nodes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+class Node(object):
+    """A position as a flat list of squares (`attacks` order), with its own
+    legal move generator. The solver's search nodes; `perft` walks them too.
+    Moves are (from square, to square, promotion type or None) tuples."""
+    __slots__ = ('cells', 'color', 'rights', 'moves_left', 'attacker')
+
+    def __init__(self, cells, color, rights, moves_left, attacker):
+        self.cells = cells
+        self.color = color
+        self.rights = rights
+        self.moves_left = moves_left  # Attacker moves still allowed
+        self.attacker = attacker  # Whether the attacker is to move
+
+    @classmethod
+    def from_board(
+            cls,
+            board: ChessBoard,
+            moves_left: int = 0,
+            attacker: bool = True
+    ) -> 'Node':
+        rights = castling_rights(board)
+        cells = [None if p is None else _PIECES[type(p), p.color]
+                 for file_ in board._mat for p in file_]
+        return cls(cells, board.whose_turn, '' if rights == '-' else rights,
+                   moves_left, attacker)
+
+    @property
+    def key(self):
+        return (tuple(self.cells), self.color, self.rights, self.moves_left,
+                self.attacker)
+
+    def king_square(self, color: str) -> int:
+        king = _PIECES[King, color]
+        return self.cells.index(king)
+
+    def in_check(self) -> bool:
+        return bool(attackers(self.cells, self.king_square(self.color),
+                              invert_color(self.color)))
+
+    def legal_moves(self) -> List[_Move]:
+        cells, color = self.cells, self.color
+        color_idx = COLOR_INDEX[color]
+        king_sq = self.king_square(color)
+        pseudo = []
+        for sq, piece in enumerate(cells):
+            if piece is None or piece.color != color:
+                continue
+            kind = type(piece)
+            if kind is Pawn:
+                direction = PAWN_DIRECTION[color_idx]
+                targets = []
+                if cells[sq + direction] is None:
+                    targets.append(sq + direction)
+                    if sq % 8 == PAWN_START_RANK[color_idx] \
+                            and cells[sq + 2 * direction] is None:
+                        targets.append(sq + 2 * direction)
+                for to in PAWN_ATTACK_SETS[color_idx][sq]:
+                    if cells[to] is not None and cells[to].color != color:
+                        targets.append(to)
+                for to in targets:
+                    if to % 8 == PAWN_LAST_RANK[color_idx]:
+                        pseudo.extend((sq, to, p) for p in PROMOTION_TYPES)
+                    else:
+                        pseudo.append((sq, to, None))
+                continue
+            if kind is Knight or kind is King:
+                steps = (KNIGHT_MOVES if kind is Knight else KING_MOVES)[sq]
+                for to in steps:
+                    if cells[to] is None or cells[to].color != color:
+                        pseudo.append((sq, to, None))
+                continue
+            rays = (
+                SLIDER_RAYS['Q'] if kind is Queen
+                else ROOK_RAYS if kind is Rook else BISHOP_RAYS
+            )[sq]
+            for ray in rays:
+                for to in ray:
+                    target = cells[to]
+                    if target is None:
+                        pseudo.append((sq, to, None))
+                        continue
+                    if target.color != color:
+                        pseudo.append((sq, to, None))
+                    break
+        moves = [
+            m for m in pseudo
+            if not leaves_king_attacked(cells, m[0], m[1], king_sq, color)
+        ]
+        if self.rights:
+            moves.extend(self._castles(king_sq))
+        return moves
+
+    def _castles(self, king_sq: int) -> List[_Move]:
+        cells, color = self.cells, self.color
+        enemy = invert_color(color)
+        moves = []
+        for right in self.rights:
+            castle_color, king, to, rook, _, empty, path = _CASTLES[right]
+            if castle_color != color or king != king_sq:
+                continue
+            if any(cells[sq] is not None for sq in empty):
+                continue
+            if any(attackers(cells, sq, enemy) for sq in (king, *path)):
+                continue
+            moves.append((king, to, None))
+        return moves
+
+    def play(self, move: _Move) -> 'Node':
+        frm, to, promotion = move
+        cells = self.cells[:]
+        piece = cells[frm]
+        cells[frm] = None
+        cells[to] = piece if promotion is None \
+            else _PIECES[promotion, self.color]
+        rights = self.rights
+        if rights:
+            if type(piece) is King and abs(to - frm) == 16:
+                for right in rights:
+                    castle = _CASTLES[right]
+                    if castle[1] == frm and castle[2] == to:
+                        cells[castle[4]], cells[castle[3]] = \
+                            cells[castle[3]], None
+            for sq in (frm, to):
+                for right in _RIGHTS_LOST.get(sq, ''):
+                    rights = rights.replace(right, '')
+        moves_left = self.moves_left - 1 if self.attacker else self.moves_left
+        return Node(cells, invert_color(self.color), rights, moves_left,
+                    not self.attacker)
+
+
+class MateSolver(object):
+
+    def __init__(
+            self,
+            max_nodes: Optional[int] = None,
+            max_entries: int = 200_000,
+            time_limit: Optional[float] = None
+    ):
+        """
+        :param max_nodes: Stop after expanding this many positions.
+        :param max_entries: Most positions kept in the transposition table.
+        :param time_limit: Stop after this many seconds.
+        """
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self.time_limit = time_limit
+        self.table: Dict[tuple, Tuple[int, int]] = {}
+        self.nodes = 0
+        self._deadline = None
+
+    def solve(self, board: ChessBoard, n: int) -> MateResult:
+        """Whether the side to move on `board` can force mate in at most `n`
+        moves, and if so the shortest such mate."""
+        start = time.perf_counter()
+        if self.time_limit is not None:
+            self._deadline = start + self.time_limit
+        self.nodes = 0
+        root = Node.from_board(board)
+        result = MateResult(mate=None)
+        # Shorter mates first, so the mate found is the shortest. The
+        # shallower searches fill the table for the deeper ones.
+        try:
+            for depth in range(1, n + 1):
+                root = Node(root.cells, root.color, root.rights, depth, True)
+                self._mid(root, INFINITY, INFINITY)
+                if self.table[root.key][0] == 0:
+                    result.mate, result.depth = True, depth
+                    result.pv = self._pv(root)
+                    result.best_move = result.pv[0] if result.pv else None
+                    break
+            else:
+                result.mate = False
+        except SearchLimitReached:
+            pass
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - start
+        return result
+
+    # ~~~~~~ df-pn
+    #
+    # Each node stores (phi, delta) from the point of view of the side to
+    # move: phi is 0 when it wins and delta is 0 when it loses. For the
+    # attacker that's (proof, disproof); for the defender it's the reverse.
+
+    def _terminal(self, node: Node) -> Optional[Tuple[int, int]]:
+        """The value of a node that is settled without looking at its moves,
+        else None."""
+        if node.attacker:
+            if node.moves_left == 0:
+                return INFINITY, 0
+            return None
+        if node.moves_left == 0:
+            # Out of attacker moves: only mate on the board still counts.
+            king_sq = node.king_square(node.color)
+            if attackers(node.cells, king_sq, invert_color(node.color)) \
+                    and not has_evasion(node.cells, king_sq, node.color):
+                return INFINITY, 0
+            return 0, INFINITY
+        return None
+
+    def _lookup(self, node: Node) -> Tuple[int, int]:
+        value = self.table.get(node.key)
+        if value is None:
+            value = self._terminal(node)
+            if value is not None:
+                self._store(node, value)
+            else:
+                value = (1, 1)
+        return value
+
+    def _store(self, node: Node, value: Tuple[int, int]) -> None:
+        if node.key not in self.table \
+                and len(self.table) >= self.max_entries:
+            self._evict()
+        self.table[node.key] = value
+
+    def _evict(self) -> None:
+        """Drops the half of the table closest to the leaves, i.e. with the
+        fewest attacker moves left, which is the cheapest to search again."""
+        keys = sorted(self.table, key=lambda k: (k[3], k[4]))
+        for key in keys[:len(keys) // 2 + 1]:
+            del self.table[key]
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchLimitReached
+        if self._deadline is not None and self.nodes % 256 == 0 \
+                and time.perf_counter() >= self._deadline:
+            raise SearchLimitReached
+
+    def _mid(self, node: Node, phi_threshold: int,
+             delta_threshold: int) -> None:
+        value = self._lookup(node)
+        if 0 in value:
+            return
+        self._tick()
+        children = [node.play(move) for move in node.legal_moves()]
+        if not children:
+            # Mate and stalemate both leave the attacker without its win.
+            if node.attacker or node.in_check():
+                self._store(node, (INFINITY, 0))
+            else:
+                self._store(node, (0, INFINITY))
+            return
+        while True:
+            values = [self._lookup(child) for child in children]
+            phi = min(delta for _, delta in values)
+            delta = min(sum(phi for phi, _ in values), INFINITY)
+            if phi >= phi_threshold or delta >= delta_threshold:
+                self._store(node, (phi, delta))
+                return
+            # The child closest to a win for the side to move, and the
+            # runner-up's value, which bounds how long to stay with it.
+            best, second = None, INFINITY
+            for i, (child_phi, child_delta) in enumerate(values):
+                if best is None or child_delta < values[best][1]:
+                    if best is not None:
+                        second = values[best][1]
+                    best = i
+                elif child_delta < second:
+                    second = child_delta
+            child_phi = values[best][0]
+            self._store(node, (phi, delta))
+            self._mid(
+                children[best],
+                min(delta_threshold - delta + child_phi, INFINITY),
+                min(phi_threshold, second + 1)
+            )
+
+    def _known(self, node: Node) -> Optional[bool]:
+        """Whether the table says the attacker can force mate from `node` in
+        the moves it has left; None if it doesn't say."""
+        value = self.table.get(node.key) or self._terminal(node)
+        if value is None or 0 not in value:
+            return None
+        return value[0 if node.attacker else 1] == 0
+
+    def _proven(self, node: Node) -> Optional[bool]:
+        """Like `_known`, but searches the node if the table doesn't say.
+        None if the search runs out of nodes or time."""
+        known = self._known(node)
+        if known is None:
+            try:
+                self._mid(node, INFINITY, INFINITY)
+            except SearchLimitReached:
+                return None
+            known = self._known(node)
+        return known
+
+    def _distance(self, node: Node) -> int:
+        """The fewest moves the attacker, to move at `node`, mates in, given
+        that it mates in `node.moves_left`. Budgets that can't be settled
+        within the search limits count as not mating."""
+        for moves_left in range(1, node.moves_left):
+            shorter = Node(node.cells, node.color, node.rights, moves_left,
+                           True)
+            if self._proven(shorter):
+                return moves_left
+        return node.moves_left
+
+    def _pv(self, node: Node) -> List[Move]:
+        """The main line from a proven root until mate: the attacker plays the
+        quickest mate, and the defender the reply that holds out longest, so
+        the line is `depth` attacker moves long. The root's budget is already
+        the shortest, since `solve` tries shorter mates first."""
+        pv = []
+        while True:
+            best = None
+            if node.attacker:
+                children = [(move, node.play(move))
+                            for move in node.legal_moves()]
+                # Moves the table already proves first, then search the rest.
+                children.sort(key=lambda c: self._known(c[1]) is not True)
+                for move, child in children:
+                    if self._proven(child):
+                        best = move, child
+                        break
+            else:
+                longest = 0
+                for move in node.legal_moves():
+                    child = node.play(move)
+                    distance = self._distance(child)
+                    if distance > longest:
+                        best, longest = (move, child), distance
+                        if distance == node.moves_left:
+                            break
+                if best is not None:
+                    move, child = best
+                    best = move, Node(child.cells, child.color, child.rights,
+                                      longest, True)
+            if best is None:
+                return pv
+            (frm, to, promotion), node = best
+            pv.append(Move.make(SQUARE_NAMES[frm], SQUARE_NAMES[to],
+                                promotion))
+
+
+def solve_mate(board: ChessBoard, n: int, **kwargs) -> MateResult:
+    return MateSolver(**kwargs).solve(board, n)
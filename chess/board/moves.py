@@ -0,0 +1,140 @@
+"""A compact move type: one `int` holding the whole move.
+
+    bits 0-5    from square
+    bits 6-11   to square
+    bits 12-14  promotion: 0 none, 1 queen, 2 rook, 3 bishop, 4 knight
+    bit 15      capture
+    bit 16      castle
+
+Squares are numbered as in `attacks` (file * 8 + rank, so a1 = 0, a2 = 1 and
+b1 = 8). The low 15 bits are enough to replay a move (see `compact`), which is
+what game archives store.
+
+A `Move` is an `int`, so it packs into an `array` like one, and it unpacks
+like the old `(from, to)` tuples:
+
+    >>> move = Move.from_uci('e7e8q')
+    >>> loc, to = move
+    >>> move.promotion
+    <class 'chess.board.pieces.Queen'>
+    >>> Move.from_uci('e2e4') in ChessBoard().all_valid_moves()
+    True
+
+Moves compare and hash by `compact`, so the flags don't matter: a move parsed
+from UCI finds the flagged one a board generates, in a list, a set or among a
+dict's keys. Tuples are not moves and never compare equal to them.
+"""
+from typing import Iterator, Optional, Type
+
+from .attacks import SQUARES, SQUARE_NAMES
+from .pieces import Queen, Rook, Bishop, Knight, PIECE_NAME_TO_TYPE
+
+PROMOTIONS = (None, Queen, Rook, Bishop, Knight)
+PROMOTION_CODES = {t: i for i, t in enumerate(PROMOTIONS) if t is not None}
+
+TO_SHIFT = 6
+PROMOTION_SHIFT = 12
+CAPTURE = 1 << 15
+CASTLE = 1 << 16
+COMPACT_MASK = CAPTURE - 1
+
+
+class Move(int):
+    __slots__ = ()
+
+    @classmethod
+    def make(
+            cls,
+            loc: str,
+            to: str,
+            promotion: Optional[Type] = None,
+            capture: bool = False,
+            castle: bool = False
+    ) -> 'Move':
+        return cls(
+            SQUARES[loc]
+            | SQUARES[to] << TO_SHIFT
+            | PROMOTION_CODES.get(promotion, 0) << PROMOTION_SHIFT
+            | (CAPTURE if capture else 0)
+            | (CASTLE if castle else 0)
+        )
+
+    @classmethod
+    def from_uci(cls, s: str) -> 'Move':
+        """'e2e4' or, with a promotion, 'e7e8q'. Capture and castle flags
+        aren't known without a board, so they're left unset."""
+        if len(s) not in (4, 5) or s[:2] not in SQUARES \
+                or s[2:4] not in SQUARES:
+            raise ValueError(f'{s} is not a UCI move.')
+        promotion = None
+        if len(s) == 5:
+            promotion = PIECE_NAME_TO_TYPE.get(s[4].upper())
+            if promotion not in PROMOTION_CODES:
+                raise ValueError(f'{s} is not a UCI move.')
+        return cls.make(s[:2], s[2:4], promotion)
+
+    @property
+    def from_square(self) -> int:
+        return self & 63
+
+    @property
+    def to_square(self) -> int:
+        return self >> TO_SHIFT & 63
+
+    @property
+    def loc(self) -> str:
+        return SQUARE_NAMES[self & 63]
+
+    @property
+    def to(self) -> str:
+        return SQUARE_NAMES[self >> TO_SHIFT & 63]
+
+    @property
+    def promotion(self) -> Optional[Type]:
+        return PROMOTIONS[self >> PROMOTION_SHIFT & 7]
+
+    @property
+    def is_capture(self) -> bool:
+        return bool(self & CAPTURE)
+
+    @property
+    def is_castle(self) -> bool:
+        return bool(self & CASTLE)
+
+    @property
+    def compact(self) -> int:
+        """The move without its flags, which fits in 16 bits."""
+        return self & COMPACT_MASK
+
+    def __iter__(self) -> Iterator[str]:
+        yield self.loc
+        yield self.to
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Move):
+            return self & COMPACT_MASK == other & COMPACT_MASK
+        if isinstance(other, int):
+            return self & COMPACT_MASK == other
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self) -> int:
+        return hash(self & COMPACT_MASK)
+
+    def uci(self) -> str:
+        promotion = self.promotion
+        return f'{self.loc}{self.to}' \
+               f'{promotion._char.lower() if promotion else ""}'
+
+    def san(self, board) -> str:
+        """The move in standard algebraic notation, in the position on `board`
+        (before the move is made)."""
+        return board.san(self)
+
+    def __repr__(self) -> str:
+        return f"Move.from_uci('{self.uci()}')"
+
+    __str__ = uci
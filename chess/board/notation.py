@@ -0,0 +1,119 @@
+"""Find the moves of PGN games whose capture, check or mate markers are wrong.
+
+Playing a game with `api.notation_mismatch` set to 'error' stops at the first
+bad marker; this goes through every game of a corpus and lists them all, which
+is how corrupted games are found:
+
+    >>> for mismatch in report(read_file('archive.pgn')):
+    ...     print(mismatch)
+    Mismatch(game=112, ply=36, san='Qxh7', kinds=('false_capture',), ...)
+
+For large corpora, `tally` can be used as the evaluation of a corpus job (see
+`chess.board.jobs`) to count the mismatches in parallel:
+
+    python -m chess.board.jobs corpus /shared/check archive.pgn \\
+        --evaluate chess.board.notation:tally
+"""
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .config import option_context
+from .main import (
+    ChessBoard, InvalidMove, FALSE_CAPTURE, MISSING_CAPTURE, FALSE_CHECK,
+    FALSE_MATE, MISSING_CHECK, MISSING_MATE
+)
+from .pgn import PgnGame
+
+ILLEGAL = 'illegal'  # The move can't be played; the rest of the game is skipped
+
+KINDS = (FALSE_CAPTURE, MISSING_CAPTURE, FALSE_CHECK, FALSE_MATE,
+         MISSING_CHECK, MISSING_MATE, ILLEGAL)
+
+_CHECKED = {'api.safe_mode': True, 'api.notifications': False,
+            'api.notation_mismatch': 'error'}
+_UNCHECKED = {'api.notation_mismatch': 'ignore'}
+
+
+class Mismatch(NamedTuple):
+    game: int
+    ply: int  # Moves played before the move, as for `tactics.Puzzle`
+    san: str
+    kinds: Tuple[str, ...]
+    expected: Optional[str]  # The move's correct SAN, if it's legal
+
+
+def _missing_marker(
+        board: ChessBoard,
+        san: str
+) -> Optional[Tuple[str, str]]:
+    """The check or mate marker that `san`, just played on `board`, left out,
+    with the move as it should have been written; None if it left none out.
+    Replies are only looked for when the king is in check."""
+    if san.rstrip('?!').endswith('#'):
+        return None
+    color = board.whose_turn
+    if not board.player_in_check(color):
+        return None
+    move = san.rstrip('+?!')
+    if board.player_in_checkmate(color):
+        return MISSING_MATE, move + '#'
+    if san.rstrip('?!').endswith('+'):
+        return None
+    return MISSING_CHECK, move + '+'
+
+
+def game_mismatches(game: PgnGame) -> List[Mismatch]:
+    """Every move of `game` with wrong markers, in order."""
+    board = ChessBoard.from_fen(game.headers['FEN']) \
+        if 'FEN' in game.headers else ChessBoard()
+    mismatches = []
+    # Moves are played with the markers checked, which costs little more than
+    # playing them, and then looked at for markers they left out. The few that
+    # fail (before the board is changed) are looked at again without the
+    # check.
+    with option_context(_CHECKED):
+        for ply, san in enumerate(game.moves):
+            try:
+                board.move(san)
+            except InvalidMove:
+                pass
+            else:
+                missing = _missing_marker(board, san)
+                if missing:
+                    kind, expected = missing
+                    mismatches.append(
+                        Mismatch(game.index, ply, san, (kind,), expected)
+                    )
+                continue
+            try:
+                with option_context(_UNCHECKED):
+                    kinds = board.notation_mismatches(san)
+                    expected = board.san(board.parse_san(san))
+                    board.move(san)
+            except InvalidMove:
+                mismatches.append(
+                    Mismatch(game.index, ply, san, (ILLEGAL,), None)
+                )
+                break
+            if kinds:
+                mismatches.append(
+                    Mismatch(game.index, ply, san, tuple(kinds), expected)
+                )
+    return mismatches
+
+
+def report(games: Iterable[PgnGame]) -> Iterator[Mismatch]:
+    """The mismatches of each game in turn."""
+    for game in games:
+        yield from game_mismatches(game)
+
+
+def tally(game: PgnGame) -> Dict[str, int]:
+    """Counts for a corpus job: games, games with any mismatch, and the
+    number of moves with each kind of mismatch."""
+    mismatches = game_mismatches(game)
+    counts = {'games': 1, 'flagged': int(bool(mismatches)),
+              **{kind: 0 for kind in KINDS}}
+    for mismatch in mismatches:
+        for kind in mismatch.kinds:
+            counts[kind] += 1
+    return counts
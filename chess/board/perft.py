@@ -0,0 +1,84 @@
+"""Perft: count the leaf positions of the legal move tree to a fixed depth.
+
+    >>> perft(ChessBoard(), 4)
+    197281
+
+Counts match the published ones for positions and depths where en passant
+can't come up. The board doesn't support en passant, so from the starting
+position the counts differ from depth 5 on (4865351, not 4865609).
+
+Moves are generated on flat square lists by `mate.Node`, the move generator of
+the mate solver, not through `ChessBoard.all_valid_moves`.
+"""
+from typing import Dict, List, Optional, Union
+
+from .attacks import SQUARES
+from .main import ChessBoard
+from .mate import Node
+from .moves import Move, PROMOTION_CODES
+
+Position = Union[ChessBoard, str]
+
+
+def root(position: Position) -> Node:
+    board = ChessBoard.from_fen(position) if isinstance(position, str) \
+        else position
+    return Node.from_board(board)
+
+
+def _count(node: Node, depth: int) -> int:
+    moves = node.legal_moves()
+    if depth == 1:
+        return len(moves)
+    return sum(_count(node.play(m), depth - 1) for m in moves)
+
+
+def _uci(move) -> str:
+    frm, to, promotion = move
+    return Move(
+        frm | to << 6 | PROMOTION_CODES.get(promotion, 0) << 12
+    ).uci()
+
+
+def play_uci(node: Node, moves: List[str]) -> Node:
+    """`node` after the moves, given in UCI."""
+    for s in moves:
+        move = Move.from_uci(s)
+        node = node.play(
+            (SQUARES[move.loc], SQUARES[move.to], move.promotion)
+        )
+    return node
+
+
+def perft(
+        position: Position,
+        depth: int,
+        moves: Optional[List[str]] = None
+) -> int:
+    """Leaf nodes of the move tree `depth` plies deep, from a board or FEN,
+    after first playing `moves` (in UCI) if given."""
+    if depth == 0:
+        return 1
+    return _count(play_uci(root(position), moves or []), depth)
+
+
+def divide(position: Position, depth: int) -> Dict[str, int]:
+    """Perft split by the first move, keyed by the move in UCI."""
+    node = root(position)
+    return {
+        _uci(m): _count(node.play(m), depth - 1) if depth > 1 else 1
+        for m in node.legal_moves()
+    }
+
+
+def subtrees(position: Position, depth: int) -> List[List[str]]:
+    """Every line of `depth` plies from the position, as lists of UCI
+    moves. Perft to depth d is the sum of perft to depth d - `depth` over
+    the positions at the ends of these lines."""
+    lines = [([], root(position))]
+    for _ in range(depth):
+        lines = [
+            (line + [_uci(m)], node.play(m))
+            for line, node in lines for m in node.legal_moves()
+        ]
+    return [line for line, _ in lines]
@@ -0,0 +1,101 @@
+"""Streaming reader for Portable Game Notation (PGN) files.
+
+Games are read one at a time, so a file of any size can be processed in
+constant memory. Only the mainline is kept: comments, NAGs (e.g. `$1`) and
+variations in parentheses are skipped. To keep those, read games into trees
+with `tree.read_trees`.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+RESULTS = {'1-0', '0-1', '1/2-1/2', '*'}
+
+
+class ReplayWarning(UserWarning):
+    """Warned when a game is cut short at a move the board can't play."""
+
+tag_regex = re.compile(r'^\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]\s*$')
+
+# One token of movetext: a comment, a paren, a NAG, a move number, or a move.
+token_regex = re.compile(r'''
+    \{[^}]*\}           # {comment}
+    | ;[^\n]*           # ; comment to end of line
+    | [()]              # variation start / end
+    | \$\d+             # NAG
+    | \d+\.+            # move number, e.g. 12. or 12...
+    | [^\s(){};]+       # move or result
+''', re.VERBOSE)
+
+
+@dataclass
+class PgnGame:
+    headers: Dict[str, str] = field(default_factory=dict)
+    moves: List[str] = field(default_factory=list)
+    result: Optional[str] = None
+    # Position of the game in the file it was read from, starting at 0.
+    index: Optional[int] = None
+
+    @property
+    def movetext(self) -> str:
+        """The mainline in the space-separated form `ChessBoard.move` takes."""
+        return ' '.join(self.moves)
+
+
+def tokenize(movetext: str) -> Iterator[str]:
+    for match in token_regex.finditer(movetext):
+        yield match.group(0)
+
+
+def parse_movetext(movetext: str) -> Tuple[List[str], Optional[str]]:
+    """Returns the mainline's SAN moves and the result, if there is one."""
+    moves = []
+    result = None
+    depth = 0
+    for token in tokenize(movetext):
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth or token[0] in '{;$' or token[0].isdigit() and '.' in token:
+            continue
+        elif token in RESULTS:
+            result = token
+        else:
+            moves.append(token)
+    return moves, result
+
+
+def split_games(lines: Iterable[str]) -> Iterator[Tuple[Dict[str, str], str]]:
+    """Yields the headers and the raw movetext of each game in an iterable of
+    lines, such as an open file."""
+    headers: Dict[str, str] = {}
+    movetext: List[str] = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith('[') and not line.startswith('[%'):
+            match = tag_regex.match(line)
+            if match:
+                # A tag after some movetext starts the next game.
+                if movetext:
+                    yield headers, ' '.join(movetext)
+                    headers, movetext = {}, []
+                headers[match.group(1)] = match.group(2).replace('\\"', '"')
+                continue
+        if line:
+            movetext.append(line)
+    if headers or movetext:
+        yield headers, ' '.join(movetext)
+
+
+def read_games(lines: Iterable[str]) -> Iterator[PgnGame]:
+    """Yields games from an iterable of lines, such as an open file."""
+    for index, (headers, movetext) in enumerate(split_games(lines)):
+        moves, result = parse_movetext(movetext)
+        yield PgnGame(headers=headers, moves=moves,
+                      result=result or headers.get('Result'), index=index)
+
+
+def read_file(path: str) -> Iterator[PgnGame]:
+    with open(path, encoding='utf-8', errors='replace') as f:
+        yield from read_games(f)
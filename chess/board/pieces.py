@@ -1,7 +1,7 @@
-from typing import List, Optional, Type, Dict
+from typing import List, Optional, Tuple, Type, Dict
 from .grid import Vector, decompose
 from .config import get_option
-from .utils import sign
+from .utils import invert_color, sign
 
 ONE_THRU_SEVEN = [*range(-7, 0, 1), *range(1, 8)]
 ALL_COLORS = {'white', 'black'}
@@ -160,6 +160,47 @@ for piece in {Pawn, Rook, Queen, King, Bishop, Rook, Knight}:
 
 ALL_PIECES = set(PIECE_NAME_TO_TYPE.values())
 
+# Material values in centipawns. The king is priceless; it's scored as 0 so
+# that material sums ignore it.
+PIECE_VALUES = {
+    Pawn: 100,
+    Knight: 320,
+    Bishop: 330,
+    Rook: 500,
+    Queen: 900,
+    King: 0
+}
+
+# One-byte codes for what can be on a square: 0 for an empty square, and a code
+# for every (type, color, has_moved) of piece, which is all a board needs to
+# know about one. Codes 1-12 are unmoved pieces, in the order of `PIECE_TYPES`,
+# white then black; the moved ones follow in the same order.
+PIECE_TYPES = (Pawn, Knight, Bishop, Rook, Queen, King)
+PIECE_CODES: Dict[Tuple[Type, str, bool], int] = {
+    (piece_type, color, has_moved): 1 + 12 * has_moved + 6 * c + t
+    for has_moved in (False, True)
+    for c, color in enumerate(('white', 'black'))
+    for t, piece_type in enumerate(PIECE_TYPES)
+}
+
+
+def piece_code(piece: Optional[ChessPiece]) -> int:
+    if piece is None:
+        return 0
+    return PIECE_CODES[type(piece), piece.color, piece.has_moved]
+
+
+def _code_piece(piece_type: Type, color: str, has_moved: bool) -> ChessPiece:
+    piece = piece_type(color)
+    piece.has_moved = has_moved
+    return piece
+
+
+# One piece per code, indexed by code, for storage that keeps only the codes.
+# These are shared by every such board, so they must never be changed.
+CODE_PIECES: List[Optional[ChessPiece]] = \
+    [None] + [_code_piece(*key) for key in PIECE_CODES]
+
 
 MOVE_LOOKUP_DICT_SANS_PAWNS: Dict[Vector, List[Type]] = {}
 
@@ -177,8 +218,10 @@ for piece in {Rook, King, Queen, Bishop, Knight}:
 def _striking_distance(defending_color: str) -> Dict[Vector, List[Type]]:
     """Copying a dict over and over again is more memory intensive than
     necessary, so they're built here first."""
-    d = MOVE_LOOKUP_DICT_SANS_PAWNS.copy()
-    for shift in Pawn(defending_color).reverse_shifts_capture(capture=True):
+    # Copy the lists too, so that each color's pawns only attack one way.
+    d = {k: v.copy() for k, v in MOVE_LOOKUP_DICT_SANS_PAWNS.items()}
+    attacker = Pawn(invert_color(defending_color))
+    for shift in attacker.reverse_shifts_capture(capture=True):
         d[shift].append(Pawn)
     return d
 
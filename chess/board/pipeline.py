@@ -0,0 +1,459 @@
+"""Streaming pipelines for analysing game corpora in constant memory.
+
+A pipeline is a source iterable followed by stages, each of which turns an
+iterator of items into another iterator of items, and optionally a sink that
+consumes the final items. Everything is lazy: only as many items are in flight
+as the buffers between stages allow.
+
+    >>> pipeline = Pipeline(
+    ...     pgn_source(['games.pgn']),
+    ...     FlatMap('features', game_features, processes=4),
+    ...     sink=CsvSink('features.csv'),
+    ... )
+    >>> pipeline.run()
+    >>> print(pipeline.report())
+
+Work passed to a process pool (`processes=`) must be picklable, so use
+module-level functions there, e.g. `functools.partial(game_features,
+features=('fen', 'material'))`.
+"""
+import csv
+import json
+import queue
+import struct
+import threading
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+    Sequence
+)
+
+from .main import ChessBoard, InvalidMove
+from .pgn import PgnGame, ReplayWarning, read_file
+from .search import evaluate
+
+
+# ~~~~~~ Stages
+
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    seconds: float = 0.0  # Time spent in this stage, excluding upstream
+
+    @property
+    def throughput(self) -> float:
+        """Items per second."""
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+class _Timer(object):
+    """Wraps an iterator, adding up the time spent in each `next()`."""
+
+    def __init__(self, it: Iterator):
+        self.it = it
+        self.inclusive = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            return next(self.it)
+        finally:
+            self.inclusive += time.perf_counter() - start
+
+
+class _Meter(_Timer):
+    """Wraps a stage's output, counting items and timing each `next()`. Time
+    spent pulling from the stage's input is subtracted, so each stage only
+    reports its own work. `upstream` times the input as this stage sees it:
+    with a buffer in between, that's the wait on the buffer, not the time the
+    upstream stage spent filling it on another thread."""
+
+    def __init__(self, name: str, it: Iterator, upstream: _Timer = None):
+        super().__init__(it)
+        self.stats = StageStats(name)
+        self.upstream = upstream
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            item = next(self.it)
+        finally:
+            self.inclusive += time.perf_counter() - start
+            upstream = self.upstream.inclusive if self.upstream else 0.0
+            self.stats.seconds = self.inclusive - upstream
+        self.stats.items += 1
+        return item
+
+
+class Stage(object):
+    """A named generator function: iterator of items in, iterator out."""
+
+    def __init__(self, name: str, func: Callable[[Iterator], Iterator]):
+        self.name = name
+        self.func = func
+
+    def __call__(self, items: Iterator) -> Iterator:
+        return iter(self.func(items))
+
+
+class Map(Stage):
+    """Applies `func` to every item. With `processes`, the calls run in a
+    process pool, with at most `max_pending` items in flight; results still
+    come out in order."""
+
+    def __init__(
+            self,
+            name: str,
+            func: Callable[[Any], Any],
+            processes: Optional[int] = None,
+            max_pending: Optional[int] = None
+    ):
+        super().__init__(name, func)
+        self.processes = processes
+        self.max_pending = max_pending or 4 * (processes or 1)
+
+    def __call__(self, items: Iterator) -> Iterator:
+        if not self.processes:
+            return map(self.func, items)
+        return parallel_map(self.func, items, processes=self.processes,
+                            max_pending=self.max_pending)
+
+
+class FlatMap(Map):
+    """Like `Map`, but `func` returns an iterable of items per input item."""
+
+    def __call__(self, items: Iterator) -> Iterator:
+        for results in super().__call__(items):
+            yield from results
+
+
+def parallel_map(
+        func: Callable,
+        items: Iterable,
+        processes: int,
+        max_pending: int
+) -> Iterator:
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+_DONE = object()
+# How often blocked buffer threads check whether they've been stopped.
+_POLL = 0.05
+
+
+def buffered(
+        items: Iterable,
+        size: int,
+        stop: Optional[threading.Event] = None
+) -> Iterator:
+    """Pulls from `items` on a background thread into a queue of at most
+    `size` items. Useful after I/O-bound stages, e.g. reading files.
+
+    Closing the generator (or `stop` being set) stops the thread, even if it's
+    blocked on a full queue because nobody is reading anymore. Buffers that
+    share a `stop` event all stop together."""
+    q = queue.Queue(maxsize=size)
+    stop = stop or threading.Event()
+    errors = []
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def fill():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            put(_DONE)
+
+    threading.Thread(target=fill, name='buffered', daemon=True).start()
+    done = False
+    try:
+        while True:
+            try:
+                item = q.get(timeout=_POLL)
+            except queue.Empty:
+                if stop.is_set():
+                    return
+                continue
+            if item is _DONE:
+                done = True
+                if errors:
+                    raise errors[0]
+                return
+            yield item
+    finally:
+        if not done:
+            # Closed early: stop the thread, and empty the queue so that a
+            # `put` in progress returns at once.
+            stop.set()
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+
+
+class Pipeline(object):
+
+    def __init__(
+            self,
+            source: Iterable,
+            *stages: Stage,
+            sink: Optional['Sink'] = None,
+            buffer_size: Optional[int] = None,
+            source_name: str = 'source'
+    ):
+        """
+        :param buffer_size: If set, every stage's output is pulled ahead on a
+                            thread into a queue of this size.
+        """
+        self.source = source
+        self.stages = stages
+        self.sink = sink
+        self.buffer_size = buffer_size
+        self.source_name = source_name
+        self._meters: List[_Meter] = []
+        self._stop = threading.Event()
+
+    def __iter__(self) -> Iterator:
+        """Iterating starts the buffer threads, if any. Call `close()` if
+        the items aren't read to the end."""
+        self._stop = threading.Event()
+        meter = _Meter(self.source_name, iter(self.source))
+        self._meters = [meter]
+        for stage in self.stages:
+            items = meter
+            if self.buffer_size:
+                items = _Timer(buffered(items, self.buffer_size, self._stop))
+            meter = _Meter(stage.name, stage(items), upstream=items)
+            self._meters.append(meter)
+        return meter
+
+    def close(self) -> None:
+        """Stops the buffer threads."""
+        self._stop.set()
+
+    def run(self) -> int:
+        """Runs everything into the sink. Returns the number of items the sink
+        received."""
+        n = 0
+        sink = self.sink
+        try:
+            for item in self:
+                if sink is not None:
+                    sink.write(item)
+                n += 1
+        finally:
+            self.close()
+            if sink is not None:
+                sink.close()
+        return n
+
+    def stats(self) -> List[StageStats]:
+        return [meter.stats for meter in self._meters]
+
+    def report(self) -> str:
+        width = max([len(s.name) for s in self.stats()] + [5])
+        lines = [f'{"stage":<{width}}  {"items":>10}  {"seconds":>8}  '
+                 f'{"items/s":>10}']
+        for s in self.stats():
+            lines.append(f'{s.name:<{width}}  {s.items:>10}  '
+                         f'{s.seconds:>8.2f}  {s.throughput:>10.1f}')
+        return '\n'.join(lines)
+
+
+# ~~~~~~ Chess stages
+
+
+def pgn_source(paths: Iterable[str]) -> Iterator[PgnGame]:
+    """The games of several files, numbered on from one file to the next so
+    that every game has its own index."""
+    offset = 0
+    for path in paths:
+        n = 0
+        for n, game in enumerate(read_file(path), 1):
+            game.index += offset
+            yield game
+        offset += n
+
+
+class Position(NamedTuple):
+    game: Optional[int]
+    ply: int
+    san: Optional[str]  # The move that led here; None at the start.
+    board: ChessBoard
+
+
+def replay(game: PgnGame) -> Iterator[Position]:
+    """Every position of a game, starting with the initial one. Replay stops
+    at the first move the board can't play (e.g. en passant, which the board
+    doesn't support yet), with a `ReplayWarning`."""
+    board = ChessBoard.from_fen(game.headers['FEN']) \
+        if 'FEN' in game.headers else ChessBoard()
+    yield Position(game.index, 0, None, board)
+    for ply, san in enumerate(game.moves, 1):
+        board = board.copy()
+        try:
+            board.move(san)
+        except InvalidMove as e:
+            warnings.warn(f'Game {game.index} stops before ply {ply} '
+                          f'({san}): {e}', ReplayWarning, stacklevel=2)
+            return
+        yield Position(game.index, ply, san, board)
+
+
+def _material(board: ChessBoard) -> int:
+    return evaluate(board) if board.whose_turn == 'white' \
+        else -evaluate(board)
+
+
+def _pieces(board: ChessBoard) -> int:
+    return sum(p is not None for file_ in board._mat for p in file_)
+
+
+FEATURES: Dict[str, Callable[[ChessBoard], Any]] = {
+    'fen': ChessBoard.fen,
+    'hash': lambda board: board.position_hash,
+    'white_to_move': lambda board: int(board.whose_turn == 'white'),
+    'material': _material,  # From white's point of view, in centipawns
+    'pieces': _pieces,
+    'in_check': lambda board: int(board.player_in_check(board.whose_turn)),
+    'halfmove_clock': lambda board: board.halfmove_clock,
+    'mobility': lambda board: len(board.all_valid_moves()),
+}
+
+DEFAULT_FEATURES = ('fen', 'white_to_move', 'material', 'pieces', 'in_check')
+
+
+def extract(
+        position: Position,
+        features: Sequence[str] = DEFAULT_FEATURES
+) -> Dict[str, Any]:
+    row = {'game': position.game, 'ply': position.ply, 'san': position.san}
+    for name in features:
+        row[name] = FEATURES[name](position.board)
+    return row
+
+
+def game_features(
+        game: PgnGame,
+        features: Sequence[str] = DEFAULT_FEATURES
+) -> List[Dict[str, Any]]:
+    """Replay and feature extraction in one picklable step, for `FlatMap`
+    with `processes`."""
+    return [extract(position, features) for position in replay(game)]
+
+
+# ~~~~~~ Sinks
+
+
+class Sink(object):
+
+    def write(self, item: Any) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class CsvSink(Sink):
+
+    def __init__(self, path: str, fields: Optional[Sequence[str]] = None):
+        self._file = open(path, 'w', newline='')
+        self.fields = fields
+        self._writer = None
+
+    def write(self, item: Dict[str, Any]) -> None:
+        if self._writer is None:
+            self._writer = csv.DictWriter(
+                self._file, fieldnames=self.fields or list(item),
+                extrasaction='ignore'
+            )
+            self._writer.writeheader()
+        self._writer.writerow(item)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class NpySink(Sink):
+    """Writes numeric columns of each row into a 2D float64 `.npy` file,
+    without needing NumPy. Rows stream to disk; the header is rewritten with
+    the final row count on `close()`."""
+
+    _HEADER_LEN = 128
+
+    def __init__(self, path: str, fields: Sequence[str]):
+        self.fields = list(fields)
+        self._file = open(path, 'wb')
+        self._row = struct.Struct(f'<{len(self.fields)}d')
+        self.rows = 0
+        self._write_header()
+
+    def _write_header(self) -> None:
+        header = (
+            "{'descr': '<f8', 'fortran_order': False, "
+            f"'shape': ({self.rows}, {len(self.fields)}), }}"
+        )
+        # Magic, version 1.0, header length, then the padded header dict.
+        pad = self._HEADER_LEN - 10 - len(header) - 1
+        self._file.seek(0)
+        self._file.write(b'\x93NUMPY\x01\x00')
+        self._file.write(struct.pack('<H', self._HEADER_LEN - 10))
+        self._file.write((header + ' ' * pad + '\n').encode('latin1'))
+
+    def write(self, item: Dict[str, Any]) -> None:
+        self._file.write(self._row.pack(*(float(item[f])
+                                          for f in self.fields)))
+        self.rows += 1
+
+    def close(self) -> None:
+        self._write_header()
+        self._file.close()
+
+
+class PositionStoreSink(Sink):
+    """Appends one JSON object per position to a file, keyed by the position's
+    Zobrist hash so positions can be grouped or joined later."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'a')
+
+    def write(self, item) -> None:
+        if isinstance(item, Position):
+            item = {
+                'hash': item.board.position_hash,
+                'fen': item.board.fen(),
+                'game': item.game,
+                'ply': item.ply,
+            }
+        self._file.write(json.dumps(item) + '\n')
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,164 @@
+"""Encode positions as binary input planes for neural networks.
+
+Each position becomes `planes` 8×8 planes of 0/1 bytes, laid out as
+[plane][rank][file] with rank 1 and the a-file first:
+
+    0-5    white pawn, knight, bishop, rook, queen, king
+    6-11   black pawn, knight, bishop, rook, queen, king
+    12     all ones if white is to move
+    13-16  castling rights K, Q, k, q (all ones if available)
+    17     all ones if the position has occurred before
+
+With `planes=12` only the piece planes are written.
+
+Planes are written straight into any writable buffer: a `bytearray`, an
+`array`, or a NumPy `uint8` array of shape (N, planes, 8, 8), including a
+memory-mapped `.npy` file from `open_npy`. NumPy is optional; only the
+functions that create arrays need it.
+
+    >>> out = open_npy('positions.npy', len(boards))
+    >>> export_planes(boards, out)
+    >>> out.flush()
+"""
+from typing import Iterable
+
+from .attacks import SQUARES
+from .fen import CASTLING_SQUARES
+from .main import ChessBoard
+from .pieces import PIECE_CODES, PIECE_TYPES, King, Rook
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+PIECE_PLANES = 12
+PLANES = 18
+SIDE_PLANE = 12
+CASTLING_PLANE = 13
+REPETITION_PLANE = 17
+
+PIECE_PLANE = {
+    (piece_type, color): offset + i
+    for offset, color in ((0, 'white'), (6, 'black'))
+    for i, piece_type in enumerate(PIECE_TYPES)
+}
+
+# Square number (file-major, as in `attacks`) to its index inside a plane.
+PLANE_INDEX = tuple((sq % 8) * 8 + sq // 8 for sq in range(64))
+
+
+def _plane_table(plane: int) -> bytes:
+    """A `bytes.translate` table taking a square's piece code to 1 if the
+    piece belongs on `plane` and 0 otherwise."""
+    table = bytearray(256)
+    for (piece_type, color, _), code in PIECE_CODES.items():
+        table[code] = PIECE_PLANE[piece_type, color] == plane
+    return bytes(table)
+
+
+_PLANE_TABLES = tuple(map(_plane_table, range(PIECE_PLANES)))
+
+# The plane, and the squares and codes of the unmoved king and rook, for each
+# castling right.
+_CASTLING = tuple(
+    (CASTLING_PLANE + i, SQUARES[king_loc], PIECE_CODES[King, color, False],
+     SQUARES[rook_loc], PIECE_CODES[Rook, color, False])
+    for i, (color, king_loc, rook_loc) in enumerate(CASTLING_SQUARES.values())
+)
+
+_ONES = b'\x01' * 64
+_ZEROS = bytes(64)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('NumPy is required to create plane arrays. '
+                          'Install it with `pip install numpy`.')
+
+
+def write_planes(
+        board: ChessBoard,
+        buffer,
+        index: int = 0,
+        planes: int = PLANES
+) -> None:
+    """Writes the planes of `board` as position number `index` of `buffer`,
+    which must be a writable, C-contiguous buffer of bytes.
+
+    The board keeps a code per square (`ChessBoard.piece_codes`), so each
+    piece plane is one `bytes.translate` of the codes, and every plane is
+    written whole, without clearing the buffer first."""
+    if planes not in (PIECE_PLANES, PLANES):
+        raise ValueError(f'planes must be {PIECE_PLANES} or {PLANES}')
+    view = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    base = index * planes * 64
+
+    codes = board._piece_codes
+    # From file-major (a1, a2, ...) to rank-major (a1, b1, ...) order.
+    ranked = bytearray(64)
+    for x in range(8):
+        ranked[x::8] = codes[x * 8:x * 8 + 8]
+    for plane, table in enumerate(_PLANE_TABLES):
+        start = base + plane * 64
+        view[start:start + 64] = ranked.translate(table)
+    if planes == PIECE_PLANES:
+        return
+
+    start = base + SIDE_PLANE * 64
+    view[start:start + 64] = _ONES if board.whose_turn == 'white' else _ZEROS
+    for plane, king_sq, king, rook_sq, rook in _CASTLING:
+        start = base + plane * 64
+        view[start:start + 64] = _ONES \
+            if codes[king_sq] == king and codes[rook_sq] == rook else _ZEROS
+    start = base + REPETITION_PLANE * 64
+    view[start:start + 64] = _ONES if board.repetitions() > 1 else _ZEROS
+
+
+def export_planes(
+        boards: Iterable[ChessBoard],
+        buffer,
+        start: int = 0,
+        planes: int = PLANES
+) -> int:
+    """Writes consecutive positions into `buffer` from position number `start`
+    on. Returns how many positions were written."""
+    view = memoryview(buffer).cast('B')
+    capacity = len(view) // (planes * 64)
+    n = 0
+    for n, board in enumerate(boards, 1):
+        if start + n > capacity:
+            raise IndexError(f'buffer only has room for {capacity} positions')
+        write_planes(board, view, start + n - 1, planes)
+    return n
+
+
+def empty_planes(count: int, planes: int = PLANES) -> 'np.ndarray':
+    """A zeroed uint8 array of shape (count, planes, 8, 8)."""
+    _require_numpy()
+    return np.zeros((count, planes, 8, 8), dtype=np.uint8)
+
+
+def to_planes(board: ChessBoard, planes: int = PLANES) -> 'np.ndarray':
+    """The planes of a single position, shaped (planes, 8, 8)."""
+    out = empty_planes(1, planes)
+    write_planes(board, out, 0, planes)
+    return out[0]
+
+
+def open_npy(
+        path: str,
+        count: int,
+        planes: int = PLANES,
+        mode: str = 'w+'
+) -> 'np.memmap':
+    """A memory-mapped `.npy` file of shape (count, planes, 8, 8) to export
+    into. Use mode 'r+' to reopen an existing file and keep filling it."""
+    _require_numpy()
+    if mode == 'w+':
+        return np.lib.format.open_memmap(
+            path, mode=mode, dtype=np.uint8, shape=(count, planes, 8, 8)
+        )
+    return np.lib.format.open_memmap(path, mode=mode)
@@ -0,0 +1,196 @@
+"""A small iterative-deepening alpha-beta search over `ChessBoard`.
+
+This is not meant to play strong chess; it exists so front ends (e.g. the UCI
+driver in `uci.py`) have something to ask for a best move. Every node works on
+a copy of the board, so the position passed in is never modified.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from .main import ChessBoard, PROMOTION_TYPES
+from .moves import Move
+from .pieces import Pawn, PIECE_VALUES
+
+MATE_SCORE = 100000
+
+
+@dataclass
+class SearchResult:
+    best_move: Optional[Move] = None
+    score: int = 0
+    depth: int = 0
+    nodes: int = 0
+    seconds: float = 0.0
+    pv: List[Move] = field(default_factory=list)
+
+
+class SearchStopped(Exception):
+    pass
+
+
+def evaluate(board: ChessBoard) -> int:
+    """Material balance in centipawns from the side to move's point of view."""
+    score = 0
+    for file_ in board._mat:
+        for piece in file_:
+            if piece is None:
+                continue
+            if piece.color == 'white':
+                score += PIECE_VALUES[type(piece)]
+            else:
+                score -= PIECE_VALUES[type(piece)]
+    return score if board.whose_turn == 'white' else -score
+
+
+def legal_moves(board: ChessBoard) -> List[Move]:
+    """All legal moves, with pawn moves onto the last rank expanded into one
+    move per promotion piece type."""
+    li = []
+    for move in board.all_valid_moves():
+        loc, to = move
+        if isinstance(board[loc], Pawn) and to[1] in '18':
+            li.extend(
+                Move.make(loc, to, promotion, capture=move.is_capture)
+                for promotion in PROMOTION_TYPES
+            )
+        else:
+            li.append(move)
+    return li
+
+
+def make_move(board: ChessBoard, move: Move) -> ChessBoard:
+    child = board.copy()
+    child.move_from_to(move, safe_mode=False, notifications=False)
+    return child
+
+
+class Search(object):
+    """Runs one search. `stop_event` may be set from another thread, and the
+    search notices it at the next node it visits."""
+
+    def __init__(
+            self,
+            board: ChessBoard,
+            depth: Optional[int] = None,
+            movetime: Optional[float] = None,
+            nodes: Optional[int] = None,
+            stop_event: Optional[threading.Event] = None,
+            on_iteration: Optional[Callable[[SearchResult], None]] = None,
+            moves: Optional[List[Move]] = None
+    ):
+        """
+        :param depth: Maximum depth in plies. Unlimited if not set.
+        :param movetime: Maximum time in seconds.
+        :param nodes: Maximum number of nodes to visit.
+        :param moves: Only consider these moves at the root.
+        """
+        self.board = board
+        self.max_depth = depth
+        self.movetime = movetime
+        self.max_nodes = nodes
+        self.moves = moves
+        self.stop_event = stop_event or threading.Event()
+        self.on_iteration = on_iteration
+        self.nodes = 0
+        self._deadline = None
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if (
+            self.stop_event.is_set()
+            or (self.max_nodes is not None and self.nodes > self.max_nodes)
+            or (self._deadline is not None
+                and time.perf_counter() >= self._deadline)
+        ):
+            raise SearchStopped
+
+    def limit_time(self, seconds: float) -> None:
+        """Stops the search `seconds` from now; it may already be running,
+        e.g. on a ponder move the opponent has just played."""
+        self._deadline = time.perf_counter() + seconds
+
+    def run(self) -> SearchResult:
+        start = time.perf_counter()
+        if self.movetime is not None:
+            self._deadline = start + self.movetime
+        result = SearchResult()
+        root_moves = legal_moves(self.board)
+        if self.moves is not None:
+            root_moves = [m for m in root_moves if m in self.moves]
+        if not root_moves:
+            return result
+        result.best_move = root_moves[0]
+        depth = 1
+        while self.max_depth is None or depth <= self.max_depth:
+            try:
+                score, pv = self._root(root_moves, depth)
+            except SearchStopped:
+                break
+            result.best_move, result.score, result.pv = pv[0], score, pv
+            result.depth = depth
+            result.nodes = self.nodes
+            result.seconds = time.perf_counter() - start
+            if self.on_iteration is not None:
+                self.on_iteration(result)
+            if abs(score) >= MATE_SCORE - depth:
+                break
+            # Search the previous best move first on the next iteration.
+            root_moves.remove(pv[0])
+            root_moves.insert(0, pv[0])
+            depth += 1
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def _root(self, moves: List[Move], depth: int):
+        alpha, beta = -MATE_SCORE - 1, MATE_SCORE + 1
+        best_pv = None
+        for move in moves:
+            score, pv = self._negamax(make_move(self.board, move),
+                                      depth - 1, -beta, -alpha, 1)
+            score = -score
+            if best_pv is None or score > alpha:
+                alpha, best_pv = score, [move, *pv]
+        return alpha, best_pv
+
+    def _negamax(self, board: ChessBoard, depth: int, alpha: int, beta: int,
+                 ply: int):
+        self._tick()
+        if depth <= 0:
+            return evaluate(board), []
+        moves = legal_moves(board)
+        if not moves:
+            if board.player_in_check(board.whose_turn):
+                return -MATE_SCORE + ply, []
+            return 0, []
+        moves.sort(key=lambda m: _capture_order(board, m), reverse=True)
+        best_pv = []
+        for move in moves:
+            score, pv = self._negamax(make_move(board, move),
+                                      depth - 1, -beta, -alpha, ply + 1)
+            score = -score
+            if score >= beta:
+                return beta, []
+            if score > alpha:
+                alpha, best_pv = score, [move, *pv]
+        return alpha, best_pv
+
+
+def _capture_order(board: ChessBoard, move: Move) -> int:
+    """Most valuable victim first, then quiet moves, then captures that lose
+    material in the exchange."""
+    victim = board[move.to]
+    if victim is None:
+        return PIECE_VALUES[move.promotion] if move.promotion else 0
+    attacker = board[move.loc]
+    if PIECE_VALUES[type(attacker)] > PIECE_VALUES[type(victim)]:
+        exchange = board.static_exchange(move)
+        if exchange < 0:
+            return exchange
+    return 10 * PIECE_VALUES[type(victim)] - PIECE_VALUES[type(attacker)]
+
+
+def search(board: ChessBoard, **kwargs) -> SearchResult:
+    return Search(board, **kwargs).run()
@@ -0,0 +1,560 @@
+"""Endgame tablebases for small material signatures, e.g. KQvK, KRvK, KPvK or
+KQvKR, built offline by retrograde analysis.
+
+Generate tables from the command line:
+
+    python -m chess.board.tablebase KQvK KRvK KPvK -d tables/
+
+and probe them from a live board:
+
+    >>> tb = Tablebase('tables/')
+    >>> tb.probe(ChessBoard.from_fen('8/8/8/4k3/8/8/8/4KQ2 w - - 0 1'))
+    TablebaseResult(wdl=1, dtm=19)
+
+Each table is one file: a short header, then one byte per position. A
+position's byte lives at `HEADER_SIZE + index`, where the index is computed
+from the side to move and the square of every piece, so probing is a single
+lookup into a memory-mapped file. The byte is 0 for a draw, 255 for a position
+that can't happen, and otherwise the distance to mate in plies plus one. An odd
+distance means the side to move mates; an even one means it gets mated.
+
+The retrograde analysis runs on its own square-index move generator, built on
+the geometry tables in `attacks.py`, since it visits every placement of the
+pieces (over half a million for three pieces, tens of millions for four) and a
+full `ChessBoard` per position would take days.
+
+Castling and en passant are ignored, which is exact for pawnless tables and for
+the vast majority of positions with pawns.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .main import ChessBoard
+from .moves import Move
+from .attacks import (
+    KING_MOVES, KNIGHT_MOVES, KING_SETS, KNIGHT_SETS, SLIDER_RAYS, LINES,
+    BETWEEN, PAWN_DIRECTION, PAWN_START_RANK, PAWN_LAST_RANK,
+    PAWN_ATTACK_SETS, WHITE, BLACK
+)
+
+MAGIC = b'CHTB'
+VERSION = 1
+HEADER = struct.Struct('<4sBB16s')  # magic, version, piece count, signature
+HEADER_SIZE = HEADER.size
+
+DRAW = 0
+ILLEGAL = 255
+# Marks a position in `exit_floor` that has a way out which isn't a loss.
+_NOT_LOSEABLE = 255
+
+PIECE_ORDER = 'KQRBNP'
+PIECE_STRENGTH = {'K': 0, 'Q': 9, 'R': 5, 'B': 3, 'N': 3, 'P': 1}
+
+
+def _attacks(kind: str, color: int, frm: int, to: int, occupied) -> bool:
+    if kind == 'K':
+        return to in KING_SETS[frm]
+    if kind == 'N':
+        return to in KNIGHT_SETS[frm]
+    if kind == 'P':
+        return to in PAWN_ATTACK_SETS[color][frm]
+    line = LINES[frm * 64 + to]
+    if line is None or (kind != 'Q' and kind != line):
+        return False
+    for sq in BETWEEN[frm * 64 + to]:
+        if sq in occupied:
+            return False
+    return True
+
+
+# ~~~~~~ Material signatures
+
+
+def parse_signature(signature: str) -> Tuple[str, str]:
+    """'KQvK' -> ('KQ', 'K'), with each side's pieces in canonical order."""
+    try:
+        white, black = signature.upper().split('V')
+    except ValueError:
+        raise ValueError(f'{signature!r} is not a signature like KQvK.')
+    sides = []
+    for side in (white, black):
+        if side.count('K') != 1 or not side.startswith('K') or any(
+            c not in PIECE_ORDER for c in side
+        ):
+            raise ValueError(f'{signature!r} is not a signature like KQvK.')
+        sides.append('K' + ''.join(sorted(side[1:], key=PIECE_ORDER.index)))
+    return sides[0], sides[1]
+
+
+def _strength(side: str) -> Tuple[int, List[int]]:
+    return (
+        sum(PIECE_STRENGTH[c] for c in side),
+        [-PIECE_ORDER.index(c) for c in side]
+    )
+
+
+@lru_cache(maxsize=None)
+def canonical_signature(white: str, black: str) -> Tuple[str, bool]:
+    """Tables are stored with the stronger side as white. Returns the stored
+    signature and whether colors have to be flipped to look a position up."""
+    white, black = (
+        'K' + ''.join(sorted(side.replace('K', ''), key=PIECE_ORDER.index))
+        for side in (white, black)
+    )
+    if _strength(black) > _strength(white):
+        return f'{black}v{white}', True
+    return f'{white}v{black}', False
+
+
+@lru_cache(maxsize=None)
+def is_dead_draw(signature: str) -> bool:
+    """Neither side can ever mate: bare kings plus at most one minor piece."""
+    white, black = parse_signature(signature)
+    rest = white[1:] + black[1:]
+    return rest in ('', 'B', 'N')
+
+
+def _layout(signature: str) -> Tuple[List[str], List[int]]:
+    white, black = parse_signature(signature)
+    kinds = list(white) + list(black)
+    colors = [WHITE] * len(white) + [BLACK] * len(black)
+    return kinds, colors
+
+
+def _index(stm: int, squares: Sequence[int]) -> int:
+    idx = stm
+    for sq in squares:
+        idx = idx * 64 + sq
+    return idx
+
+
+def _decode(idx: int, n: int) -> Tuple[int, List[int]]:
+    squares = [0] * n
+    for i in range(n - 1, -1, -1):
+        idx, squares[i] = divmod(idx, 64)
+    return idx, squares
+
+
+def _flip_square(sq: int) -> int:
+    return sq - (sq % 8) + 7 - (sq % 8)
+
+
+def _lookup_index(
+        pieces: List[Tuple[str, int, int]],
+        stm: int
+) -> Tuple[str, int]:
+    """Map (kind, color, square) pieces with `stm` to move onto the stored
+    table's signature and index."""
+    white = ''.join(k for k, c, _ in pieces if c == WHITE)
+    black = ''.join(k for k, c, _ in pieces if c == BLACK)
+    stored, flip = canonical_signature(white, black)
+    if flip:
+        pieces = [(k, 1 - c, _flip_square(sq)) for k, c, sq in pieces]
+        stm = 1 - stm
+    kinds, colors = _layout(stored)
+    remaining = list(pieces)
+    squares = []
+    for kind, color in zip(kinds, colors):
+        for j, (k, c, sq) in enumerate(remaining):
+            if k == kind and c == color:
+                squares.append(sq)
+                del remaining[j]
+                break
+    return stored, _index(stm, squares)
+
+
+# ~~~~~~ Generation
+
+
+class _Position(object):
+    """Move generation for one placement of the pieces of a table."""
+
+    def __init__(self, kinds: List[str], colors: List[int]):
+        self.kinds = kinds
+        self.colors = colors
+        self.kings = [kinds.index('K'), len(kinds) - 1 - kinds[::-1].index('K')]
+
+    def in_check(self, color: int, squares: List[int]) -> bool:
+        king_sq = squares[self.kings[color]]
+        occupied = set(squares)
+        occupied.discard(-1)
+        kinds, colors = self.kinds, self.colors
+        for j, sq in enumerate(squares):
+            if sq >= 0 and colors[j] != color and _attacks(
+                kinds[j], colors[j], sq, king_sq, occupied
+            ):
+                return True
+        return False
+
+    def valid(self, stm: int, squares: List[int]) -> bool:
+        if len(set(squares)) != len(squares):
+            return False
+        for kind, sq in zip(self.kinds, squares):
+            if kind == 'P' and sq % 8 in (0, 7):
+                return False
+        return not self.in_check(1 - stm, squares)
+
+    def moves(self, stm: int, squares: List[int]):
+        """Yields (piece, to, captured piece or -1, promotion or None) for
+        every pseudo-legal move."""
+        occupant = {sq: j for j, sq in enumerate(squares) if sq >= 0}
+        kinds, colors = self.kinds, self.colors
+        for i, sq in enumerate(squares):
+            if sq < 0 or colors[i] != stm:
+                continue
+            kind = kinds[i]
+            if kind == 'P':
+                yield from self._pawn_moves(i, sq, stm, occupant)
+                continue
+            if kind == 'K' or kind == 'N':
+                targets = KING_MOVES[sq] if kind == 'K' else KNIGHT_MOVES[sq]
+                for to in targets:
+                    j = occupant.get(to, -1)
+                    if j < 0 or colors[j] != stm:
+                        yield i, to, j, None
+                continue
+            for ray in SLIDER_RAYS[kind][sq]:
+                for to in ray:
+                    j = occupant.get(to, -1)
+                    if j < 0:
+                        yield i, to, -1, None
+                        continue
+                    if colors[j] != stm:
+                        yield i, to, j, None
+                    break
+
+    def _pawn_moves(self, i: int, sq: int, stm: int, occupant: dict):
+        step = PAWN_DIRECTION[stm]
+        last = PAWN_LAST_RANK[stm]
+        promotions = ('Q', 'R', 'B', 'N')
+        to = sq + step
+        if to not in occupant:
+            if to % 8 == last:
+                for p in promotions:
+                    yield i, to, -1, p
+            else:
+                yield i, to, -1, None
+                if sq % 8 == PAWN_START_RANK[stm] and to + step not in occupant:
+                    yield i, to + step, -1, None
+        for to in PAWN_ATTACK_SETS[stm][sq]:
+            j = occupant.get(to, -1)
+            if j >= 0 and self.colors[j] != stm:
+                if to % 8 == last:
+                    for p in promotions:
+                        yield i, to, j, p
+                else:
+                    yield i, to, j, None
+
+    def unmoves(self, stm: int, squares: List[int]):
+        """Yields the squares of every position from which the side that just
+        moved (i.e. not `stm`) reached this one with a quiet, non-promoting
+        move."""
+        mover = 1 - stm
+        occupied = set(squares)
+        kinds, colors = self.kinds, self.colors
+        for i, sq in enumerate(squares):
+            if colors[i] != mover:
+                continue
+            kind = kinds[i]
+            if kind == 'P':
+                step = PAWN_DIRECTION[mover]
+                frm = sq - step
+                if frm in occupied or frm % 8 in (0, 7):
+                    continue
+                yield squares[:i] + [frm] + squares[i + 1:]
+                frm2 = frm - step
+                if frm2 % 8 == PAWN_START_RANK[mover] and frm2 not in occupied:
+                    yield squares[:i] + [frm2] + squares[i + 1:]
+                continue
+            if kind == 'K' or kind == 'N':
+                for frm in (KING_MOVES[sq] if kind == 'K'
+                            else KNIGHT_MOVES[sq]):
+                    if frm not in occupied:
+                        yield squares[:i] + [frm] + squares[i + 1:]
+                continue
+            for ray in SLIDER_RAYS[kind][sq]:
+                for frm in ray:
+                    if frm in occupied:
+                        break
+                    yield squares[:i] + [frm] + squares[i + 1:]
+
+
+class _Generator(object):
+
+    def __init__(self, signature: str, tables: 'Tablebase', verbose: bool):
+        white, black = parse_signature(signature)
+        self.signature = f'{white}v{black}'
+        self.kinds, self.colors = _layout(self.signature)
+        self.n = len(self.kinds)
+        self.size = 64 ** self.n
+        self.position = _Position(self.kinds, self.colors)
+        self.tables = tables
+        self.verbose = verbose
+
+    def log(self, msg: str) -> None:
+        if self.verbose:
+            print(f'[{self.signature}] {msg}', file=sys.stderr)
+
+    def _exit_value(self, squares: List[int], i: int, to: int, captured: int,
+                    promotion: Optional[str], stm: int) -> int:
+        pieces = [
+            (promotion if j == i and promotion else self.kinds[j],
+             self.colors[j],
+             to if j == i else sq)
+            for j, sq in enumerate(squares) if j != captured
+        ]
+        stored, idx = _lookup_index(pieces, 1 - stm)
+        if is_dead_draw(stored):
+            return DRAW
+        return self.tables.values(stored)[idx]
+
+    def run(self) -> bytearray:
+        start = time.perf_counter()
+        n, size, position = self.n, self.size, self.position
+        values = bytearray(2 * size)
+        counters = bytearray(2 * size)
+        exit_floor = bytearray(2 * size)
+        buckets = defaultdict(list)
+
+        # Pass 1: mark impossible positions, mates, stalemates, and positions
+        # whose moves leave the table (captures, promotions), and count the
+        # moves that stay inside it.
+        idx = -1
+        for stm in (WHITE, BLACK):
+            for squares in product(range(64), repeat=n):
+                idx += 1
+                squares = list(squares)
+                if not position.valid(stm, squares):
+                    values[idx] = ILLEGAL
+                    continue
+                count = 0
+                floor = 0
+                any_legal = False
+                for i, to, captured, promotion in position.moves(
+                        stm, squares):
+                    child = squares[:]
+                    child[i] = to
+                    if captured >= 0:
+                        child[captured] = -1
+                    if position.in_check(stm, child):
+                        continue
+                    any_legal = True
+                    if captured < 0 and promotion is None:
+                        count += 1
+                        continue
+                    value = self._exit_value(squares, i, to, captured,
+                                             promotion, stm)
+                    if value == DRAW or value == ILLEGAL:
+                        floor = _NOT_LOSEABLE
+                    elif (value - 1) % 2 == 0:
+                        # The opponent gets mated; we win.
+                        buckets[value].append(idx)
+                        floor = _NOT_LOSEABLE
+                    elif floor != _NOT_LOSEABLE:
+                        floor = max(floor, value - 1)
+                if not any_legal:
+                    if position.in_check(stm, squares):
+                        buckets[0].append(idx)
+                    continue
+                counters[idx] = count
+                exit_floor[idx] = floor
+                if count == 0 and floor != _NOT_LOSEABLE:
+                    buckets[floor + 1].append(idx)
+        self.log(f'initialized in {time.perf_counter() - start:.1f}s')
+
+        # Pass 2: walk backwards from the resolved positions in order of
+        # distance to mate, so the first value assigned is the shortest.
+        dtm = 0
+        while buckets:
+            for idx in buckets.pop(dtm, ()):
+                if values[idx] != DRAW:
+                    continue
+                values[idx] = dtm + 1
+                stm, squares = _decode(idx, n)
+                for prev in position.unmoves(stm, squares):
+                    prev_idx = _index(1 - stm, prev)
+                    if values[prev_idx] != DRAW:
+                        continue
+                    if dtm % 2 == 0:
+                        buckets[dtm + 1].append(prev_idx)
+                        continue
+                    counters[prev_idx] -= 1
+                    floor = exit_floor[prev_idx]
+                    if counters[prev_idx] == 0 and floor != _NOT_LOSEABLE:
+                        buckets[max(dtm, floor) + 1].append(prev_idx)
+            dtm += 1
+        self.log(f'solved to dtm {dtm - 1} in '
+                 f'{time.perf_counter() - start:.1f}s')
+        return values
+
+
+def _dependencies(signature: str) -> List[str]:
+    """Stored signatures reachable in one capture or promotion."""
+    white, black = parse_signature(signature)
+    deps = set()
+    for side, other, swap in ((white, black, False), (black, white, True)):
+        for k, c in enumerate(side):
+            if c == 'K':
+                continue
+            # This piece gets captured.
+            rest = side[:k] + side[k + 1:]
+            deps.add(canonical_signature(*((other, rest) if swap
+                                           else (rest, other)))[0])
+            if c == 'P':
+                for p in 'QRBN':
+                    promoted = side[:k] + p + side[k + 1:]
+                    deps.add(canonical_signature(
+                        *((other, promoted) if swap else (promoted, other))
+                    )[0])
+    return sorted(d for d in deps if not is_dead_draw(d))
+
+
+def write_table(path: str, signature: str, values: bytes) -> None:
+    n = len(signature.replace('v', ''))
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n, signature.encode()))
+        f.write(values)
+
+
+# ~~~~~~ Probing
+
+
+@dataclass
+class TablebaseResult:
+    wdl: int  # 1 if the side to move wins, -1 if it loses, 0 for a draw
+    dtm: Optional[int] = None  # plies to mate, if not a draw
+
+
+class Tablebase(object):
+    """A directory of tables. Files are memory-mapped the first time they are
+    needed and stay open until `close()`."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._tables: Dict[str, memoryview] = {}
+        self._maps: List[mmap.mmap] = []
+
+    def path(self, signature: str) -> str:
+        return os.path.join(self.directory, f'{signature}.tb')
+
+    def values(self, signature: str):
+        """The table's bytes, indexable by position index. Returns None if the
+        table doesn't exist."""
+        if signature not in self._tables:
+            path = self.path(signature)
+            if not os.path.exists(path):
+                return None
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, _, _ = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                mm.close()
+                raise ValueError(f'{path} is not a tablebase file.')
+            self._maps.append(mm)
+            # A memoryview offset past the header means index == offset.
+            self._tables[signature] = memoryview(mm)[HEADER_SIZE:]
+        return self._tables[signature]
+
+    def generate(self, signature: str, verbose: bool = False) -> str:
+        """Generate a table (and any tables it depends on) unless it exists.
+        Returns the path of the table."""
+        white, black = parse_signature(signature)
+        stored, _ = canonical_signature(white, black)
+        path = self.path(stored)
+        if os.path.exists(path):
+            return path
+        for dep in _dependencies(stored):
+            self.generate(dep, verbose=verbose)
+        values = _Generator(stored, self, verbose).run()
+        os.makedirs(self.directory, exist_ok=True)
+        write_table(path, stored, values)
+        return path
+
+    def probe(self, board: ChessBoard) -> Optional[TablebaseResult]:
+        """Look the board up. Returns None if there's no table for its
+        material."""
+        pieces = []
+        for x, file_ in enumerate(board._mat):
+            for y, piece in enumerate(file_):
+                if piece is not None:
+                    pieces.append((
+                        piece._char,
+                        WHITE if piece.color == 'white' else BLACK,
+                        x * 8 + y
+                    ))
+        if len(pieces) > 6:
+            return None
+        stm = WHITE if board.whose_turn == 'white' else BLACK
+        stored, idx = _lookup_index(pieces, stm)
+        if is_dead_draw(stored):
+            return TablebaseResult(wdl=0)
+        values = self.values(stored)
+        if values is None:
+            return None
+        value = values[idx]
+        if value == DRAW:
+            return TablebaseResult(wdl=0)
+        if value == ILLEGAL:
+            raise ValueError('The position is not legal.')
+        dtm = value - 1
+        return TablebaseResult(wdl=1 if dtm % 2 else -1, dtm=dtm)
+
+    def best_move(self, board: ChessBoard) -> Optional[Move]:
+        """The move that mates fastest when winning, and holds out longest
+        when losing. Returns None without a table or legal moves."""
+        if self.probe(board) is None:
+            return None
+        best, best_key = None, None
+        for move in board.all_valid_moves():
+            child = board.copy()
+            child.move_from_to(move, safe_mode=False, notifications=False)
+            result = self.probe(child)
+            if result is None:
+                continue
+            # Rank by the result for the side that moved: quickest win first,
+            # then draws, then slowest loss.
+            if result.wdl < 0:
+                key = (2, -result.dtm)
+            elif result.wdl == 0:
+                key = (1, 0)
+            else:
+                key = (0, result.dtm)
+            if best_key is None or key > best_key:
+                best, best_key = move, key
+        return best
+
+    def close(self) -> None:
+        for view in self._tables.values():
+            view.release()
+        self._tables.clear()
+        for mm in self._maps:
+            mm.close()
+        self._maps = []
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.board.tablebase',
+        description='Generate endgame tablebases.'
+    )
+    parser.add_argument('signatures', nargs='+',
+                        help='Material signatures, e.g. KQvK KRvK KPvK.')
+    parser.add_argument('-d', '--directory', default='.')
+    parser.add_argument('-q', '--quiet', action='store_true')
+    args = parser.parse_args(argv)
+    tablebase = Tablebase(args.directory)
+    for signature in args.signatures:
+        print(tablebase.generate(signature, verbose=not args.quiet))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,364 @@
+"""Find tactics in a position, and mine games for puzzles.
+
+    >>> board = ChessBoard.from_fen('6k1/5ppp/8/8/8/8/8/R3K3 w Q - 0 1')
+    >>> find_tactics(board)
+    [Tactic(motif='mate', solution=(Move.from_uci('a1a8'),), gain=1)]
+
+The motifs are, for the side to move:
+
+- mate: a forced mate in at most `mate_depth` moves.
+- fork: a knight or pawn move to a safe square attacking two pieces, each of
+  them the king, worth more than the forker, or undefended.
+- pin: a bishop, rook or queen move to a safe square pinning a piece that
+  can't take it to its king. An undefended piece gains its whole value, a
+  defended one what it's worth more than the pinner; either has to gain at
+  least `min_gain`.
+- hanging: a capture that wins at least `min_gain` centipawns by static
+  exchange evaluation.
+
+Every position is pruned with the attack maps first, which most positions
+don't get past: mates are only searched for when the enemy king has at most
+two free squares next to it and a piece can move to check it, forks only on the
+squares a knight or pawn could attack two targets from, pins only along the
+lines out of the enemy king, and captures only of pieces that are undefended
+or attacked by something cheaper. What's left is checked with make/unmake
+probes and static exchange evaluation on the flat squares, and mates with the
+proof-number search in `mate.py`. A tactic is a puzzle candidate, not a
+proven best line: replies beyond the ones above aren't looked at.
+
+`mine_game` scans every position of a game and records whether the player
+found the tactic or missed it. For a corpus, see the `tactics` job in
+`chess.board.jobs`.
+"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .attacks import (
+    SQUARES, SQUARE_NAMES, KING_MOVES, KNIGHT_MOVES, ROOK_RAYS, BISHOP_RAYS,
+    PAWN_ATTACK_SETS, PAWN_DIRECTION, PAWN_START_RANK, PAWN_LAST_RANK,
+    COLOR_INDEX, attackers, cells as flatten, leaves_king_attacked,
+    static_exchange
+)
+from .main import ChessBoard, InvalidMove
+from .mate import MateSolver
+from .moves import Move
+from .pgn import PgnGame
+from .pieces import PIECE_VALUES, Pawn, Knight, Bishop, Rook, Queen, King
+from .utils import invert_color
+
+MATE = 'mate'
+FORK = 'fork'
+PIN = 'pin'
+HANGING = 'hanging'
+MOTIFS = (MATE, FORK, PIN, HANGING)
+
+# Nodes the mate search may expand per position.
+MATE_NODES = 20_000
+
+# A king is the last piece anyone wants to capture with.
+_ATTACKER_VALUES = {**PIECE_VALUES, King: 20000}
+
+
+class Tactic(NamedTuple):
+    motif: str
+    solution: Tuple[Move, ...]
+    gain: int  # Centipawns won or, for a mate, moves to mate
+
+
+class Puzzle(NamedTuple):
+    game: Optional[int]
+    ply: int  # Moves played before the puzzle's position
+    fen: str
+    motif: str
+    solution: Tuple[str, ...]  # UCI
+    gain: int
+    played: str  # The move played in the game, in SAN
+    found: bool  # Whether that was the solution's first move
+
+
+def _promotion(piece, to: int) -> Optional[type]:
+    if isinstance(piece, Pawn) \
+            and to % 8 == PAWN_LAST_RANK[COLOR_INDEX[piece.color]]:
+        return Queen
+    return None
+
+
+def _move(cells: list, frm: int, to: int) -> Move:
+    return Move.make(SQUARE_NAMES[frm], SQUARE_NAMES[to],
+                     _promotion(cells[frm], to),
+                     capture=cells[to] is not None)
+
+
+def _safe(cells: list, frm: int, to: int, king_sq: int, color: str) -> bool:
+    """Legal, and the piece can't be won on `to`."""
+    return not leaves_king_attacked(cells, frm, to, king_sq, color) \
+        and static_exchange(cells, frm, to, _promotion(cells[frm], to)) >= 0
+
+
+# ~~~~~~ Motifs
+
+
+def _can_check(cells: list, us: str, enemy_king_sq: int) -> bool:
+    """Whether a knight, bishop, rook or queen of ours can move to a square
+    attacking the enemy king. Pawn and discovered checks aren't counted."""
+    for s in KNIGHT_MOVES[enemy_king_sq]:
+        if cells[s] is not None and cells[s].color == us:
+            continue
+        for frm in KNIGHT_MOVES[s]:
+            if isinstance(cells[frm], Knight) and cells[frm].color == us:
+                return True
+    for rays, sliders in (
+            (ROOK_RAYS, (Rook, Queen)), (BISHOP_RAYS, (Bishop, Queen))
+    ):
+        for ray in rays[enemy_king_sq]:
+            for s in ray:
+                if cells[s] is not None and cells[s].color == us:
+                    break
+                if any(isinstance(cells[frm], sliders)
+                       for frm in attackers(cells, s, us)):
+                    return True
+                if cells[s] is not None:
+                    break
+    return False
+
+
+def _mate(
+        board: ChessBoard,
+        cells: list,
+        ours: bytes,
+        enemy_king_sq: int,
+        depth: int,
+        solver: MateSolver
+) -> Optional[Tactic]:
+    us = board.whose_turn
+    free = sum(
+        1 for s in KING_MOVES[enemy_king_sq]
+        if not ours[s] and (cells[s] is None or cells[s].color == us)
+    )
+    if free > 2 or not _can_check(cells, us, enemy_king_sq):
+        return None
+    # Longer mates are only looked for around a king that's already under
+    # fire; elsewhere a mate in one is all that's checked for.
+    pressure = sum(ours[s] for s in KING_MOVES[enemy_king_sq])
+    if free and pressure < 3:
+        depth = 1
+    result = solver.solve(board, depth)
+    if not result.mate or not result.pv:
+        return None
+    return Tactic(MATE, tuple(result.pv), result.depth)
+
+
+def _fork_squares(
+        cells: list,
+        them: str,
+        theirs: bytes,
+        steps,
+        value: int
+) -> Dict[int, List[int]]:
+    """Squares from which a piece worth `value`, attacking like `steps`, would
+    attack two or more targets, and the targets."""
+    hits: Dict[int, List[int]] = {}
+    for sq, piece in enumerate(cells):
+        if piece is None or piece.color != them or isinstance(piece, Pawn):
+            continue
+        if isinstance(piece, King) or PIECE_VALUES[type(piece)] > value \
+                or not theirs[sq]:
+            for s in steps[sq]:
+                hits.setdefault(s, []).append(sq)
+    return {s: targets for s, targets in hits.items() if len(targets) > 1}
+
+
+def _fork_gain(cells: list, targets: List[int]) -> int:
+    """What a fork of `targets` should win: the second most valuable target,
+    or the most valuable if the king is one of them."""
+    values = sorted((PIECE_VALUES[type(cells[t])] for t in targets
+                     if not isinstance(cells[t], King)), reverse=True)
+    if len(values) < len(targets):
+        return values[0]
+    return values[1]
+
+
+def _forks(
+        cells: list,
+        us: str,
+        theirs: bytes,
+        king_sq: int,
+        min_gain: int
+) -> Optional[Tactic]:
+    them = invert_color(us)
+    color_idx = COLOR_INDEX[us]
+    # The squares each target could be attacked from by an enemy knight or
+    # pawn are the squares our knights and pawns would fork from.
+    knight_squares = _fork_squares(cells, them, theirs, KNIGHT_MOVES,
+                                   PIECE_VALUES[Knight])
+    pawn_squares = _fork_squares(cells, them, theirs,
+                                 PAWN_ATTACK_SETS[1 - color_idx],
+                                 PIECE_VALUES[Pawn])
+    candidates = []
+    for s, targets in knight_squares.items():
+        if cells[s] is not None and cells[s].color == us:
+            continue
+        for frm in KNIGHT_MOVES[s]:
+            piece = cells[frm]
+            if isinstance(piece, Knight) and piece.color == us:
+                candidates.append((frm, s, targets))
+    direction = PAWN_DIRECTION[color_idx]
+    for s, targets in pawn_squares.items():
+        if cells[s] is not None:
+            continue
+        rank = s % 8 - direction
+        if not 0 <= rank < 8:
+            continue
+        frm = s - direction
+        piece = cells[frm]
+        if piece is None and rank == PAWN_START_RANK[color_idx] + direction:
+            frm -= direction
+            piece = cells[frm]
+        if isinstance(piece, Pawn) and piece.color == us:
+            candidates.append((frm, s, targets))
+    best = None
+    for frm, to, targets in candidates:
+        gain = _fork_gain(cells, targets)
+        if gain < min_gain or (best is not None and gain <= best.gain):
+            continue
+        if _safe(cells, frm, to, king_sq, us):
+            best = Tactic(FORK, (_move(cells, frm, to),), gain)
+    return best
+
+
+def _pins(
+        cells: list,
+        us: str,
+        theirs: bytes,
+        king_sq: int,
+        enemy_king_sq: int,
+        min_gain: int
+) -> Optional[Tactic]:
+    them = invert_color(us)
+    best = None
+    for rays, sliders in (
+            (ROOK_RAYS, (Rook, Queen)), (BISHOP_RAYS, (Bishop, Queen))
+    ):
+        for ray in rays[enemy_king_sq]:
+            pinned = None
+            for s in ray:
+                piece = cells[s]
+                if pinned is None:
+                    if piece is None:
+                        continue
+                    # A piece that can move along the line would just take
+                    # the pinner.
+                    if piece.color != them or isinstance(
+                            piece, (Pawn, *sliders)):
+                        break
+                    pinned = s
+                    continue
+                if piece is not None:
+                    break
+                # A slider arriving on this empty square pins `pinned`.
+                for frm in attackers(cells, s, us):
+                    pinner = cells[frm]
+                    if not isinstance(pinner, sliders):
+                        continue
+                    gain = PIECE_VALUES[type(cells[pinned])]
+                    if theirs[pinned]:
+                        gain -= PIECE_VALUES[type(pinner)]
+                    if gain < min_gain or (best is not None
+                                           and gain <= best.gain):
+                        continue
+                    if _safe(cells, frm, s, king_sq, us):
+                        best = Tactic(PIN, (_move(cells, frm, s),), gain)
+    return best
+
+
+def _hanging(
+        cells: list,
+        us: str,
+        ours: bytes,
+        theirs: bytes,
+        king_sq: int,
+        min_gain: int
+) -> Optional[Tactic]:
+    best = None
+    for sq, piece in enumerate(cells):
+        if piece is None or piece.color == us or isinstance(piece, King) \
+                or not ours[sq]:
+            continue
+        froms = attackers(cells, sq, us)
+        if theirs[sq] and all(
+                _ATTACKER_VALUES[type(cells[frm])] >= PIECE_VALUES[type(piece)]
+                for frm in froms
+        ):
+            continue
+        for frm in froms:
+            if leaves_king_attacked(cells, frm, sq, king_sq, us):
+                continue
+            gain = static_exchange(cells, frm, sq, _promotion(cells[frm], sq))
+            if gain >= min_gain and (best is None or gain > best.gain):
+                best = Tactic(HANGING, (_move(cells, frm, sq),), gain)
+    return best
+
+
+# ~~~~~~ Positions and games
+
+
+def find_tactics(
+        board: ChessBoard,
+        mate_depth: int = 2,
+        min_gain: int = 200,
+        solver: Optional[MateSolver] = None
+) -> List[Tactic]:
+    """The tactics the side to move has, at most one per motif. A forced mate
+    is reported on its own, since it makes the rest moot."""
+    us = board.whose_turn
+    them = invert_color(us)
+    cells = flatten(board)
+    ours, theirs = board.attack_map(us), board.attack_map(them)
+    king_sq = SQUARES[board._king_locs[us]]
+    enemy_king_sq = SQUARES[board._king_locs[them]]
+    if mate_depth:
+        solver = solver or MateSolver(max_nodes=MATE_NODES)
+        mate = _mate(board, cells, ours, enemy_king_sq, mate_depth, solver)
+        if mate is not None:
+            return [mate]
+    found = (
+        _forks(cells, us, theirs, king_sq, min_gain),
+        _pins(cells, us, theirs, king_sq, enemy_king_sq, min_gain),
+        _hanging(cells, us, ours, theirs, king_sq, min_gain)
+    )
+    return [tactic for tactic in found if tactic is not None]
+
+
+def mine_game(
+        game: PgnGame,
+        mate_depth: int = 2,
+        min_gain: int = 200,
+        solver: Optional[MateSolver] = None
+) -> List[Puzzle]:
+    """A puzzle for each tactic in each position of `game` where a move was
+    played, saying whether the move played was the solution. The game is
+    played forwards on one board; scanning stops at the first move the board
+    can't play."""
+    board = ChessBoard.from_fen(game.headers['FEN']) \
+        if 'FEN' in game.headers else ChessBoard()
+    solver = solver or MateSolver(max_nodes=MATE_NODES)
+    puzzles = []
+    for ply, san in enumerate(game.moves):
+        try:
+            played = board.parse_san(san)
+        except InvalidMove:
+            break
+        tactics = find_tactics(board, mate_depth, min_gain, solver)
+        if tactics:
+            fen = board.fen()
+            for tactic in tactics:
+                puzzles.append(Puzzle(
+                    game.index, ply, fen, tactic.motif,
+                    tuple(move.uci() for move in tactic.solution),
+                    tactic.gain, san,
+                    played == tactic.solution[0]
+                ))
+        try:
+            board.make_move(played)
+        except InvalidMove:
+            break
+    return puzzles
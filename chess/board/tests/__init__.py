@@ -1,6 +1,27 @@
 from .test_game import TestGame
-from .test_display import TestDisplay
-from .test_grid import TestGrid
+from .test_display import TestDisplay, TestRender, TestTerminalView
+from .test_grid import TestGrid, TestFlatGrid
+from .test_uci import TestFen, TestSpecialMoves, TestUci
+from .test_instrumentation import TestInstrumentation
+from .test_benchmarks import TestBenchmarks
+from .test_draws import TestDraws
+from .test_copy import TestClone, TestCopyOnWrite, TestFlatChessBoard
+from .test_tablebase import TestSignatures, TestTablebase
+from .test_validation import TestValidateMoves
+from .test_pipeline import TestPgn, TestPipeline
+from .test_planes import TestPlanes
+from .test_archive import TestArchive
+from .test_moves import TestMove, TestSan
+from .test_mate import TestMateSolver
+from .test_exchange import TestStaticExchange
+from .test_attack_maps import TestAttackMaps
+from .test_events import TestEvents
+from .test_jobs import TestPerft, TestJobs
+from .test_cache import TestPositionCache, TestSharedCache
+from .test_threads import TestThreads
+from .test_notation import TestNotationMismatch
+from .test_tree import TestMakeUnmake, TestGameTree
+from .test_tactics import TestTactics
 
 if __name__ == '__main__':
     import unittest
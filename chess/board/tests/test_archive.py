@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard
+    from chess.board.archive import ArchiveWriter, GameArchive, write_archive
+    from chess.board.benchmarks.cases import GAMES
+    from chess.board.pgn import PgnGame, ReplayWarning, parse_movetext
+    from chess.board.moves import Move
+    from chess.board.pieces import Knight
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'games.chga')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        games = [
+            PgnGame({'Event': name}, parse_movetext(movetext)[0])
+            for name, movetext in GAMES.items()
+        ]
+        self.assertEqual(write_archive(self.path, games), len(games))
+        with GameArchive(self.path) as archive:
+            self.assertEqual(len(archive), len(games))
+            for i, (name, movetext) in enumerate(GAMES.items()):
+                expected = ChessBoard()
+                expected.move(movetext)
+                self.assertEqual(archive.headers(i), {'Event': name})
+                self.assertEqual(len(archive.moves(i)), len(games[i].moves))
+                self.assertEqual(archive.board(i).fen(), expected.fen())
+            self.assertEqual(archive.board(-1, ply=0).fen(),
+                             ChessBoard().fen())
+            with self.assertRaises(IndexError):
+                archive.moves(len(games))
+
+    def test_castling_and_fen(self):
+        fen = 'r3k3/8/8/8/8/8/8/4K2R w Kq - 0 1'
+        game = PgnGame({'FEN': fen}, ['O-O', 'O-O-O'])
+        with ArchiveWriter(self.path) as writer:
+            self.assertEqual(writer.add_game(game), 2)
+            writer.add([Move.from_uci('e2e4')])
+        with GameArchive(self.path) as archive:
+            boards = [b.fen() for b in archive.replay(0)]
+            self.assertEqual(boards[-1].split()[0], '2kr4/8/8/8/8/8/8/5RK1')
+            self.assertEqual(archive.headers(1), {})
+            self.assertEqual(archive.board(1)['e4'].color, 'white')
+
+    def test_promotion_and_invalid_moves(self):
+        game = PgnGame({}, ['e4', 'e5', 'Ke3'])
+        fen = 'r3k3/1P6/8/8/8/8/8/4K2R w Kq - 0 1'
+        promotion = PgnGame({'FEN': fen}, ['bxa8=N'])
+        with ArchiveWriter(self.path) as writer:
+            with self.assertWarnsRegex(ReplayWarning, 'ply 3 \\(Ke3\\)'):
+                self.assertEqual(writer.add_game(game), 2)
+            self.assertEqual(writer.add_game(promotion), 1)
+        with GameArchive(self.path) as archive:
+            self.assertIsInstance(archive.board(1)['a8'], Knight)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard, CopyOnWriteChessBoard, FlatChessBoard
+    from chess.board.attacks import SQUARES
+    from chess.board.main import InvalidMove
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestAttackMaps(unittest.TestCase):
+
+    def test_attack_map(self):
+        board = ChessBoard()
+        white = board.attack_map('white')
+        self.assertEqual(white[SQUARES['f3']], 3)  # e2, g2 and Ng1
+        self.assertEqual(white[SQUARES['e4']], 0)
+        self.assertTrue(board.is_attacked('d6', 'black'))
+        self.assertFalse(board.is_attacked('d5', 'white'))
+
+    def test_cached_until_mutation(self):
+        board = ChessBoard()
+        first = board.attack_map('white')
+        self.assertIs(board.attack_map('white'), first)
+        board.move('e4')
+        self.assertIsNot(board.attack_map('white'), first)
+        self.assertTrue(board.is_attacked('d5', 'white'))
+
+    def test_clones_keep_their_own_maps(self):
+        for cls in (ChessBoard, CopyOnWriteChessBoard, FlatChessBoard):
+            board = cls()
+            board.attack_map('black')
+            clone = board.clone()
+            clone.move('e4')
+            self.assertFalse(board.is_attacked('d5', 'white'))
+            self.assertTrue(clone.is_attacked('d5', 'white'))
+
+    def test_check(self):
+        board = ChessBoard().move('e4 e5 Qh5 Nc6 Bc4 Nf6 Qxf7')
+        self.assertTrue(board.player_in_check('black'))
+        self.assertFalse(board.player_in_check('white'))
+        self.assertTrue(board.winner == 'white')
+
+    def test_king_moves(self):
+        board = ChessBoard.from_fen('4k3/8/8/8/8/8/3r4/4K3 w')
+        self.assertEqual(
+            sorted(m.uci() for m in board.all_valid_moves()), ['e1d2', 'e1f1']
+        )
+        # Backing away along the rook's line is still walking into check.
+        board = ChessBoard.from_fen('4k3/8/8/8/8/8/8/r3K3 w')
+        self.assertNotIn('e1f1', [m.uci() for m in board.all_valid_moves()])
+
+    def test_castling_through_check(self):
+        cases = [
+            ('4k3/8/8/8/8/8/8/4K2R w K', 'O-O', True),
+            ('4k3/8/8/8/8/4r3/8/4K2R w K', 'O-O', False),
+            ('4k3/8/8/8/8/5r2/8/4K2R w K', 'O-O', False),
+            ('4k3/8/8/8/8/6r1/8/4K2R w K', 'O-O', False),
+            ('4k3/8/8/8/8/7r/8/4K2R w K', 'O-O', True),
+            ('4k3/8/8/8/8/1r6/8/R3K3 w Q', 'O-O-O', True),
+            ('4k3/8/8/8/8/3r4/8/R3K3 w Q', 'O-O-O', False),
+        ]
+        for fen, side, legal in cases:
+            board = ChessBoard.from_fen(fen)
+            castles = [m for m in board.all_valid_moves() if m.is_castle]
+            self.assertEqual(bool(castles), legal, fen)
+            if legal:
+                board.move(side)
+            else:
+                with self.assertRaises(InvalidMove):
+                    board.move(side)
+                self.assertEqual(board.fen(), ChessBoard.from_fen(fen).fen())
+
+
+if __name__ == '__main__':
+    unittest.main()
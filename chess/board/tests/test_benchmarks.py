@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board.benchmarks import (
+        BenchmarkResult, all_cases, compare, run_case, save_results,
+        load_results
+    )
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_cases_run(self):
+        result = run_case('copy', all_cases()['copy.italian'],
+                          repeat=2, min_time=0)
+        self.assertEqual(len(result.times), 2)
+        self.assertGreater(result.median, 0)
+
+    def test_save_and_load(self):
+        result = BenchmarkResult('foo', 10, [1.0, 2.0, 3.0])
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'results.json')
+            save_results([result], path)
+            self.assertEqual(load_results(path)['foo'].times, result.times)
+
+    def test_compare_respects_noise(self):
+        baseline = {
+            'quiet': BenchmarkResult('quiet', 1, [1.0, 1.0, 1.0]),
+            'noisy': BenchmarkResult('noisy', 1, [1.0, 0.8, 1.2]),
+        }
+        current = {
+            'quiet': BenchmarkResult('quiet', 1, [1.2, 1.2, 1.2]),
+            'noisy': BenchmarkResult('noisy', 1, [1.2, 1.2, 1.2]),
+        }
+        statuses = {c.name: c.status for c in compare(baseline, current)}
+        self.assertEqual(statuses['quiet'], 'regression')
+        self.assertEqual(statuses['noisy'], 'unchanged')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard, option_context
+    from chess.board import cache
+    from chess.board.cache import PositionCache
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestPositionCache(unittest.TestCase):
+
+    def test_lru(self):
+        c = PositionCache(maxsize=2)
+        c.put(1, 'moves', 'a')
+        c.put(2, 'moves', 'b')
+        self.assertEqual(c.get(1, 'moves'), 'a')
+        c.put(3, 'moves', 'c')  # 2 is the least recently used.
+        self.assertIsNone(c.get(2, 'moves'))
+        self.assertEqual(c.get(3, 'first', 'moves'), 'c')
+        stats = c.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.evictions,
+                          stats.size), (2, 1, 1, 2))
+        self.assertAlmostEqual(stats.hit_rate, 2 / 3)
+        c.resize(1)
+        self.assertEqual(c.stats().size, 1)
+        c.clear()
+        self.assertEqual(c.stats(), (0, 0, 0, 0, 1))
+
+
+class TestSharedCache(unittest.TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_off_by_default(self):
+        ChessBoard().all_valid_moves()
+        self.assertEqual(cache.stats().misses, 0)
+
+    def test_transpositions_share_entries(self):
+        with option_context({'cache.size': 100}):
+            a = ChessBoard().move('Nf3 Nf6 d4')
+            b = ChessBoard().move('d4 Nf6 Nf3')
+            moves = a.all_valid_moves()
+            self.assertEqual(cache.stats().misses, 1)
+            self.assertEqual(b.all_valid_moves(), moves)
+            self.assertEqual(b.valid_moves_from_loc('f6'),
+                             ['g8', 'g4', 'h5', 'e4', 'd5'])
+            self.assertEqual(cache.stats().hits, 2)
+            # Callers get their own list.
+            moves.clear()
+            self.assertEqual(len(a.all_valid_moves()), 22)
+
+    def test_status(self):
+        with option_context({'cache.size': 100}):
+            board = ChessBoard().move('f3 e5 g4 Qh4')
+            self.assertEqual(board.winner, 'black')
+            misses = cache.stats().misses
+            self.assertEqual(board.copy().winner, 'black')
+            self.assertEqual(cache.stats().misses, misses)
+            stalemate = ChessBoard.from_fen('7k/5Q2/6K1/8/8/8/8/8 b')
+            self.assertEqual(stalemate.draw, 'stalemate')
+            self.assertEqual(stalemate.all_valid_moves(), [])
+
+    def test_eviction(self):
+        with option_context({'cache.size': 2}):
+            board = ChessBoard()
+            for move in 'e4 e5 Nf3'.split():
+                board.all_valid_moves()
+                board.move(move)
+            stats = cache.stats()
+            self.assertEqual((stats.size, stats.maxsize, stats.evictions),
+                             (2, 2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    import pickle
+    from chess.board import ChessBoard, CopyOnWriteChessBoard, FlatChessBoard
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestClone(unittest.TestCase):
+
+    def test_clone_is_independent(self):
+        board = ChessBoard().move('1.e4 e5')
+        clone = board.clone()
+        clone.move('Nf3')
+        self.assertIsNone(board['f3'])
+        self.assertEqual(board.whose_turn, 'white')
+        self.assertEqual(clone.whose_turn, 'black')
+        self.assertEqual(board.fen(), ChessBoard().move('1.e4 e5').fen())
+
+    def test_moving_does_not_mutate_shared_pieces(self):
+        board = ChessBoard()
+        clone = board.clone()
+        king = board['e1']
+        clone.move('1.e4 e5 2.Ke2')
+        self.assertIs(board['e1'], king)
+        self.assertFalse(king.has_moved)
+        self.assertTrue(clone['e2'].has_moved)
+
+    def test_history_is_shared_not_copied(self):
+        board = ChessBoard().move('1.Nf3 Nf6 2.Ng1 Ng8')
+        clone = board.clone()
+        self.assertIs(clone._position_history, board._position_history)
+        history = board.position_history
+        clone.move('Nf3')
+        self.assertEqual(board.position_history, history)
+        self.assertEqual(clone.position_history[:-1], history)
+        self.assertEqual(board.repetitions(), 2)
+        self.assertEqual(clone.repetitions(), 2)
+
+    def test_long_history_pickles(self):
+        board = ChessBoard()
+        for i in range(300):
+            board.move('Nf3 Nf6 Ng1 Ng8')
+        restored = pickle.loads(pickle.dumps(board))
+        self.assertEqual(restored.position_history, board.position_history)
+        self.assertEqual(restored.repetitions(), board.repetitions())
+        restored.move('e4')
+        self.assertEqual(len(restored.position_history), 1202)
+
+
+class TestCopyOnWrite(unittest.TestCase):
+
+    def setUp(self):
+        self.board = CopyOnWriteChessBoard()
+
+    def test_fork_shares_files_until_written(self):
+        fork = self.board.fork()
+        self.assertIs(fork._mat[0], self.board._mat[0])
+        fork.move('e4')
+        self.assertIsNot(fork._mat[4], self.board._mat[4])
+        self.assertIs(fork._mat[0], self.board._mat[0])
+        self.assertIsNone(self.board['e4'])
+
+    def test_parent_writes_do_not_leak_into_fork(self):
+        fork = self.board.fork()
+        self.board.move('d4')
+        self.assertIsNone(fork['d4'])
+        self.assertIsNotNone(fork['d2'])
+
+    def test_from_board(self):
+        board = ChessBoard().move('1.e4 e5')
+        cow = CopyOnWriteChessBoard.from_board(board)
+        cow.move('Nf3')
+        self.assertIsNone(board['f3'])
+        self.assertEqual(cow.winner, None)
+
+
+class TestFlatChessBoard(unittest.TestCase):
+
+    GAME = '1.e4 e5 2.Nf3 Nc6 3.Bb5 a6 4.O-O Nf6 5.Bxc6 dxc6 6.Re1 Bd6'
+
+    def test_plays_like_a_board(self):
+        board, flat = ChessBoard(), FlatChessBoard()
+        for san in self.GAME.split():
+            san = san.split('.')[-1]
+            board.move(san)
+            flat.move(san)
+            self.assertEqual(flat.fen(), board.fen())
+            self.assertEqual(flat.position_hash, board.position_hash)
+            self.assertEqual(flat.piece_codes, board.piece_codes)
+            self.assertEqual(flat.all_valid_moves(), board.all_valid_moves())
+        self.assertIsNone(flat._mat[7][0])
+        self.assertEqual(type(flat['g1']).__name__, 'King')
+
+    def test_clone_is_independent(self):
+        flat = FlatChessBoard().move(self.GAME)
+        clone = flat.clone()
+        clone.move('Nxe5')
+        self.assertIsNotNone(flat['f3'])
+        self.assertEqual(flat.fen(), FlatChessBoard().move(self.GAME).fen())
+        self.assertTrue(clone['e5'].has_moved)
+
+    def test_pickles_small(self):
+        board = ChessBoard().move(self.GAME)
+        flat = FlatChessBoard().move(self.GAME)
+        data = pickle.dumps(flat)
+        self.assertLess(len(data), len(pickle.dumps(board)) / 2)
+        restored = pickle.loads(data)
+        self.assertEqual(restored.fen(), flat.fen())
+        self.assertEqual(restored.position_hash, flat.position_hash)
+        restored.move('h3')
+        self.assertIsNone(flat['h3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
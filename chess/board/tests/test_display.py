@@ -6,8 +6,14 @@ try:
     fpath = os.path.dirname(__file__)
     root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
     sys.path.append(root_dir)
+    import io
     from chess.board import ChessBoard, set_option, reset_option
+    from chess.board import option_context
     from chess.board.config import ALL
+    import re
+    from chess.board.display import (
+        write_diagrams, render_svg, render_html, text_renderer, TerminalView
+    )
 finally:
     sys.path.remove(root_dir)
 
@@ -149,5 +155,114 @@ class TestDisplay(unittest.TestCase):
         )
 
 
+class TestRender(unittest.TestCase):
+
+    def setUp(self):
+        reset_option(ALL)
+        self.board = ChessBoard().move('e4 e5 Nf3 Nc6 Bb5 a6 O-O')
+
+    def test_matches_repr_grid(self):
+        boards = [ChessBoard(), self.board, ChessBoard(setup=False)]
+        for size in ('big', 'medium', 'small'):
+            for axis_labels in (True, False):
+                for figurine in (True, False):
+                    with option_context({
+                        'display.size': size,
+                        'display.axis_labels': axis_labels,
+                        'display.figurine': figurine
+                    }):
+                        for board in boards:
+                            expected = getattr(board, f'_repr_{size}_')()
+                            self.assertEqual(repr(board), expected)
+
+    def test_renderer_options_are_fixed(self):
+        draw = text_renderer(size='small', axis_labels=False)
+        set_option('display.size', 'big')
+        self.assertEqual(draw(ChessBoard()).split('\n')[0], 'rnbqkbnr')
+
+    def test_write_diagrams(self):
+        stream = io.StringIO()
+        n = write_diagrams([ChessBoard(), self.board], stream, size='small')
+        self.assertEqual(n, 2)
+        with option_context({'display.size': 'small'}):
+            self.assertEqual(
+                stream.getvalue(),
+                f'{ChessBoard()!r}\n\n{self.board!r}\n\n'
+            )
+        stream = io.StringIO()
+        write_diagrams([self.board], stream, format='svg', separator='')
+        self.assertEqual(stream.getvalue(), render_svg(self.board))
+
+    def test_svg(self):
+        svg = render_svg(self.board, square=40)
+        self.assertTrue(svg.startswith('<svg xmlns='))
+        self.assertTrue(svg.endswith('</svg>'))
+        # 32 dark squares; 32 pieces plus 16 axis labels.
+        self.assertEqual(svg.count('<rect '), 33)
+        self.assertEqual(svg.count('<text '), 32 + 16)
+        self.assertIn('width="360"', svg)
+        self.assertEqual(
+            render_svg(self.board, axis_labels=False).count('<text '), 32
+        )
+
+    def test_html(self):
+        html = render_html(self.board, axis_labels=False)
+        self.assertEqual(html.count('<td class="dark">'), 32)
+        self.assertEqual(html.count('<tr>'), 8)
+        first_rank = html.split('<tr>')[-1]
+        self.assertIn('>♖</td><td class="light">♘</td>', first_rank)
+        self.assertEqual(render_html(ChessBoard()).count('<th>'), 17)
+
+
+class TestTerminalView(unittest.TestCase):
+
+    @staticmethod
+    def play(screen: list, output: str) -> None:
+        """Apply cursor moves and characters to a screen of lists."""
+        pos = None
+        for m in re.finditer(r'\x1b\[(\d+);(\d+)H|(.)', output, re.S):
+            if m.group(1):
+                pos = [int(m.group(1)) - 1, int(m.group(2)) - 1]
+            else:
+                screen[pos[0]][pos[1]] = m.group(3)
+                pos[1] += 1
+
+    def test_updates_match_full_redraws(self):
+        for size in ('big', 'medium', 'small'):
+            view = TerminalView(row=2, column=3, size=size)
+            screen = [[' '] * 45 for _ in range(25)]
+            board = ChessBoard()
+            self.play(screen, view.update(board))
+            for move in 'e4 e5 Nf3 Nc6 Bb5 a6 O-O Nf6 Bxc6 dxc6'.split():
+                board.move(move)
+                self.play(screen, view.update(board))
+                fresh = [[' '] * 45 for _ in range(25)]
+                self.play(fresh, TerminalView(2, 3, size).update(board))
+                self.assertEqual(screen, fresh)
+            text = '\n'.join(''.join(line)[2:].rstrip() for line in screen)
+            with option_context({'display.size': size}):
+                lines = [line.rstrip() for line in repr(board).split('\n')]
+            self.assertEqual(text.strip('\n'), '\n'.join(lines))
+
+    def test_only_changes_are_sent(self):
+        view = TerminalView(size='big', axis_labels=False)
+        board = ChessBoard()
+        self.assertIn('\x1b[1;1H┌───┬', view.update(board))
+        self.assertEqual(view.update(board), '')
+        board.move('e4')
+        # Rank 8 is on the 2nd line, so e4 is on the 10th and e2 the 14th.
+        self.assertEqual(view.update(board), '\x1b[10;19HP\x1b[14;19H ')
+        view.reset()
+        self.assertGreater(len(view.update(board)), 500)
+
+    def test_adjacent_squares(self):
+        view = TerminalView(size='small', axis_labels=False)
+        board = ChessBoard.from_fen('4k3/8/8/8/8/8/8/4K2R w K')
+        view.update(board)
+        board.move('O-O')
+        # f1 and g1 are written with a single cursor move.
+        self.assertEqual(view.update(board), '\x1b[8;5H·RK·')
+
+
 if __name__ == '__main__':
     unittest.main()
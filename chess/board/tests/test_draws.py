@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard
+    from chess.board.zobrist import piece_hash
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestDraws(unittest.TestCase):
+
+    def setUp(self):
+        self.board = ChessBoard()
+
+    def test_threefold_repetition(self):
+        self.board.move('1.Nf3 Nf6 2.Ng1 Ng8 3.Nf3 Nf6 4.Ng1')
+        self.assertEqual(self.board.repetitions(), 2)
+        self.assertIsNone(self.board.draw)
+        self.board.move('Ng8')
+        self.assertEqual(self.board.repetitions(), 3)
+        self.assertEqual(self.board.draw, 'threefold_repetition')
+        self.assertIsNone(self.board.winner)
+
+    def test_castling_rights_are_part_of_the_position(self):
+        self.board.move('1.Nf3 Nf6 2.Rg1 Rg8 3.Rh1 Rh8')
+        self.assertEqual(self.board.repetitions(), 1)
+
+    def test_halfmove_clock(self):
+        self.board.move('1.Nf3 Nf6 2.Nc3')
+        self.assertEqual(self.board.halfmove_clock, 3)
+        self.board.move('e5')
+        self.assertEqual(self.board.halfmove_clock, 0)
+        self.board.move('Nxe5')
+        self.assertEqual(self.board.halfmove_clock, 0)
+
+    def test_fifty_and_seventy_five_move_rules(self):
+        board = ChessBoard.from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 99 80')
+        self.assertIsNone(board.draw)
+        board.move('Ra2')
+        self.assertEqual(board.draw, 'fifty_move_rule')
+        board = ChessBoard.from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 149 80')
+        board.move('Ra2')
+        self.assertEqual(board.draw, 'seventy_five_move_rule')
+
+    def test_stalemate(self):
+        board = ChessBoard.from_fen('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1')
+        self.assertEqual(board.draw, 'stalemate')
+
+    def test_hash_is_updated_incrementally(self):
+        self.board.move('1.e4 e5 2.Nf3 Nc6 3.Bc4 Bc5 4.O-O Nf6 5.Nxe5 Nxe5')
+        self.assertEqual(self.board._piece_hash, piece_hash(self.board._mat))
+        same = ChessBoard.from_fen(self.board.fen())
+        self.assertEqual(same.position_hash, self.board.position_hash)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import (
+        ChessBoard, CopyOnWriteChessBoard, Move, option_context
+    )
+    from chess.board.events import EVENTS
+    from chess.board.pieces import Pawn, Queen
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestEvents(unittest.TestCase):
+
+    def record(self, board, events=EVENTS):
+        log = []
+        for event in events:
+            board.subscribe(event, log.append)
+        return log
+
+    def test_moves_and_captures(self):
+        board = ChessBoard()
+        log = self.record(board)
+        board.move('e4 d5 exd5')
+        self.assertEqual(
+            [(e.name, e.move.uci(), e.color) for e in log],
+            [('move', 'e2e4', 'white'), ('move', 'd7d5', 'black'),
+             ('move', 'e4d5', 'white'), ('capture', 'e4d5', 'white')]
+        )
+        self.assertIsInstance(log[-1].captured, Pawn)
+        self.assertEqual(log[-1].captured.color, 'black')
+        self.assertTrue(log[-1].move.is_capture)
+        self.assertIs(log[-1].board, board)
+
+    def test_castle_check_and_mate(self):
+        board = ChessBoard.from_fen('6k1/6pp/8/8/8/8/8/4K2R w K')
+        log = self.record(board)
+        board.move('O-O')
+        self.assertEqual([e.name for e in log], ['move', 'castle'])
+        self.assertEqual(log[-1].move, Move.make('e1', 'g1', castle=True))
+        del log[:]
+        board.move('h6 Rf8+')
+        self.assertEqual([e.name for e in log], ['move', 'move', 'check'])
+        del log[:]
+        board = ChessBoard().move('e4 e5 Qh5 Nc6 Bc4 Nf6')
+        log = self.record(board)
+        board.move('Qxf7#')
+        self.assertEqual(
+            [e.name for e in log], ['move', 'capture', 'check', 'mate']
+        )
+
+    def test_draw(self):
+        board = ChessBoard.from_fen('7k/5Q2/8/8/8/8/8/K7 w')
+        log = self.record(board, ['draw'])
+        board.move('Qf7g6')
+        self.assertEqual([(e.name, e.reason) for e in log],
+                         [('draw', 'stalemate')])
+
+    def test_status_only_when_listened_for(self):
+        # Looking for check fills in the board's attack maps.
+        board = ChessBoard()
+        log = self.record(board, ['move', 'capture', 'castle'])
+        board.move('e4')
+        self.assertIsNone(board._attack_maps)
+        board.subscribe('check', log.append)
+        board.move('e5')
+        self.assertIsNotNone(board._attack_maps)
+
+    def test_unsubscribe_and_copies(self):
+        board = CopyOnWriteChessBoard()
+        log = self.record(board, ['move'])
+        board.all_valid_moves()
+        board.clone().move('e4')
+        board.fork().move('d4')
+        self.assertEqual(log, [])
+        board.unsubscribe('move', log.append)
+        board.move('e4')
+        self.assertEqual(log, [])
+        with self.assertRaises(ValueError):
+            board.subscribe('resign', log.append)
+
+    def test_promotion(self):
+        board = ChessBoard.from_fen('k7/4P3/8/8/8/8/8/K7 w')
+        log = self.record(board, ['move'])
+        board.move('e8=Q')
+        self.assertIs(log[0].move.promotion, Queen)
+
+    def test_notifications(self):
+        def notifications(board, moves):
+            out = io.StringIO()
+            with option_context({'api.notifications': True}), \
+                    redirect_stdout(out):
+                board.move(moves)
+            return out.getvalue().splitlines()
+
+        board = ChessBoard()
+        log = self.record(board, ['check'])
+        self.assertEqual(notifications(board, 'e4 f5 Qh5+'),
+                         ['black is in check.'])
+        self.assertEqual(len(log), 1)
+        board = ChessBoard().move('e4 e5 Qh5 Nc6 Bc4 Nf6')
+        self.assertEqual(notifications(board, 'Qxf7#'), ['white wins!'])
+        board = ChessBoard.from_fen('7k/5Q2/8/8/8/8/8/K7 w')
+        self.assertEqual(notifications(board, 'Qf7g6'),
+                         ['The game is a draw.'])
+        # The option doesn't subscribe anything for good.
+        self.assertIsNone(board._listeners)
+        self.assertEqual(notifications(ChessBoard(), 'e4'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard, Move
+    from chess.board.main import InvalidMove
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestStaticExchange(unittest.TestCase):
+
+    def see(self, fen: str, uci: str) -> int:
+        return ChessBoard.from_fen(fen).static_exchange(Move.from_uci(uci))
+
+    def test_undefended(self):
+        self.assertEqual(self.see('4k3/8/8/3p4/4P3/8/8/4K3 w', 'e4d5'), 100)
+
+    def test_defended(self):
+        self.assertEqual(self.see('4k3/8/2p5/3p4/4P3/8/8/4K3 w', 'e4d5'), 0)
+        self.assertEqual(self.see('4k3/8/2p5/3n4/4P3/8/8/4K3 w', 'e4d5'), 220)
+        # The queen takes a defended pawn and is lost for it.
+        self.assertEqual(
+            self.see('4k3/8/2p5/3p4/8/8/8/3QK3 w', 'd1d5'), 100 - 900
+        )
+
+    def test_standing_pat(self):
+        # Black takes the rook back with the queen...
+        self.assertEqual(
+            self.see('3qk3/8/8/3p4/8/8/8/3RK3 w', 'd1d5'), 100 - 500
+        )
+        # ...but not when the bishop would then win the queen.
+        self.assertEqual(
+            self.see('3qk3/8/8/3p4/8/5B2/8/3RK3 w', 'd1d5'), 100
+        )
+
+    def test_xrays(self):
+        # The queen behind the bishop joins in once the bishop has taken.
+        fen = '4k3/5p2/4p3/8/2B5/1Q6/8/4K3 w'
+        self.assertEqual(self.see(fen, 'c4e6'), 100 - 330 + 100)
+        # Doubled rooks on both sides, and the black king ends it.
+        fen = '3rk3/3r4/8/8/8/8/3R4/3RK3 w'
+        self.assertEqual(self.see(fen, 'd2d7'), 0)
+        fen = '3r3k/3r4/8/8/8/8/3R4/3RK3 w'
+        self.assertEqual(self.see(fen, 'd2d7'), 500)
+
+    def test_king_recaptures(self):
+        self.assertEqual(
+            self.see('8/8/8/3qk3/8/8/8/3RK3 w', 'd1d5'), 900 - 500
+        )
+        # The king can't take back on a square the other side still covers.
+        self.assertEqual(
+            self.see('8/8/8/3qk3/8/8/3R4/3RK3 w', 'd2d5'), 900
+        )
+
+    def test_quiet_and_promotion(self):
+        self.assertEqual(self.see('4k3/8/8/8/8/8/4P3/4K3 w', 'e2e4'), 0)
+        self.assertEqual(self.see('4k3/8/2p5/8/4N3/8/8/4K3 w', 'e4d6'), 0)
+        self.assertEqual(self.see('4k3/2p5/8/8/4N3/8/8/4K3 w', 'e4d6'), -320)
+        self.assertEqual(self.see('4k3/P7/8/8/8/8/8/4K3 w', 'a7a8'), 800)
+        self.assertEqual(self.see('4k3/P7/8/8/8/8/8/4K3 w', 'a7a8n'), 220)
+        self.assertEqual(self.see('r3k3/1P6/8/8/8/8/8/4K3 w', 'b7a8'), 1300)
+
+    def test_no_piece(self):
+        with self.assertRaises(InvalidMove):
+            ChessBoard().static_exchange(Move.from_uci('e4e5'))
+
+
+if __name__ == '__main__':
+    unittest.main()
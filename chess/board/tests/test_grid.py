@@ -7,7 +7,11 @@ try:
     fpath = os.path.dirname(__file__)
     root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
     sys.path.append(root_dir)
-    from chess.board.grid import Grid, Loc, Vector
+    import pickle
+    from chess.board import ChessBoard
+    from chess.board.grid import (
+        Grid, FlatGrid, FlatCharNumGrid, Loc, Vector
+    )
 finally:
     sys.path.remove(root_dir)
 
@@ -45,6 +49,58 @@ class TestGrid(unittest.TestCase):
         self.assertEqual(self.grid.dimensions[0], 8)
         self.assertEqual(self.grid.dimensions[1], 8)
 
+    def test_fill(self):
+        self.assertFalse(self.grid.is_empty)
+        self.grid.fill('bar')
+        self.assertEqual(list(self.grid), ['bar'] * 64)
+        self.grid.clear()
+        self.assertTrue(self.grid.is_empty)
+
+    def test_iteration_order(self):
+        self.assertEqual(list(self.grid).index('foo'), 4)
+        self.assertEqual(self.grid.positions[4], Loc(0, 4))
+
+
+class TestFlatGrid(TestGrid):
+
+    def setUp(self):
+        self.grid = FlatGrid(8, 8)
+        self.grid[0, 4] = 'foo'
+
+    def test_off_grid(self):
+        with self.assertRaises(IndexError):
+            self.grid[8, 0]
+        with self.assertRaises(IndexError):
+            self.grid[0, -1] = 'bar'
+
+    def test_codes(self):
+        self.grid[7, 7] = 'bar'
+        self.grid[7, 6] = 'foo'
+        codes = self.grid.codes
+        self.assertEqual(len(codes), 64)
+        self.assertEqual((codes[4], codes[63], codes[62]), (1, 2, 1))
+        with self.assertRaises(ValueError):
+            for i in range(256):
+                self.grid[0, 0] = i
+
+    def test_copy_and_pickle(self):
+        new = self.grid.copy()
+        new[0, 4] = None
+        self.assertEqual(self.grid[0, 4], 'foo')
+        self.assertTrue(new.is_empty)
+        restored = pickle.loads(pickle.dumps(self.grid))
+        self.assertEqual(list(restored), list(self.grid))
+
+    def test_charnum(self):
+        grid = FlatCharNumGrid(8, 8)
+        board = ChessBoard()
+        for loc in grid.positions:
+            grid[loc] = board[loc]
+        self.assertEqual(list(grid), list(board))
+        grid.shift('e2', (0, 2))
+        self.assertIs(grid['e4'], board['e2'])
+        self.assertIsNone(grid['e2'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard, instrumentation
+    from chess.board.main import ChessBoard as MainChessBoard
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_leaves_originals_in_place(self):
+        original = MainChessBoard.__dict__['valid_move']
+        instrumentation.enable()
+        self.assertIsNot(MainChessBoard.__dict__['valid_move'], original)
+        instrumentation.disable()
+        self.assertIs(MainChessBoard.__dict__['valid_move'], original)
+
+    def test_targets(self):
+        # `attack_map` and `render` took over from `_in_kings_path` and
+        # `repr_grid` on the hot paths.
+        self.assertEqual(
+            [name for _, name in instrumentation.TARGETS],
+            ['valid_move', '_valid_move_after_shift_verification', '_blocked',
+             'attack_map', 'copy', 'parse_move', 'render']
+        )
+        for owner, name in instrumentation.TARGETS:
+            self.assertTrue(callable(owner.__dict__[name]))
+
+    def test_counts_calls(self):
+        with instrumentation.instrumented():
+            board = ChessBoard()
+            board.move('1.e4 e5')
+            board.valid_move('g1', 'f3')
+            repr(board)
+        stats = instrumentation.snapshot()
+        self.assertEqual(stats['parse_move']['calls'], 2)
+        self.assertEqual(stats['valid_move']['calls'], 1)
+        self.assertEqual(stats['render']['calls'], 1)
+        self.assertGreater(stats['copy']['calls'], 0)
+        self.assertFalse(instrumentation.is_enabled())
+
+    def test_reset(self):
+        with instrumentation.instrumented():
+            ChessBoard().move('e4')
+        instrumentation.reset()
+        self.assertEqual(instrumentation.snapshot()['parse_move']['calls'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
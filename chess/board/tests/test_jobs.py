@@ -0,0 +1,132 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard
+    from chess.board.jobs import (
+        PerftJob, CorpusJob, TacticJob, FileQueue, run, work
+    )
+    from chess.board.perft import perft, divide, subtrees
+finally:
+    sys.path.remove(root_dir)
+
+
+PGN = '''[Event "Scholar's mate"]
+[Result "1-0"]
+
+1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0
+
+[Event "Short draw"]
+
+1. Nf3 Nf6 2. Ng1 Ng8 1/2-1/2
+
+[Event "En passant"]
+[Result "*"]
+
+1. e4 Nf6 2. e5 d5 3. exd6 *
+'''
+
+
+class TestPerft(unittest.TestCase):
+
+    def test_start(self):
+        self.assertEqual([perft(ChessBoard(), d) for d in range(4)],
+                         [1, 20, 400, 8902])
+
+    def test_known_positions(self):
+        # Published counts, at depths without en passant captures.
+        fen = 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8'
+        self.assertEqual(perft(fen, 2), 1486)
+        fen = 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq -'
+        self.assertEqual(perft(fen, 2), 264)
+        fen = ('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R '
+               'w KQkq -')
+        self.assertEqual(perft(fen, 1), 48)
+
+    def test_divide_and_subtrees(self):
+        counts = divide(ChessBoard(), 3)
+        self.assertEqual(len(counts), 20)
+        self.assertEqual(counts['g1f3'], 440)
+        self.assertEqual(perft(ChessBoard(), 2, moves=['g1f3']), 440)
+        self.assertEqual(len(subtrees(ChessBoard(), 2)), 400)
+
+
+class TestJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, 'queue')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_perft_job(self):
+        self.assertEqual(run(PerftJob(depth=3, split=1), self.dir,
+                             processes=2), 8902)
+        progress = FileQueue(self.dir).progress()
+        self.assertEqual(progress['done'], 20)
+        self.assertEqual(progress['pending'] + progress['claimed'], 0)
+
+    def test_resume(self):
+        job = PerftJob(depth=3, split=1)
+        queue = FileQueue(self.dir)
+        self.assertEqual(queue.submit(job), 20)
+        self.assertEqual(work(self.dir, max_tasks=5), 5)
+        # A worker that died holding a task.
+        name, _ = queue.claim()
+        self.assertEqual(queue.progress(),
+                         {'total': 20, 'pending': 14, 'claimed': 1,
+                          'done': 5})
+        # Submitting again is a no-op; a different job is refused.
+        self.assertEqual(queue.submit(job), 20)
+        with self.assertRaises(ValueError):
+            queue.submit(PerftJob(depth=4, split=1))
+        self.assertEqual(work(self.dir), 14)
+        self.assertFalse(queue.finished)
+        self.assertEqual(FileQueue(self.dir, lease=0).requeue_expired(), 1)
+        self.assertEqual(run(job, self.dir, processes=1), 8902)
+        self.assertTrue(queue.finished)
+
+    def test_corpus_job(self):
+        path = os.path.join(self.tmp.name, 'games.pgn')
+        with open(path, 'w') as f:
+            f.write(PGN)
+        job = CorpusJob([path], shard_games=2)
+        self.assertEqual(len(list(job.tasks())), 2)
+        self.assertEqual(run(job, self.dir, processes=1), {
+            'games': 3,
+            'plies': 7 + 4 + 4,
+            'unplayable': 1,
+            'results': {'1-0': 1, '1/2-1/2': 1, '*': 1}
+        })
+
+    def test_tactic_job(self):
+        path = os.path.join(self.tmp.name, 'games.pgn')
+        with open(path, 'w') as f:
+            f.write(PGN)
+        output = os.path.join(self.tmp.name, 'puzzles.jsonl')
+        job = TacticJob([path], output, shard_games=2)
+        self.assertEqual(run(job, self.dir, processes=1), {
+            'puzzles': 2,
+            'found': 1,
+            'motifs': {'mate': 1, 'fork': 0, 'pin': 0, 'hanging': 1}
+        })
+        with open(output) as f:
+            puzzles = [json.loads(line) for line in f]
+        self.assertEqual(
+            [(p['game'], p['ply'], p['motif'], p['solution'], p['found'])
+             for p in puzzles],
+            [(0, 6, 'mate', ['h5f7'], True),
+             # 3. exf6 wins the knight instead of taking en passant.
+             (2, 4, 'hanging', ['e5f6'], False)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
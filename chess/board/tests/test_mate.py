@@ -0,0 +1,76 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard
+    from chess.board.mate import MateSolver, solve_mate
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestMateSolver(unittest.TestCase):
+
+    def solve(self, fen: str, n: int, **kwargs):
+        return solve_mate(ChessBoard.from_fen(fen), n, **kwargs)
+
+    def test_back_rank_mate(self):
+        result = self.solve('6k1/5ppp/8/8/8/8/8/R3K3 w Q - 0 1', 1)
+        self.assertTrue(result.mate)
+        self.assertEqual(result.best_move.uci(), 'a1a8')
+        self.assertGreater(result.nodes, 0)
+
+    def test_shortest_mate_is_found(self):
+        result = self.solve('7k/8/6K1/8/8/8/8/1R6 w - - 0 1', 3)
+        self.assertEqual((result.mate, result.depth), (True, 1))
+        self.assertEqual([m.uci() for m in result.pv], ['b1b8'])
+
+    def test_mate_in_three(self):
+        fen = '1k5r/pP3ppp/3p2b1/1BN1n3/1Q2P3/P1B5/KP3P1P/7q w - - 1 0'
+        self.assertFalse(self.solve(fen, 2).mate)
+        result = self.solve(fen, 3)
+        self.assertEqual((result.mate, result.depth), (True, 3))
+        self.assertEqual(len(result.pv), 5)
+        # The line really ends in mate.
+        board = ChessBoard.from_fen(fen)
+        for move in result.pv:
+            board.move_from_to(move, notifications=False)
+        self.assertEqual(board.winner, 'white')
+
+    def test_pv_agrees_with_depth(self):
+        for fen in ('5k2/8/5K2/8/8/8/8/6Q1 w - - 0 1',
+                    '1k5r/pP3ppp/3p2b1/1BN1n3/1Q2P3/P1B5/KP3P1P/7q w - - 1 0'):
+            result = self.solve(fen, 3)
+            self.assertEqual(len(result.pv), 2 * result.depth - 1)
+            # Neither side strays from the longest forced line: the attacker
+            # never has a quicker mate left than the rest of the pv.
+            board = ChessBoard.from_fen(fen)
+            for ply, move in enumerate(result.pv):
+                if ply % 2 == 0 and ply < len(result.pv) - 1:
+                    left = result.depth - ply // 2
+                    self.assertFalse(solve_mate(board, left - 1).mate)
+                board.move_from_to(move, notifications=False)
+            self.assertEqual(board.winner, 'white')
+
+    def test_refuted(self):
+        self.assertFalse(self.solve('6k1/5ppp/8/8/8/8/8/4K2R w K - 0 1', 2)
+                         .mate)
+        # Black to move has no mate, and neither side does from the start.
+        self.assertFalse(self.solve('3k4/8/3K4/8/8/8/8/1R6 b - - 0 1', 2)
+                         .mate)
+        self.assertFalse(solve_mate(ChessBoard(), 2).mate)
+
+    def test_limits(self):
+        fen = '1k5r/pP3ppp/3p2b1/1BN1n3/1Q2P3/P1B5/KP3P1P/7q w - - 1 0'
+        result = self.solve(fen, 3, max_nodes=10)
+        self.assertIsNone(result.mate)
+        solver = MateSolver(max_entries=100)
+        self.assertTrue(solver.solve(ChessBoard.from_fen(fen), 3).mate)
+        self.assertLessEqual(len(solver.table), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
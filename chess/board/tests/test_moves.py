@@ -0,0 +1,133 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard
+    from chess.board.moves import Move
+    from chess.board.pieces import Knight, Queen
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestMove(unittest.TestCase):
+
+    def test_packing(self):
+        move = Move.make('e7', 'f8', Knight, capture=True)
+        self.assertEqual((move.loc, move.to, move.promotion),
+                         ('e7', 'f8', Knight))
+        self.assertTrue(move.is_capture)
+        self.assertFalse(move.is_castle)
+        self.assertEqual(move.compact, Move.from_uci('e7f8n'))
+        self.assertEqual(Move.make('a1', 'a2'), 1 << 6)
+        loc, to = move
+        self.assertEqual((loc, to), ('e7', 'f8'))
+
+    def test_equality(self):
+        move = Move.make('e2', 'e4')
+        self.assertEqual(move, int(move))
+        self.assertEqual(hash(move), hash(int(move)))
+        self.assertEqual({move: 1}[Move.from_uci('e2e4')], 1)
+        self.assertNotEqual(move, Move.from_uci('e2e3'))
+        # Tuples aren't moves.
+        self.assertNotEqual(move, ('e2', 'e4'))
+        self.assertNotIn(('e2', 'e4'), ChessBoard().all_valid_moves())
+        # Flags don't count, so moves without them find generated ones.
+        capture = Move.make('e4', 'd5', capture=True)
+        self.assertEqual(capture, Move.from_uci('e4d5'))
+        self.assertEqual(hash(capture), hash(Move.from_uci('e4d5')))
+        self.assertNotEqual(Move.from_uci('e7e8q'), Move.from_uci('e7e8n'))
+
+    def test_lookup_in_valid_moves(self):
+        moves = ChessBoard().move('e4 d5').all_valid_moves()
+        self.assertIn(Move.from_uci('e4d5'), moves)
+        self.assertIn(Move.make('e4', 'd5'), set(moves))
+        board = ChessBoard.from_fen('4k3/8/8/8/8/8/8/4K2R w K - 0 1')
+        moves = board.all_valid_moves()
+        self.assertIn(Move.from_uci('e1g1'), moves)
+        self.assertIn(Move.from_uci('e1g1'), set(moves))
+
+    def test_uci(self):
+        for s in ['e2e4', 'e7e8q', 'a2a1n']:
+            self.assertEqual(Move.from_uci(s).uci(), s)
+        for s in ['e2', 'e2e9', 'e7e8k']:
+            with self.assertRaises(ValueError):
+                Move.from_uci(s)
+
+    def test_generated_moves(self):
+        board = ChessBoard.from_fen(
+            'r3k2r/1P6/8/8/8/8/8/R3K2R w KQkq - 0 1'
+        )
+        moves = {m.uci(): m for m in board.all_valid_moves()}
+        self.assertTrue(all(isinstance(m, Move) for m in moves.values()))
+        self.assertTrue(moves['e1g1'].is_castle)
+        self.assertTrue(moves['a1a8'].is_capture)
+        self.assertFalse(moves['a1a7'].is_capture)
+
+    def test_move_from_to_accepts_moves(self):
+        board = ChessBoard.from_fen('4k3/1P6/8/8/8/8/8/4K3 w - - 0 1')
+        board.move_from_to(Move.from_uci('b7b8n'), notifications=False)
+        self.assertIsInstance(board['b8'], Knight)
+        board = ChessBoard.from_fen('4k3/1P6/8/8/8/8/8/4K3 w - - 0 1')
+        board.move_from_to(Move.from_uci('b7b8'), notifications=False)
+        self.assertIsInstance(board['b8'], Queen)
+
+
+class TestSan(unittest.TestCase):
+
+    def assertSan(self, fen: str, uci: str, san: str):
+        board = ChessBoard.from_fen(fen)
+        self.assertEqual(board.san(Move.from_uci(uci)), san)
+
+    def test_san(self):
+        start = ChessBoard().fen()
+        self.assertSan(start, 'e2e4', 'e4')
+        self.assertSan(start, 'g1f3', 'Nf3')
+        self.assertSan('4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1', 'e4d5', 'exd5')
+        self.assertSan('7k/1P6/8/8/8/8/8/4K3 w - - 0 1', 'b7b8q', 'b8=Q+')
+        self.assertSan('7k/1P6/8/8/8/8/8/4K3 w - - 0 1', 'b7b8n', 'b8=N')
+        self.assertSan('4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1', 'e1g1', 'O-O')
+        self.assertSan('4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1', 'e1c1', 'O-O-O')
+        self.assertSan('6k1/5ppp/8/8/8/8/8/R3K3 w - - 0 1', 'a1a8', 'Ra8#')
+
+    def test_pawn_checks(self):
+        # Pawns only give check forwards.
+        fen = '1r1q1b1r/Nb1pp1p1/8/2PkBpp1/P2n2P1/5P1B/1p5P/2RK3R w - - 1 48'
+        self.assertSan(fen, 'c5c6', 'c6')
+        board = ChessBoard.from_fen(fen)
+        board.move('c6')
+        self.assertFalse(board.player_in_check('black'))
+        fen = '2bq3r/1pp1k1b1/2np1n1p/r3Pp2/Pp1P2p1/4P1PN/R1P4P/1NBQKBR1 w'
+        self.assertSan(fen, 'e5f6', 'exf6+')
+
+    def test_disambiguation(self):
+        fen = 'k7/8/8/8/8/8/8/R4RK1 w - - 0 1'
+        self.assertSan(fen, 'a1d1', 'Rad1')
+        fen = '4k3/R7/8/8/8/8/8/R3K3 w - - 0 1'
+        self.assertSan(fen, 'a1a4', 'R1a4')
+        fen = '4k3/8/8/8/8/Q1Q5/8/Q3K3 w - - 0 1'
+        self.assertSan(fen, 'a3b2', 'Qa3b2')
+        # A pinned knight doesn't count as a rival.
+        fen = '4k3/4r3/8/8/8/2N5/4N3/4K3 w - - 0 1'
+        self.assertSan(fen, 'c3d5', 'Nd5')
+
+    def test_san_round_trip(self):
+        for fen in [
+            ChessBoard().fen(),
+            'r3r1k1/pp3pbp/1qp3p1/2B5/2BP2b1/Q1n2N2/P4PPP/3RK2R w K - 0 17',
+            '4k3/8/8/8/8/Q1Q5/8/Q3K3 w - - 0 1',
+        ]:
+            board = ChessBoard.from_fen(fen)
+            for move in board.all_valid_moves():
+                expected = board.copy()
+                expected.move_from_to(move, notifications=False)
+                played = board.copy()
+                played.move(board.san(move))
+                self.assertEqual(played.fen(), expected.fen(), move)
+
+
+if __name__ == '__main__':
+    unittest.main()
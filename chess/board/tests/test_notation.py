@@ -0,0 +1,136 @@
+import os
+import sys
+import unittest
+import warnings
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard, option_context
+    from chess.board.main import (
+        InvalidMove, NotationMismatch, NotationWarning, FALSE_CAPTURE,
+        MISSING_CAPTURE, FALSE_CHECK, FALSE_MATE, MISSING_CHECK, MISSING_MATE
+    )
+    from chess.board.notation import (
+        ILLEGAL, Mismatch, game_mismatches, report, tally
+    )
+    from chess.board.pgn import read_games
+finally:
+    sys.path.remove(root_dir)
+
+
+PGN = '''[Event "Clean"]
+
+1. f3 e5 2. g4 Qh4# 0-1
+
+[Event "Corrupted"]
+
+1. e4+ e5 2. Nf3 d6 3. Nxe5 dxe5 4. Bc4 Bg4 5. Bxf7# *
+
+[Event "Unplayable"]
+
+1. e4 e5 2. Ke3 Nc6 *
+'''
+
+
+class TestNotationMismatch(unittest.TestCase):
+
+    def test_mismatches(self):
+        board = ChessBoard()
+        self.assertEqual(board.notation_mismatches('e4'), [])
+        self.assertEqual(board.notation_mismatches('e4+'), [FALSE_CHECK])
+        self.assertEqual(board.notation_mismatches('Nxf3'), [FALSE_CAPTURE])
+        self.assertRaises(InvalidMove, board.notation_mismatches, 'e5')
+        board.move('f3 e5 g4')
+        self.assertEqual(board.notation_mismatches('Qh4'), [MISSING_MATE])
+        self.assertEqual(board.notation_mismatches('Qh4+'), [MISSING_MATE])
+        self.assertEqual(board.notation_mismatches('Qh4#'), [])
+        self.assertEqual(board.notation_mismatches('Qg5#'), [FALSE_CHECK])
+        # The board isn't changed.
+        self.assertEqual(board.whose_turn, 'black')
+
+    def test_missing_check_and_mate(self):
+        board = ChessBoard().move('e4 e5 Qh5 Nc6 Bc4 Nf6')
+        self.assertEqual(board.notation_mismatches('Qxf7'), [MISSING_MATE])
+        board = ChessBoard().move('e4 f5')
+        self.assertEqual(board.notation_mismatches('Qh5'), [MISSING_CHECK])
+        self.assertEqual(board.notation_mismatches('Qh5+'), [])
+        # Playing a move doesn't hold a left out marker against it.
+        board.move('Qh5')
+        self.assertEqual(board.whose_turn, 'black')
+        game, = read_games('1. e4 f5 2. Qh5 g6 3. Qxg6 hxg6 *'.splitlines())
+        self.assertEqual(game_mismatches(game), [
+            Mismatch(0, 2, 'Qh5', (MISSING_CHECK,), 'Qh5+'),
+            Mismatch(0, 4, 'Qxg6', (MISSING_CHECK,), 'Qxg6+'),
+        ])
+        game, = read_games('1. f3 e5 2. g4 Qh4+ 0-1'.splitlines())
+        self.assertEqual(game_mismatches(game), [
+            Mismatch(0, 3, 'Qh4+', (MISSING_MATE,), 'Qh4#'),
+        ])
+
+    def test_missing_capture_and_false_mate(self):
+        board = ChessBoard.from_fen('6k1/5pp1/8/8/8/8/8/R3Kn2 w Q - 0 1')
+        self.assertEqual(board.notation_mismatches('Ra8+'), [])
+        self.assertEqual(board.notation_mismatches('Ra8#'), [FALSE_MATE])
+        board = ChessBoard.from_fen('6k1/5ppp/8/8/8/8/8/R3Kn2 w Q - 0 1')
+        self.assertEqual(board.notation_mismatches('Ra8#'), [])
+        self.assertEqual(board.notation_mismatches('Kxf1'), [])
+        self.assertEqual(board.notation_mismatches('Kf1'), [MISSING_CAPTURE])
+
+    def test_castle(self):
+        board = ChessBoard.from_fen('3k4/8/8/8/8/8/8/R3K3 w Q - 0 1')
+        self.assertEqual(board.notation_mismatches('O-O-O+'), [])
+        board.move('O-O-O+')
+        self.assertEqual(board['d1'].__class__.__name__, 'Rook')
+        board = ChessBoard.from_fen('4k3/8/8/8/8/8/8/4K2R w K - 0 1')
+        self.assertEqual(board.notation_mismatches('O-O+'), [FALSE_CHECK])
+        self.assertRaises(NotationMismatch, board.move, 'O-O+')
+        self.assertEqual(board.whose_turn, 'white')
+
+    def test_error(self):
+        board = ChessBoard()
+        with self.assertRaises(NotationMismatch) as cm:
+            board.move('e4+')
+        self.assertIn('should be e4', str(cm.exception))
+        # Nothing was played.
+        self.assertEqual(board.whose_turn, 'white')
+        self.assertIsNotNone(board['e2'])
+
+    def test_warn(self):
+        board = ChessBoard()
+        with option_context({'api.notation_mismatch': 'warn'}), \
+                warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            board.move('e4+')
+        self.assertEqual(len(caught), 1)
+        self.assertIs(caught[0].category, NotationWarning)
+        self.assertEqual(board.whose_turn, 'black')
+
+    def test_ignore(self):
+        board = ChessBoard()
+        with option_context({'api.notation_mismatch': 'ignore'}), \
+                warnings.catch_warnings():
+            warnings.simplefilter('error')
+            board.move('e4+ e5 Nxf3')
+        self.assertEqual(board.whose_turn, 'black')
+        with option_context({'api.safe_mode': False}):
+            ChessBoard().move('e4#')
+
+    def test_report(self):
+        games = list(read_games(PGN.splitlines()))
+        self.assertEqual(game_mismatches(games[0]), [])
+        self.assertEqual(list(report(games)), [
+            Mismatch(1, 0, 'e4+', (FALSE_CHECK,), 'e4'),
+            Mismatch(1, 8, 'Bxf7#', (FALSE_MATE,), 'Bxf7+'),
+            Mismatch(2, 2, 'Ke3', (ILLEGAL,), None)
+        ])
+        counts = tally(games[1])
+        self.assertEqual(counts['flagged'], 1)
+        self.assertEqual(counts[FALSE_CHECK], 1)
+        self.assertEqual(counts[FALSE_MATE], 1)
+        self.assertEqual(tally(games[0])['flagged'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import csv
+import itertools
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board.pgn import parse_movetext, read_games
+    from chess.board.pipeline import (
+        Pipeline, Map, FlatMap, Stage, CsvSink, NpySink, ReplayWarning,
+        extract, replay, game_features, pgn_source
+    )
+finally:
+    sys.path.remove(root_dir)
+
+
+PGN = '''[Event "Scholar's mate"]
+[Result "1-0"]
+
+1. e4 {best by test} e5 2. Bc4 (2. Nf3 Nc6) Nc6 3. Qh5 $2 Nf6?? 4. Qxf7# 1-0
+
+[Event "Short draw"]
+[White "A"]
+[Black "B"]
+
+1. Nf3 Nf6 2. Ng1 Ng8 1/2-1/2
+'''
+
+
+class TestPgn(unittest.TestCase):
+
+    def test_parse_movetext(self):
+        moves, result = parse_movetext(
+            '1. e4 {comment} e5 (1... c5 2. Nf3) 2. Nf3 $1 ; rest of line\n'
+            '2... Nc6 *'
+        )
+        self.assertEqual(moves, ['e4', 'e5', 'Nf3', 'Nc6'])
+        self.assertEqual(result, '*')
+
+    def test_read_games(self):
+        games = list(read_games(PGN.splitlines()))
+        self.assertEqual(len(games), 2)
+        self.assertEqual(games[0].headers['Event'], "Scholar's mate")
+        self.assertEqual(games[0].movetext, 'e4 e5 Bc4 Nc6 Qh5 Nf6?? Qxf7#')
+        self.assertEqual(games[1].result, '1/2-1/2')
+        self.assertEqual([g.index for g in games], [0, 1])
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.games = list(read_games(PGN.splitlines()))
+
+    def test_replay(self):
+        positions = list(replay(self.games[0]))
+        self.assertEqual(len(positions), 8)
+        self.assertEqual(positions[-1].board.winner, 'white')
+        self.assertIsNone(positions[0].san)
+
+    def test_replay_warns_when_cut_short(self):
+        game = list(read_games(['1. e4 e5 2. O-O Nc6 *']))[0]
+        with self.assertWarnsRegex(ReplayWarning, 'ply 3 \\(O-O\\)'):
+            positions = list(replay(game))
+        self.assertEqual([p.san for p in positions], [None, 'e4', 'e5'])
+
+    def test_stages_and_stats(self):
+        pipeline = Pipeline(
+            self.games,
+            FlatMap('replay', replay),
+            Map('features', extract),
+            Stage('checks', lambda rows: (r for r in rows if r['in_check'])),
+        )
+        rows = list(pipeline)
+        self.assertEqual([(r['game'], r['ply']) for r in rows], [(0, 7)])
+        self.assertEqual([s.items for s in pipeline.stats()], [2, 13, 13, 1])
+        self.assertIn('features', pipeline.report())
+
+    def test_buffered_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'features.csv')
+            n = Pipeline(
+                self.games, FlatMap('features', game_features),
+                sink=CsvSink(path), buffer_size=2
+            ).run()
+            with open(path) as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(n, 13)
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(rows[0]['fen'].split()[0],
+                         'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR')
+
+    def test_closing_stops_buffer_threads(self):
+        pipeline = Pipeline(
+            itertools.count(), Map('double', lambda x: 2 * x),
+            Map('square', lambda x: x * x), buffer_size=1
+        )
+        self.assertEqual(list(itertools.islice(pipeline, 3)), [0, 4, 16])
+        pipeline.close()
+        deadline = time.monotonic() + 5
+        while any(t.name == 'buffered' for t in threading.enumerate()):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_buffered_stats(self):
+        def slow(n):
+            for i in range(n):
+                time.sleep(0.01)
+                yield i
+
+        pipeline = Pipeline(slow(10), Map('double', lambda x: 2 * x),
+                            buffer_size=2)
+        self.assertEqual(pipeline.run(), 10)
+        source, double = pipeline.stats()
+        self.assertGreater(source.seconds, 0.05)
+        # Waiting on the buffer isn't the stage's own work.
+        self.assertGreaterEqual(double.seconds, 0)
+        self.assertLess(double.seconds, 0.05)
+
+    def test_pgn_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, f'{i}.pgn') for i in range(2)]
+            for path in paths:
+                with open(path, 'w') as f:
+                    f.write(PGN)
+            games = list(pgn_source(paths))
+        self.assertEqual([g.index for g in games], [0, 1, 2, 3])
+
+    def test_npy_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'features.npy')
+            Pipeline(
+                self.games[:1], FlatMap('features', game_features),
+                sink=NpySink(path, ['ply', 'material'])
+            ).run()
+            with open(path, 'rb') as f:
+                data = f.read()
+        self.assertEqual(len(data), 128 + 8 * 8 * 2)
+        self.assertIn(b"'shape': (8, 2)", data[:128])
+        self.assertEqual(struct.unpack('<2d', data[-16:]), (7.0, 100.0))
+
+    def test_process_pool(self):
+        rows = list(Pipeline(
+            self.games, FlatMap('features', game_features, processes=2)
+        ))
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(rows[-1]['game'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard
+    from chess.board.planes import (
+        PLANES, PIECE_PLANE, PLANE_INDEX, SIDE_PLANE, CASTLING_PLANE,
+        REPETITION_PLANE, export_planes, write_planes, np
+    )
+    from chess.board.pieces import King, Pawn, piece_code
+finally:
+    sys.path.remove(root_dir)
+
+
+def plane(buffer, index, n, planes=PLANES):
+    start = (index * planes + n) * 64
+    return bytes(buffer[start:start + 64])
+
+
+class TestPlanes(unittest.TestCase):
+
+    def test_starting_position(self):
+        buffer = bytearray(PLANES * 64)
+        write_planes(ChessBoard(), buffer)
+        self.assertEqual(sum(buffer), 32 + 64 + 4 * 64)
+        white_pawns = plane(buffer, 0, PIECE_PLANE[Pawn, 'white'])
+        self.assertEqual(white_pawns[8:16], b'\x01' * 8)
+        self.assertEqual(sum(white_pawns), 8)
+        black_king = plane(buffer, 0, PIECE_PLANE[King, 'black'])
+        self.assertEqual(black_king[7 * 8 + 4], 1)
+        self.assertEqual(plane(buffer, 0, SIDE_PLANE), b'\x01' * 64)
+
+    def test_export_overwrites_and_tracks_state(self):
+        board = ChessBoard()
+        boards = [board]
+        for san in ['Nf3', 'Nf6', 'Ng1', 'Ng8', 'Nh3', 'Nh6', 'Rg1']:
+            board = board.copy()
+            board.move(san)
+            boards.append(board)
+        buffer = bytearray(b'\x07' * (len(boards) * PLANES * 64))
+        self.assertEqual(export_planes(boards, buffer), len(boards))
+        self.assertTrue(set(buffer) <= {0, 1})
+        # Black to move after 1.Nf3, the start repeats after 2...Ng8, and
+        # 4.Rg1 gives up kingside castling.
+        self.assertEqual(plane(buffer, 1, SIDE_PLANE), bytes(64))
+        self.assertEqual(plane(buffer, 3, REPETITION_PLANE), bytes(64))
+        self.assertEqual(plane(buffer, 4, REPETITION_PLANE), b'\x01' * 64)
+        self.assertEqual(plane(buffer, 6, CASTLING_PLANE), b'\x01' * 64)
+        self.assertEqual(plane(buffer, 7, CASTLING_PLANE), bytes(64))
+        self.assertEqual(plane(buffer, 7, CASTLING_PLANE + 2), b'\x01' * 64)
+
+    def test_piece_codes_follow_the_board(self):
+        board = ChessBoard.from_fen('r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1')
+        board.make_move(('e1', 'g1'))
+        board.move('Rb8')
+        for b in (board, board.clone()):
+            self.assertEqual(b.piece_codes,
+                             bytes(piece_code(b[x, y])
+                                   for x in range(8) for y in range(8)))
+        board = ChessBoard.from_fen('r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1')
+        buffer = bytearray(PLANES * 64)
+        write_planes(board, buffer)
+        self.assertEqual([plane(buffer, 0, CASTLING_PLANE + i)[0]
+                          for i in range(4)], [1, 0, 0, 1])
+        board.unmake_move(board.make_move(('e1', 'g1')))
+        self.assertEqual(board.piece_codes[32], piece_code(King('white')))
+
+    def test_piece_planes_only(self):
+        buffer = bytearray(2 * 12 * 64)
+        export_planes([ChessBoard(), ChessBoard()], buffer, planes=12)
+        self.assertEqual(sum(buffer), 64)
+        with self.assertRaises(IndexError):
+            export_planes([ChessBoard()], buffer, start=2, planes=12)
+
+    def test_plane_index(self):
+        self.assertEqual(PLANE_INDEX[0], 0)  # a1
+        self.assertEqual(PLANE_INDEX[1], 8)  # a2
+        self.assertEqual(PLANE_INDEX[8], 1)  # b1
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_npy(self):
+        from chess.board.planes import open_npy, to_planes
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'planes.npy')
+            out = open_npy(path, 2)
+            export_planes([ChessBoard(), ChessBoard()], out)
+            out.flush()
+            del out
+            loaded = np.load(path)
+        self.assertEqual(loaded.shape, (2, PLANES, 8, 8))
+        self.assertTrue((loaded[1] == to_planes(ChessBoard())).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
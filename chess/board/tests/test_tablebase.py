@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard
+    from chess.board.tablebase import (
+        Tablebase, canonical_signature, is_dead_draw, _dependencies
+    )
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestSignatures(unittest.TestCase):
+
+    def test_canonical_signature(self):
+        self.assertEqual(canonical_signature('KQ', 'K'), ('KQvK', False))
+        self.assertEqual(canonical_signature('K', 'KQ'), ('KQvK', True))
+        self.assertEqual(canonical_signature('KR', 'KQ'), ('KQvKR', True))
+
+    def test_dependencies(self):
+        self.assertEqual(_dependencies('KPvK'), ['KQvK', 'KRvK'])
+        self.assertEqual(_dependencies('KQvKR'), ['KQvK', 'KRvK'])
+        self.assertTrue(is_dead_draw('KNvK'))
+
+
+class TestTablebase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.tablebase = Tablebase(cls.directory.name)
+        cls.tablebase.generate('KQvK')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebase.close()
+        cls.directory.cleanup()
+
+    def probe(self, fen: str):
+        return self.tablebase.probe(ChessBoard.from_fen(fen))
+
+    def test_mate_in_one(self):
+        result = self.probe('k7/8/1K6/8/8/8/8/6Q1 w - - 0 1')
+        self.assertEqual((result.wdl, result.dtm), (1, 1))
+
+    def test_checkmated(self):
+        result = self.probe('k6Q/8/1K6/8/8/8/8/8 b - - 0 1')
+        self.assertEqual((result.wdl, result.dtm), (-1, 0))
+
+    def test_longest_mate_is_ten_moves(self):
+        # Mate in ten is 19 plies for the side with the queen; the lone king
+        # can be one ply further from it.
+        dtms = [value - 1 for value in self.tablebase.values('KQvK')
+                if value not in (0, 255)]
+        self.assertEqual(max(dtm for dtm in dtms if dtm % 2), 19)
+        self.assertEqual(max(dtm for dtm in dtms if not dtm % 2), 20)
+        result = self.probe('8/8/8/3k4/8/8/7Q/K7 w - - 0 1')
+        self.assertEqual(result.wdl, 1)
+        self.assertLessEqual(result.dtm, 19)
+
+    def test_colors_are_flipped(self):
+        white = self.probe('8/8/8/4k3/8/8/8/4KQ2 w - - 0 1')
+        black = self.probe('4kq2/8/8/8/4K3/8/8/8 b - - 0 1')
+        self.assertEqual(white, black)
+
+    def test_stalemate_and_captured_queen_are_draws(self):
+        self.assertEqual(self.probe('k7/2Q5/1K6/8/8/8/8/8 b - - 0 1').wdl, 0)
+        self.assertEqual(self.probe('8/8/8/8/8/8/1k6/1Q5K b - - 0 1').wdl, 0)
+
+    def test_best_move_mates(self):
+        board = ChessBoard.from_fen('8/8/8/4k3/8/8/8/4KQ2 w - - 0 1')
+        dtm = self.tablebase.probe(board).dtm
+        for _ in range(dtm):
+            board.move_from_to(*self.tablebase.best_move(board))
+        self.assertEqual(board.winner, 'white')
+
+    def test_no_table(self):
+        self.assertIsNone(self.probe('4k3/8/8/8/8/8/8/R3K3 w - - 0 1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard
+    from chess.board.pgn import read_games
+    from chess.board.tactics import (
+        MATE, FORK, PIN, HANGING, find_tactics, mine_game
+    )
+finally:
+    sys.path.remove(root_dir)
+
+
+PGN = '''[Event "Missed"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bc4 Nd4 4. Nxe5 Qg5 5. Nxf7 Qxg2 6. Rf1 Qxe4+
+7. Be2 Nf3# 0-1
+'''
+
+
+def tactics(fen: str, **kwargs) -> list:
+    return [(t.motif, tuple(m.uci() for m in t.solution), t.gain)
+            for t in find_tactics(ChessBoard.from_fen(fen), **kwargs)]
+
+
+class TestTactics(unittest.TestCase):
+
+    def test_quiet(self):
+        self.assertEqual(find_tactics(ChessBoard()), [])
+
+    def test_mate(self):
+        self.assertEqual(tactics('6k1/5ppp/8/8/8/8/8/R3K3 w Q - 0 1'),
+                         [(MATE, ('a1a8',), 1)])
+        # The king has a way out.
+        self.assertEqual(tactics('6k1/5pp1/8/8/8/8/8/R3K3 w Q - 0 1'), [])
+        # Mate in two: 1. Qg7+ Kxg7?? is illegal, so 1... Ke8 2. Qe7#.
+        (motif, solution, gain), = tactics('5k2/8/5K2/8/8/8/8/6Q1 w - - 0 1')
+        self.assertEqual((motif, len(solution), gain), (MATE, 3, 2))
+        self.assertEqual(tactics('5k2/8/5K2/8/8/8/8/6Q1 w - - 0 1',
+                                 mate_depth=1), [])
+
+    def test_fork(self):
+        self.assertEqual(tactics('r3k3/8/8/3N4/8/8/8/4K3 w - - 0 1'),
+                         [(FORK, ('d5c7',), 500)])
+        # Pawn forks, including from the starting rank.
+        self.assertEqual(tactics('4k3/8/3n1n2/8/4P3/8/8/4K3 w - - 0 1'),
+                         [(FORK, ('e4e5',), 320)])
+        self.assertEqual(tactics('4k3/8/8/2r1r3/8/8/3P4/7K w - - 0 1'),
+                         [(FORK, ('d2d4',), 500)])
+        # The fork square is covered.
+        self.assertEqual(tactics('r3k3/8/n7/3N4/8/8/8/4K3 w - - 0 1'), [])
+
+    def test_pin(self):
+        self.assertEqual(tactics('4k3/8/2n5/8/8/8/8/4KB2 w - - 0 1'),
+                         [(PIN, ('f1b5',), 320)])
+        # A defended knight is worth less than the bishop pinning it.
+        self.assertEqual(tactics('4k3/3p4/2n5/8/8/8/8/4KB2 w - - 0 1'), [])
+        # A defended rook still gains what it's worth more than the bishop.
+        fen = '4k3/1p6/2r5/8/8/8/8/4KB2 w - - 0 1'
+        self.assertEqual(tactics(fen, min_gain=100), [(PIN, ('f1b5',), 170)])
+        self.assertEqual(tactics(fen), [])
+        # A queen would just take the bishop.
+        self.assertEqual(tactics('4k3/8/2q5/8/8/8/8/4KB2 w - - 0 1'), [])
+
+    def test_hanging(self):
+        self.assertEqual(tactics('4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1'),
+                         [(HANGING, ('d2d5',), 900)])
+        # Defended, and attacked by nothing cheaper.
+        self.assertEqual(tactics('4k3/4p3/3r4/8/8/8/3R4/4K3 w - - 0 1'), [])
+        self.assertEqual(tactics('4k3/8/8/3p4/8/8/3R4/4K3 w - - 0 1'), [])
+        self.assertEqual(
+            len(tactics('4k3/8/8/3p4/8/8/3R4/4K3 w - - 0 1', min_gain=100)), 1
+        )
+        # Taking would leave the king in check.
+        self.assertEqual(tactics('4k3/8/8/3q4/8/8/4R3/4K2r w - - 0 1'), [])
+
+    def test_mine_game(self):
+        game, = read_games(PGN.splitlines())
+        puzzles = mine_game(game)
+        self.assertEqual(
+            [(p.ply, p.motif, p.solution, p.played, p.found)
+             for p in puzzles],
+            [(8, FORK, ('e5f7',), 'Nxf7', True),
+             (10, HANGING, ('f7h8',), 'Rf1', False),
+             (13, MATE, ('d4f3',), 'Nf3#', True)]
+        )
+        self.assertEqual(
+            puzzles[1].fen,
+            'r1b1kbnr/pppp1Npp/8/8/2BnP3/8/PPPP1PqP/RNBQK2R w KQkq - 0 6'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard, get_option, set_option, option_context
+    from chess.board.config import ALL, reset_option
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestThreads(unittest.TestCase):
+
+    def setUp(self):
+        reset_option(ALL)
+        self.board = ChessBoard()
+        self.board.move('e4 e5 Nf3 Nc6 Bb5')
+
+    def tearDown(self):
+        reset_option(ALL)
+
+    def test_nested_iteration(self):
+        pairs = [(a, b) for a in self.board for b in self.board]
+        self.assertEqual(len(pairs), 64 * 64)
+
+    def test_concurrent_iteration(self):
+        expected = [repr(p) for p in self.board]
+
+        def read(_):
+            return [repr(p) for p in self.board]
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(read, range(64)))
+        for result in results:
+            self.assertEqual(result, expected)
+
+    def test_concurrent_reads(self):
+        expected = (
+            sorted(self.board.all_valid_moves()), self.board.fen(),
+            self.board.winner
+        )
+
+        def read(_):
+            return (
+                sorted(self.board.all_valid_moves()), self.board.fen(),
+                self.board.winner
+            )
+
+        with ThreadPoolExecutor(8) as pool:
+            for result in pool.map(read, range(16)):
+                self.assertEqual(result, expected)
+
+    def test_option_context(self):
+        with option_context({'display.size': 'small'}):
+            self.assertEqual(get_option('display.size'), 'small')
+            with option_context({'display.axis_labels': False}):
+                self.assertEqual(get_option('display.size'), 'small')
+                self.assertFalse(get_option('display.axis_labels'))
+            self.assertTrue(get_option('display.axis_labels'))
+            # set_option stays inside the context.
+            set_option('display.figurine', True)
+            self.assertTrue(get_option('display.figurine'))
+        self.assertEqual(get_option('display.size'), 'big')
+        self.assertFalse(get_option('display.figurine'))
+        with self.assertRaises(KeyError):
+            with option_context({'display.colour': 'red'}):
+                pass
+
+    def test_options_are_context_local(self):
+        def render(size):
+            with option_context({'display.size': size}):
+                return repr(self.board).count('\n')
+
+        with ThreadPoolExecutor(4) as pool:
+            lines = list(pool.map(render, ['small', 'big'] * 8))
+        self.assertEqual(lines, [render('small'), render('big')] * 8)
+
+        def local():
+            with option_context({'api.safe_mode': False}):
+                return get_option('api.notation_mismatch')
+
+        self.assertEqual(copy_context().run(local), 'ignore')
+        self.assertEqual(get_option('api.notation_mismatch'), 'error')
+
+    def test_process_wide_options(self):
+        set_option('display.size', 'medium')
+        with ThreadPoolExecutor(2) as pool:
+            size = pool.submit(get_option, 'display.size').result()
+        self.assertEqual(size, 'medium')
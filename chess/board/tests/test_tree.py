@@ -0,0 +1,143 @@
+import io
+import os
+import random
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard, Move
+    from chess.board.main import InvalidMove
+    from chess.board.tree import GameTree, parse_tree, read_trees, write_trees
+finally:
+    sys.path.remove(root_dir)
+
+
+PGN = '''[Event "Variations"]
+[Result "1-0"]
+
+{Opening} 1. e4 e5 $1 (1... c5 {Sicilian} 2. Nf3 (2. c3 d5) 2... d6) (1... e6)
+2. Nf3 Nc6 {main} 3. Bb5 a6 (3... Nf6 4. O-O) 4. Ba4 1-0
+'''
+
+
+def state(board: ChessBoard) -> tuple:
+    return (board.fen(), board.position_hash, board.position_history,
+            board._position_counts.copy(), board._king_locs.copy())
+
+
+class TestMakeUnmake(unittest.TestCase):
+
+    def test_random_games(self):
+        rng = random.Random(7)
+        for _ in range(5):
+            board = ChessBoard()
+            undos, states = [], []
+            for _ in range(80):
+                moves = board.all_valid_moves()
+                if not moves:
+                    break
+                states.append(state(board))
+                undos.append(board.make_move(rng.choice(moves)))
+            while undos:
+                board.unmake_move(undos.pop())
+                self.assertEqual(state(board), states.pop())
+
+    def test_castle_and_promotion(self):
+        board = ChessBoard.from_fen('4k3/1P6/8/8/8/8/8/R3K3 w Q - 0 1')
+        before = state(board)
+        undo = board.make_move(('e1', 'c1'))
+        self.assertTrue(undo.move.is_castle)
+        self.assertEqual(board['d1'].__class__.__name__, 'Rook')
+        board.unmake_move(undo)
+        self.assertEqual(state(board), before)
+        self.assertFalse(board['e1'].has_moved)
+        undo = board.make_move(('b7', 'b8'))
+        self.assertEqual(undo.move.uci(), 'b7b8q')
+        board.unmake_move(undo)
+        self.assertEqual(state(board), before)
+
+    def test_parse_san(self):
+        board = ChessBoard()
+        self.assertEqual(board.parse_san('Nf3'), Move.from_uci('g1f3'))
+        self.assertTrue(ChessBoard.from_fen('4k3/8/8/8/8/8/8/4K2R w K - 0 1')
+                        .parse_san('O-O').is_castle)
+
+
+class TestGameTree(unittest.TestCase):
+
+    def test_variations(self):
+        tree = GameTree()
+        e4 = tree.play('e4')
+        tree.play('e5')
+        tree.back()
+        c5 = tree.play('c5')
+        self.assertEqual(tree.movetext(), '1. e4 e5 (1... c5) *')
+        self.assertEqual(tree.board.fen(),
+                         ChessBoard().move('e4 c5').fen())
+        # Playing a move that's already there follows it.
+        tree.back()
+        self.assertIs(tree.play(('c7', 'c5')), c5)
+        self.assertEqual(len(e4.variations), 2)
+        tree.promote(c5)
+        self.assertEqual(tree.movetext(), '1. e4 c5 (1... e5) *')
+        tree.remove(c5)
+        self.assertIs(tree.node, e4)
+        self.assertEqual(tree.movetext(), '1. e4 e5 *')
+
+    def test_goto(self):
+        tree = parse_tree(PGN.split('\n\n')[1])
+        self.assertIs(tree.node, tree.root)
+        mainline = list(tree.mainline())
+        self.assertEqual(len(mainline), 7)
+        tree.goto(mainline[-1])
+        d5 = tree.root.variations[0].variations[1].variations[1] \
+            .variations[0]
+        tree.goto(d5)
+        self.assertEqual(d5.ply, 4)
+        self.assertEqual(state(tree.board),
+                         state(ChessBoard().move('e4 c5 c3 d5')))
+        tree.goto(tree.root)
+        self.assertEqual(state(tree.board), state(ChessBoard()))
+
+    def test_navigation_does_not_revalidate(self):
+        tree = parse_tree(PGN.split('\n\n')[1])
+        mainline = list(tree.mainline())
+
+        def valid_move(*args, **kwargs):
+            raise AssertionError('revalidated a move from the tree')
+
+        tree.board.valid_move = valid_move
+        tree.goto(mainline[-1])
+        tree.goto(tree.root)
+        tree.play('e4')
+        self.assertIs(tree.node, mainline[0])
+        # New moves are still checked.
+        self.assertRaises(AssertionError, tree.play, 'd5')
+
+    def test_illegal_move(self):
+        tree = GameTree()
+        self.assertRaises(InvalidMove, tree.play, ('e2', 'e5'))
+        self.assertEqual(tree.root.variations, [])
+
+    def test_pgn(self):
+        tree, = read_trees(PGN.splitlines())
+        self.assertEqual(tree.result, '1-0')
+        self.assertEqual(tree.root.comment, 'Opening')
+        self.assertEqual(tree.root.variations[0].variations[0].nags, (1,))
+        self.assertEqual(tree.pgn(), PGN)
+        stream = io.StringIO()
+        self.assertEqual(write_trees([tree, tree], stream), 2)
+        self.assertEqual(stream.getvalue(), f'{PGN}\n{PGN}')
+
+    def test_fen(self):
+        pgn = ('[FEN "4k3/8/8/8/8/8/8/R3K3 b Q - 0 10"]\n[Result "*"]\n\n'
+               '10... Kd7 11. O-O-O+ (11. Ra7+) *\n')
+        tree, = read_trees(pgn.splitlines())
+        self.assertEqual(tree.pgn(), pgn)
+
+
+if __name__ == '__main__':
+    unittest.main()
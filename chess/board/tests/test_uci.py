@@ -0,0 +1,147 @@
+import io
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard, option_context
+    from chess.board.main import InvalidMove
+    from chess.board.fen import STARTING_FEN
+    from chess.board.pieces import King, Knight, Queen, Rook
+    from chess.board.moves import Move
+    from chess.board.uci import UciEngine, parse_go
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestFen(unittest.TestCase):
+
+    def test_starting_position_round_trip(self):
+        self.assertEqual(ChessBoard().fen(), STARTING_FEN)
+        self.assertEqual(ChessBoard.from_fen(STARTING_FEN).fen(), STARTING_FEN)
+
+    def test_side_to_move(self):
+        board = ChessBoard.from_fen('4k3/8/8/8/8/8/8/4K3 b - - 0 12')
+        self.assertEqual(board.whose_turn, 'black')
+        self.assertEqual(board.moves, 23)
+
+
+class TestSpecialMoves(unittest.TestCase):
+
+    def test_castle_with_move_from_to(self):
+        board = ChessBoard().move('1.e4 e5 2.Nf3 Nc6 3.Bc4 Bc5')
+        board.move_from_to('e1', 'g1')
+        self.assertIsInstance(board['g1'], King)
+        self.assertIsInstance(board['f1'], Rook)
+        self.assertEqual(board.whose_turn, 'black')
+
+    def test_castle_needs_unmoved_rook(self):
+        board = ChessBoard.from_fen('4k3/8/8/8/8/8/8/4K2R w - - 0 1')
+        self.assertFalse(board.valid_move('e1', 'g1'))
+
+    def test_illegal_castle_raises_without_safe_mode(self):
+        for fen in ('4k3/8/8/8/8/8/8/4K2R w - - 0 1',
+                    '4k3/8/8/8/8/8/8/4K3 w - - 0 1',
+                    '4k3/8/8/8/8/8/8/4KB1R w K - 0 1'):
+            board = ChessBoard.from_fen(fen)
+            with option_context({'api.safe_mode': False}):
+                self.assertRaises(InvalidMove, board.move, 'O-O')
+            self.assertEqual(board.fen(), fen)
+
+    def test_disambiguation_that_matches_nothing(self):
+        board = ChessBoard().move('1.e4 d5')
+        self.assertRaises(InvalidMove, board.move, '2xd5')
+        self.assertRaises(InvalidMove, board.move, 'Nbf3')
+        board.move('exd5')
+
+    def test_promotion(self):
+        board = ChessBoard.from_fen('8/P6k/8/8/8/8/8/K7 w - - 0 1')
+        board.move('a8=N')
+        self.assertIsInstance(board['a8'], Knight)
+        board = ChessBoard.from_fen('8/P6k/8/8/8/8/8/K7 w - - 0 1')
+        board.move_from_to('a7', 'a8')
+        self.assertIsInstance(board['a8'], Queen)
+
+
+class TestUci(unittest.TestCase):
+
+    def setUp(self):
+        self.output = io.StringIO()
+        self.engine = UciEngine(output=self.output)
+
+    def test_handshake(self):
+        self.engine.handle('uci')
+        self.engine.handle('isready')
+        lines = self.output.getvalue().splitlines()
+        self.assertIn('uciok', lines)
+        self.assertEqual(lines[-1], 'readyok')
+
+    def test_position_applies_only_new_moves(self):
+        self.engine.handle('position startpos moves e2e4 e7e5')
+        board = self.engine.board
+        self.engine.handle('position startpos moves e2e4 e7e5 g1f3')
+        self.assertIs(self.engine.board, board)
+        self.assertIsInstance(board['f3'], Knight)
+        self.engine.handle('position startpos moves d2d4')
+        self.assertIsNot(self.engine.board, board)
+
+    def test_go_finds_mate(self):
+        self.engine.handle('position fen 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+        self.engine.handle('go depth 2')
+        self.engine._search_thread.join()
+        self.assertIn('bestmove a1a8', self.output.getvalue())
+
+    def test_stop(self):
+        self.engine.handle('position startpos')
+        self.engine.handle('go infinite')
+        self.engine.handle('stop')
+        self.assertIn('bestmove', self.output.getvalue())
+
+    def test_parse_go(self):
+        self.assertEqual(parse_go('infinite depth 5'.split()),
+                         {'infinite': True, 'depth': 5})
+        self.assertEqual(
+            parse_go('ponder wtime 60000 btime 60000'.split()),
+            {'ponder': True, 'wtime': 60000, 'btime': 60000}
+        )
+        self.assertEqual(
+            parse_go('searchmoves e2e4 d2d4 depth 3'.split()),
+            {'searchmoves': [Move.from_uci('e2e4'), Move.from_uci('d2d4')],
+             'depth': 3}
+        )
+        # Bad or missing values are skipped.
+        self.assertEqual(parse_go('depth x nodes 10 movetime'.split()),
+                         {'nodes': 10})
+        self.assertEqual(parse_go('depth infinite'.split()),
+                         {'infinite': True})
+
+    def test_go_with_bad_values(self):
+        self.engine.handle('position startpos')
+        self.engine.handle('go depth x movetime 50')
+        self.engine._search_thread.join(5)
+        self.assertIn('bestmove', self.output.getvalue())
+
+    def test_searchmoves(self):
+        self.engine.handle('position startpos')
+        self.engine.handle('go depth 1 searchmoves a2a3 h2h3')
+        self.engine._search_thread.join()
+        self.assertIn('bestmove a2a3', self.output.getvalue())
+
+    def test_ponderhit(self):
+        self.engine.handle('position startpos')
+        self.engine.handle('go ponder wtime 600 btime 600')
+        thread = self.engine._search_thread
+        thread.join(0.1)
+        self.assertTrue(thread.is_alive())
+        self.assertNotIn('bestmove', self.output.getvalue())
+        self.engine.handle('ponderhit')
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertIn('bestmove', self.output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
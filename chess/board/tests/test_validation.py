@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+try:
+    fpath = os.path.dirname(__file__)
+    root_dir = os.path.abspath(os.path.join(fpath, '../../..'))
+    sys.path.append(root_dir)
+    from chess.board import ChessBoard, validate_moves
+    from chess.board.attacks import SQUARE_NAMES
+finally:
+    sys.path.remove(root_dir)
+
+
+class TestValidateMoves(unittest.TestCase):
+
+    def assertMatchesValidMove(self, board):
+        candidates = [(a, b) for a in SQUARE_NAMES for b in SQUARE_NAMES]
+        results = validate_moves(board, candidates)
+        for (loc, to), reason in zip(candidates, results):
+            self.assertEqual(reason is None, board.valid_move(loc, to),
+                             f'{loc}{to}: {reason}')
+
+    def test_matches_valid_move(self):
+        self.assertMatchesValidMove(ChessBoard())
+        self.assertMatchesValidMove(ChessBoard.from_fen(
+            'r3r1k1/pp3pbp/1qp3p1/2B5/2BP2b1/Q1n2N2/P4PPP/3RK2R w K - 0 17'
+        ))
+        self.assertMatchesValidMove(ChessBoard.from_fen(
+            '4k3/4r3/8/8/1b6/8/3NB3/R3K2R w KQ - 0 1'
+        ))
+
+    def test_reasons(self):
+        board = ChessBoard.from_fen('4kr2/8/8/8/1b6/8/3N4/R3K3 w Q - 0 1')
+        self.assertEqual(
+            validate_moves(board, [
+                'd2f3', 'e1f1', 'e1d1', 'a1a8', 'a1a9', 'e8e7', 'd2d3',
+                'a1e1', 'e1c1', 'c3c4'
+            ]),
+            ['pinned', 'into_check', None, None, 'off_board', 'wrong_turn',
+             'bad_shift', 'own_piece', None, 'no_piece']
+        )
+
+    def test_in_check(self):
+        board = ChessBoard.from_fen('4k3/8/8/8/1b6/8/8/RN2K3 w Q - 0 1')
+        self.assertEqual(
+            validate_moves(board, [
+                'a1a2', 'b1d2', 'b1c3', 'b1a3', 'e1d2', 'e1d1'
+            ]),
+            ['in_check', None, None, 'in_check', 'into_check', None]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,288 @@
+"""Games with variations: a tree of moves over a single `ChessBoard`.
+
+Each node keeps only its move (and any comment and NAGs). The board is kept at
+the current node, and going to another node makes and unmakes the moves in
+between, so nothing is copied per node and nothing is replayed from the start:
+
+    >>> tree = GameTree()
+    >>> tree.play('e4'); tree.play('e5')
+    >>> tree.back()
+    >>> tree.play('c5')  # A variation: 1...c5 instead of 1...e5.
+    >>> tree.movetext()
+    '1. e4 e5 (1... c5) *'
+
+`read_trees` reads PGN with variations (RAV), comments and NAGs into trees,
+and `GameTree.pgn` writes them back out.
+"""
+import textwrap
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, \
+    Union
+
+from .main import ChessBoard, Undo
+from .moves import Move
+from .pgn import RESULTS, split_games, tokenize
+
+MoveLike = Union[Move, Tuple[str, str], str]
+
+
+class Node(object):
+    __slots__ = ('move', 'parent', 'variations', 'comment', 'nags')
+
+    def __init__(self, move: Optional[Move] = None,
+                 parent: Optional['Node'] = None):
+        self.move = move
+        self.parent = parent
+        # The first variation is the main continuation.
+        self.variations: List['Node'] = []
+        self.comment: Optional[str] = None
+        self.nags: Tuple[int, ...] = ()
+
+    @property
+    def ply(self) -> int:
+        """Moves from the root to this node."""
+        n = 0
+        node = self
+        while node.parent is not None:
+            node = node.parent
+            n += 1
+        return n
+
+    def __repr__(self) -> str:
+        return f'Node({self.move!r})'
+
+
+class GameTree(object):
+    """A mainline and its variations from one starting position. `board` is
+    the position at `node`; it should only be changed through the tree."""
+
+    def __init__(
+            self,
+            board: Optional[ChessBoard] = None,
+            headers: Optional[Dict[str, str]] = None,
+            result: Optional[str] = None
+    ):
+        self.board = board.copy() if board is not None else ChessBoard()
+        self.headers = dict(headers or {})
+        self.result = result
+        self.root = Node()
+        self.node = self.root
+        # One undo per move from the root to `node`.
+        self._undos: List[Undo] = []
+
+    def _move(self, move: MoveLike) -> Move:
+        """Accepts a `Move`, ('e2', 'e4'), 'e2e4' or SAN such as 'Nf3'."""
+        if isinstance(move, Move):
+            return move
+        if isinstance(move, tuple):
+            return Move.make(*move)
+        try:
+            return Move.from_uci(move)
+        except ValueError:
+            return self.board.parse_san(move)
+
+    def _down(self, child: Node) -> None:
+        # Moves in the tree were checked when they were played (or read).
+        self._undos.append(self.board.make_move(child.move, safe_mode=False))
+        self.node = child
+
+    def _up(self) -> None:
+        self.board.unmake_move(self._undos.pop())
+        self.node = self.node.parent
+
+    def play(self, move: MoveLike) -> Node:
+        """Plays `move` from the current node and goes to it. If the node
+        already has that move, it's followed; otherwise the move is added
+        as the node's last variation (or its main continuation, if it has
+        none)."""
+        move = self._move(move)
+        for child in self.node.variations:
+            if child.move == move:
+                self._down(child)
+                return child
+        undo = self.board.make_move(move)
+        child = Node(undo.move, self.node)
+        self.node.variations.append(child)
+        self._undos.append(undo)
+        self.node = child
+        return child
+
+    def back(self) -> Node:
+        """Goes to the parent of the current node (the root stays put)."""
+        if self.node.parent is not None:
+            self._up()
+        return self.node
+
+    def forward(self, variation: int = 0) -> Node:
+        """Goes to one of the current node's continuations."""
+        self._down(self.node.variations[variation])
+        return self.node
+
+    def path(self, node: Optional[Node] = None) -> List[Node]:
+        """The nodes from the root (not included) to `node`, which defaults
+        to the current node."""
+        node = node or self.node
+        path = []
+        while node.parent is not None:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+        return path
+
+    def goto(self, node: Node) -> Node:
+        """Goes to `node` by unmaking moves back to where its path and the
+        current one part, then making the moves down to it."""
+        target, current = self.path(node), self.path()
+        common = 0
+        for a, b in zip(target, current):
+            if a is not b:
+                break
+            common += 1
+        for _ in range(len(current) - common):
+            self._up()
+        for child in target[common:]:
+            self._down(child)
+        return node
+
+    def mainline(self) -> Iterator[Node]:
+        """The main continuation of every node from the root on."""
+        node = self.root
+        while node.variations:
+            node = node.variations[0]
+            yield node
+
+    def promote(self, node: Node) -> None:
+        """Makes `node` its parent's main continuation."""
+        siblings = node.parent.variations
+        siblings.remove(node)
+        siblings.insert(0, node)
+
+    def remove(self, node: Node) -> None:
+        """Deletes `node` and everything after it. If the current node is
+        among them, the tree goes to `node`'s parent first."""
+        if any(n is node for n in self.path()):
+            self.goto(node.parent)
+        node.parent.variations.remove(node)
+
+    # ~~~~~~ PGN
+
+    def _write_move(self, tokens: List[str], node: Node, number: bool) -> bool:
+        """Appends the move of `node`, a child of the current node. Returns
+        whether the next move needs its number repeated."""
+        ply = self.board.moves
+        if ply % 2 == 0:
+            tokens.append(f'{ply // 2 + 1}.')
+        elif number:
+            tokens.append(f'{ply // 2 + 1}...')
+        tokens.append(self.board.san(node.move))
+        tokens.extend(f'${nag}' for nag in node.nags)
+        if node.comment is not None:
+            tokens.append('{' + node.comment + '}')
+            return True
+        return False
+
+    def _write_line(self, tokens: List[str], number: bool) -> None:
+        """Appends everything after the current node, and comes back to it."""
+        depth = 0
+        while self.node.variations:
+            main, *others = self.node.variations
+            number = self._write_move(tokens, main, number)
+            for other in others:
+                start = len(tokens)
+                after = self._write_move(tokens, other, True)
+                self._down(other)
+                self._write_line(tokens, after)
+                self._up()
+                tokens[start] = '(' + tokens[start]
+                tokens[-1] += ')'
+            self._down(main)
+            depth += 1
+            number = number or bool(others)
+        for _ in range(depth):
+            self._up()
+
+    def movetext(self) -> str:
+        node = self.node
+        self.goto(self.root)
+        tokens = []
+        if self.root.comment is not None:
+            tokens.append('{' + self.root.comment + '}')
+        self._write_line(tokens, True)
+        self.goto(node)
+        tokens.append(self.result or '*')
+        return ' '.join(tokens)
+
+    def pgn(self) -> str:
+        """The game as PGN, with its headers, lines of movetext wrapped at 79
+        characters."""
+        headers = dict(self.headers)
+        if self.result is not None:
+            headers['Result'] = self.result
+        tags = ''.join(f'[{k} {_quote(v)}]\n' for k, v in headers.items())
+        text = textwrap.fill(self.movetext(), 79, break_long_words=False,
+                             break_on_hyphens=False)
+        return f'{tags}\n{text}\n' if tags else f'{text}\n'
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def parse_tree(
+        movetext: str,
+        board: Optional[ChessBoard] = None,
+        headers: Optional[Dict[str, str]] = None
+) -> GameTree:
+    """A tree from PGN movetext. Comments and NAGs are kept on the move before
+    them (comments before the first move, on the root). The tree is left at
+    its root."""
+    tree = GameTree(board, headers)
+    # The node each open variation returns to once it's closed.
+    returns = []
+    for token in tokenize(movetext):
+        if token == '(':
+            returns.append(tree.node)
+            tree.back()
+        elif token == ')':
+            if returns:
+                tree.goto(returns.pop())
+        elif token[0] in '{;':
+            text = (token[1:-1] if token[0] == '{' else token[1:]).strip()
+            node = tree.node
+            node.comment = text if node.comment is None \
+                else f'{node.comment} {text}'
+        elif token[0] == '$':
+            tree.node.nags += (int(token[1:]),)
+        elif token[0].isdigit() and '.' in token:
+            continue
+        elif token in RESULTS:
+            tree.result = token
+        else:
+            tree.play(token)
+    tree.goto(tree.root)
+    return tree
+
+
+def read_trees(lines: Iterable[str]) -> Iterator[GameTree]:
+    """Yields a tree for each game in an iterable of lines, such as an open
+    file."""
+    for headers, movetext in split_games(lines):
+        board = ChessBoard.from_fen(headers['FEN']) \
+            if 'FEN' in headers else None
+        tree = parse_tree(movetext, board, headers)
+        tree.result = tree.result or headers.get('Result')
+        yield tree
+
+
+def read_file(path: str) -> Iterator[GameTree]:
+    with open(path, encoding='utf-8', errors='replace') as f:
+        yield from read_trees(f)
+
+
+def write_trees(trees: Iterable[GameTree], stream: TextIO) -> int:
+    """Writes trees as PGN, separated by blank lines. Returns how many."""
+    n = 0
+    for n, tree in enumerate(trees, 1):
+        if n > 1:
+            stream.write('\n')
+        stream.write(tree.pgn())
+    return n
@@ -0,0 +1,243 @@
+"""Universal Chess Interface (UCI) front end.
+
+Run with `python -m chess.board.uci` and point a chess GUI at it. Searching
+happens on a background thread so `stop` and `isready` are answered while the
+engine is thinking.
+"""
+import sys
+import threading
+from typing import IO, Any, Dict, List, Optional
+
+from .main import ChessBoard, InvalidMove
+from .moves import Move
+from .search import Search, SearchResult, MATE_SCORE
+from .fen import STARTING_FEN, InvalidFen
+
+ENGINE_NAME = 'chess.board'
+ENGINE_AUTHOR = 'dwreeves'
+
+# Fraction of the remaining clock spent on a move when the GUI only sends
+# `wtime`/`btime`.
+CLOCK_FRACTION = 1 / 30
+
+
+# `go` arguments that stand alone, and those followed by an integer.
+GO_FLAGS = ('infinite', 'ponder')
+GO_VALUES = ('wtime', 'btime', 'winc', 'binc', 'movestogo', 'depth', 'nodes',
+             'mate', 'movetime')
+
+
+def parse_go(args: List[str]) -> Dict[str, Any]:
+    """The arguments of a `go` command: flags map to True, `searchmoves` to
+    the list of moves after it, and the rest to their integer values. Unknown
+    tokens, bad moves and values that aren't integers are skipped."""
+    opts = {}
+    i = 0
+    while i < len(args):
+        token = args[i]
+        i += 1
+        if token in GO_FLAGS:
+            opts[token] = True
+        elif token == 'searchmoves':
+            moves = []
+            while i < len(args) and args[i] not in GO_FLAGS + GO_VALUES:
+                try:
+                    moves.append(parse_uci_move(args[i]))
+                except InvalidMove:
+                    pass
+                i += 1
+            opts[token] = moves
+        elif token in GO_VALUES and i < len(args) \
+                and args[i] not in GO_FLAGS + GO_VALUES + ('searchmoves',):
+            try:
+                opts[token] = int(args[i])
+            except ValueError:
+                pass
+            i += 1
+    return opts
+
+
+def parse_uci_move(s: str) -> Move:
+    """'e2e4' -> e2 to e4; 'e7e8q' -> e7 to e8, promoting to a queen"""
+    try:
+        return Move.from_uci(s)
+    except ValueError as e:
+        raise InvalidMove(str(e))
+
+
+def format_uci_move(move: Move) -> str:
+    return move.uci()
+
+
+class UciEngine(object):
+
+    def __init__(self, output: IO = None):
+        self.output = output or sys.stdout
+        self.board = ChessBoard()
+        # What the current board was built from, so that `position` commands
+        # which only extend the move list can skip replaying it.
+        self._base = 'startpos'
+        self._applied: List[str] = []
+        self._stop_event = threading.Event()
+        self._search_thread: Optional[threading.Thread] = None
+        self._search: Optional[Search] = None
+        # The time to allow once a `go ponder` search is hit.
+        self._ponder_movetime: Optional[float] = None
+        self._output_lock = threading.Lock()
+
+    def send(self, line: str) -> None:
+        with self._output_lock:
+            self.output.write(f'{line}\n')
+            self.output.flush()
+
+    def run(self, stream: IO = None) -> None:
+        stream = stream or sys.stdin
+        for line in stream:
+            if not self.handle(line):
+                break
+        self._stop_search()
+
+    def handle(self, line: str) -> bool:
+        """Handle one line of input. Returns False once the GUI says `quit`."""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.send(f'id name {ENGINE_NAME}')
+            self.send(f'id author {ENGINE_AUTHOR}')
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'ucinewgame':
+            self._stop_search()
+            self._set_position('startpos', [])
+        elif command == 'position':
+            self._stop_search()
+            self._position(args)
+        elif command == 'go':
+            self._go(args)
+        elif command == 'ponderhit':
+            self._ponderhit()
+        elif command == 'stop':
+            self._stop_search()
+        elif command == 'quit':
+            return False
+        return True
+
+    # ~~~~~~ position
+
+    def _position(self, args: List[str]) -> None:
+        if 'moves' in args:
+            idx = args.index('moves')
+            args, moves = args[:idx], args[idx + 1:]
+        else:
+            moves = []
+        if args[:1] == ['startpos']:
+            base = 'startpos'
+        elif args[:1] == ['fen']:
+            base = ' '.join(args[1:])
+        else:
+            self.send('info string position needs startpos or fen')
+            return
+        self._set_position(base, moves)
+
+    def _set_position(self, base: str, moves: List[str]) -> None:
+        # GUIs resend the whole game on every move; only apply what's new.
+        n = len(self._applied)
+        if base != self._base or moves[:n] != self._applied:
+            try:
+                self.board = ChessBoard.from_fen(
+                    STARTING_FEN if base == 'startpos' else base
+                )
+            except (InvalidFen, ValueError) as e:
+                self.send(f'info string invalid fen: {e}')
+                return
+            self._base = base
+            self._applied = []
+            n = 0
+        for m in moves[n:]:
+            try:
+                self.board.move_from_to(parse_uci_move(m),
+                                        notifications=False)
+            except InvalidMove:
+                self.send(f'info string invalid move: {m}')
+                return
+            self._applied.append(m)
+
+    # ~~~~~~ go / stop
+
+    def _go(self, args: List[str]) -> None:
+        self._stop_search()
+        opts = parse_go(args)
+        kwargs = {}
+        if 'depth' in opts:
+            kwargs['depth'] = opts['depth']
+        if 'nodes' in opts:
+            kwargs['nodes'] = opts['nodes']
+        if 'searchmoves' in opts:
+            kwargs['moves'] = opts['searchmoves']
+        movetime = self._movetime(opts)
+        # Pondering goes on until the GUI says the move was played.
+        self._ponder_movetime = movetime if 'ponder' in opts else None
+        if movetime is not None and 'ponder' not in opts:
+            kwargs['movetime'] = movetime
+        self._stop_event = threading.Event()
+        self._search = Search(self.board.copy(), stop_event=self._stop_event,
+                              on_iteration=self._send_info, **kwargs)
+        self._search_thread = threading.Thread(
+            target=self._run_search, args=(self._search,), daemon=True
+        )
+        self._search_thread.start()
+
+    def _movetime(self, opts: Dict[str, Any]) -> Optional[float]:
+        """Seconds to search for, or None for no limit."""
+        if 'movetime' in opts:
+            return opts['movetime'] / 1000
+        if 'infinite' in opts:
+            return None
+        white = self.board.whose_turn == 'white'
+        clock, inc = ('wtime', 'winc') if white else ('btime', 'binc')
+        if clock not in opts:
+            return None
+        return (opts[clock] * CLOCK_FRACTION + opts.get(inc, 0)) / 1000
+
+    def _ponderhit(self) -> None:
+        if self._search is not None and self._ponder_movetime is not None:
+            self._search.limit_time(self._ponder_movetime)
+        self._ponder_movetime = None
+
+    def _run_search(self, search: Search) -> None:
+        result = search.run()
+        if result.best_move is None:
+            self.send('bestmove 0000')
+        else:
+            self.send(f'bestmove {format_uci_move(result.best_move)}')
+
+    def _send_info(self, result: SearchResult) -> None:
+        if abs(result.score) >= MATE_SCORE - result.depth:
+            plies = MATE_SCORE - abs(result.score)
+            moves = (plies + 1) // 2
+            score = f'mate {moves if result.score > 0 else -moves}'
+        else:
+            score = f'cp {result.score}'
+        ms = int(result.seconds * 1000)
+        nps = int(result.nodes / result.seconds) if result.seconds else 0
+        pv = ' '.join(format_uci_move(m) for m in result.pv)
+        self.send(f'info depth {result.depth} score {score} '
+                  f'nodes {result.nodes} nps {nps} time {ms} pv {pv}')
+
+    def _stop_search(self) -> None:
+        if self._search_thread is not None:
+            self._stop_event.set()
+            self._search_thread.join()
+            self._search_thread = None
+            self._search = None
+
+
+def main() -> None:
+    UciEngine().run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Validate many candidate moves against one position at once.
+
+`ChessBoard.valid_move` answers one move at a time, and every call redoes the
+obstruction checks and plays the move out on a copy to look for check. Here the
+checkers, pins and the squares the opponent attacks are worked out once, after
+which each candidate costs a few lookups.
+
+    >>> validate_moves(board, [('e2', 'e4'), ('e1', 'e3'), ('b1', 'b3')])
+    [None, 'bad_shift', 'bad_shift']
+
+Each result is None for a legal move, or one of the reason codes below.
+"""
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .attacks import (
+    SQUARES, BETWEEN, attackers, attack_map, cells as flatten, pins
+)
+from .grid import Vector
+from .main import ChessBoard
+from .moves import Move
+from .pieces import Knight, Pawn, King
+from .utils import invert_color
+
+OFF_BOARD = 'off_board'
+NO_PIECE = 'no_piece'
+WRONG_TURN = 'wrong_turn'
+BAD_SHIFT = 'bad_shift'  # The piece can't move that way, even on an empty board
+BLOCKED = 'blocked'
+OWN_PIECE = 'own_piece'
+CASTLE_UNAVAILABLE = 'castle_unavailable'
+INTO_CHECK = 'into_check'  # The king would move onto an attacked square
+PINNED = 'pinned'
+IN_CHECK = 'in_check'  # The move doesn't get the king out of check
+
+Candidate = Union[Move, Tuple[str, str], str]
+
+
+def _split(candidate: Candidate) -> Tuple[str, str]:
+    """Accepts a `Move`, ('e2', 'e4') or 'e2e4'."""
+    if isinstance(candidate, Move):
+        return candidate.loc, candidate.to
+    if isinstance(candidate, str):
+        return candidate[:2], candidate[2:4]
+    return candidate[0], candidate[1]
+
+
+def validate_moves(
+        board: ChessBoard,
+        candidates: Iterable[Candidate]
+) -> List[Optional[str]]:
+    """One result per candidate, in order: None if the move is legal, or the
+    reason it isn't."""
+    squares = flatten(board)
+    color = board.whose_turn
+    enemy = invert_color(color)
+    king_sq = SQUARES[board._king_locs[color]]
+    checkers = attackers(squares, king_sq, enemy)
+    pinned = pins(squares, king_sq, color)
+    # Squares the king can't step onto. The king is lifted off the board first,
+    # so that sliders checking it also cover the squares behind it.
+    without_king = squares[:]
+    without_king[king_sq] = None
+    danger = attack_map(without_king, enemy)
+    if len(checkers) == 1:
+        checker = checkers[0]
+        evasions = {checker, *BETWEEN[king_sq * 64 + checker]}
+    else:
+        evasions = set()
+
+    results = []
+    for candidate in candidates:
+        loc, to = _split(candidate)
+        frm, dest = SQUARES.get(loc), SQUARES.get(to)
+        if frm is None or dest is None:
+            results.append(OFF_BOARD)
+            continue
+        piece = squares[frm]
+        if piece is None:
+            results.append(NO_PIECE)
+            continue
+        if piece.color != color:
+            results.append(WRONG_TURN)
+            continue
+        shift = Vector(dest // 8 - frm // 8, dest % 8 - frm % 8)
+        if shift not in piece.shift_patterns:
+            results.append(BAD_SHIFT)
+            continue
+        target = squares[dest]
+        if target is not None and target.color == color:
+            results.append(OWN_PIECE)
+            continue
+        if isinstance(piece, Pawn):
+            if shift.x != 0 and target is None:
+                results.append(BLOCKED)
+                continue
+            if shift.x == 0 and (
+                target is not None
+                or any(squares[s] is not None
+                       for s in BETWEEN[frm * 64 + dest])
+            ):
+                results.append(BLOCKED)
+                continue
+        elif not isinstance(piece, Knight):
+            if any(squares[s] is not None for s in BETWEEN[frm * 64 + dest]):
+                results.append(BLOCKED)
+                continue
+        if isinstance(piece, King):
+            if abs(shift.x) == 2:
+                # Castling is rare enough to just ask the board.
+                if not board._castle_pieces_ready(loc, to):
+                    results.append(CASTLE_UNAVAILABLE)
+                elif not board._valid_move_after_shift_verification(loc, to):
+                    results.append(INTO_CHECK)
+                else:
+                    results.append(None)
+            elif danger[dest]:
+                results.append(INTO_CHECK)
+            else:
+                results.append(None)
+            continue
+        if len(checkers) > 1:
+            results.append(IN_CHECK)
+        elif frm in pinned and dest not in pinned[frm]:
+            results.append(PINNED)
+        elif checkers and dest not in evasions:
+            results.append(IN_CHECK)
+        else:
+            results.append(None)
+    return results
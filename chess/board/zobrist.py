@@ -0,0 +1,51 @@
+"""Zobrist hashing of chess positions.
+
+A position's hash is the XOR of one random 64-bit key per (piece, square),
+plus a key for black to move and one per castling right. Because XOR is its own
+inverse, the piece part of the hash can be updated in O(1) whenever a square
+changes, which is what `ChessBoard.__setitem__` does.
+
+Squares are indexed as `x * 8 + y` (file-major), the same order in which
+`Grid.positions` lists them.
+"""
+import random
+from typing import Dict, List, Optional, Tuple, Type
+
+from .pieces import ChessPiece, ALL_PIECES
+
+# Seeded, so hashes are stable across processes and can be stored on disk.
+_rng = random.Random(0x5EED)
+
+PIECE_KEYS: Dict[Tuple[Type, str], List[int]] = {
+    (piece_type, color): [_rng.getrandbits(64) for _ in range(64)]
+    for piece_type in sorted(ALL_PIECES, key=lambda p: p._char)
+    for color in ('white', 'black')
+}
+
+SIDE_KEY = _rng.getrandbits(64)
+
+CASTLING_KEYS = {right: _rng.getrandbits(64) for right in 'KQkq'}
+
+
+def piece_key(piece: Optional[ChessPiece], x: int, y: int) -> int:
+    if piece is None:
+        return 0
+    return PIECE_KEYS[piece.__class__, piece.color][x * 8 + y]
+
+
+def castling_key(rights: str) -> int:
+    """`rights` is the FEN castling field, e.g. 'KQkq' or '-'."""
+    h = 0
+    for right in rights:
+        h ^= CASTLING_KEYS.get(right, 0)
+    return h
+
+
+def piece_hash(mat: List[List[Optional[ChessPiece]]]) -> int:
+    """Hash of the piece placement only, computed from scratch."""
+    h = 0
+    for x, file_ in enumerate(mat):
+        for y, piece in enumerate(file_):
+            if piece is not None:
+                h ^= PIECE_KEYS[piece.__class__, piece.color][x * 8 + y]
+    return h